@@ -4,16 +4,47 @@ from app.models import db
 from app.api.routes_auth import auth_blueprint
 from app.api.routes_payment import payment_blueprint
 from app.api.routes_auth_log import authlog_blueprint
+from app.api.routes_customer import customer_blueprint
 from app.api.routes_dispute import dispute_blueprint
 from app.api.routes_kyc import kyc_blueprint
+from app.api.routes_ops import ops_blueprint
+from app.api.routes_metrics import metrics_blueprint
+from app.api.routes_rollups import rollups_blueprint
+from app.api.routes_velocity import velocity_blueprint
+from app.cli import rollups_cli, schema_cli
+from app.services.dedup_filter import init_dedup_filter
+from app.services.group_commit import init_group_commit
+from app.services.record_cache import init_record_cache
+from app.services.profiling import init_profiling
+from app.services.rollups import init_rollups
+from app.services.telemetry import init_metrics
+from app.services.velocity import init_velocity
+from app.utils.compression import init_compression
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
     app.config.from_object(get_config())
+    if config:
+        app.config.update(config)
     db.init_app(app)
+    init_group_commit(app)
+    init_record_cache(app)
+    init_dedup_filter(app)
+    init_velocity(app)
+    init_rollups(app)
+    init_metrics(app)
+    init_profiling(app)
+    init_compression(app)
     app.register_blueprint(auth_blueprint, url_prefix='/api/auth')
     app.register_blueprint(payment_blueprint, url_prefix='/api/payment')
     app.register_blueprint(authlog_blueprint, url_prefix='/api/authlog')
     app.register_blueprint(dispute_blueprint, url_prefix='/api/dispute')
     app.register_blueprint(kyc_blueprint, url_prefix='/api/kyc')
+    app.register_blueprint(customer_blueprint, url_prefix='/api/customer')
+    app.register_blueprint(ops_blueprint, url_prefix='/api/ops')
+    app.register_blueprint(velocity_blueprint, url_prefix='/api/velocity')
+    app.register_blueprint(rollups_blueprint, url_prefix='/api/rollups')
+    app.register_blueprint(metrics_blueprint)
+    app.cli.add_command(schema_cli)
+    app.cli.add_command(rollups_cli)
     return app
\ No newline at end of file
@@ -1,18 +1,40 @@
 from flask import Blueprint, request, jsonify
 from app.services.auth_service import (
-    get_all_auth_logs,
+    get_auth_logs_page,
+    stream_auth_logs,
     get_auth_log_by_id,
     create_auth_log,
     update_auth_log,
     delete_auth_log,
-    create_auth_logs_batch
+    create_auth_logs_batch,
+    create_auth_logs_stream,
+    create_auth_logs_columnar,
+    export_auth_logs
 )
+from app.services.columnar import COLUMNAR_MIMETYPES
+from app.services.export import export_response
+from app.utils.pagination import is_truthy, json_response, parse_page_args, stream_json_array
 
 authlog_blueprint = Blueprint('authlog', __name__)
 
 @authlog_blueprint.route('/', methods=['GET'])
 def list_logs():
-    return jsonify(get_all_auth_logs())
+    try:
+        if is_truthy(request.args.get('stream', '')):
+            return stream_json_array(stream_auth_logs(request.args))
+        limit, cursor = parse_page_args(request.args)
+        return json_response(get_auth_logs_page(limit, cursor, request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@authlog_blueprint.route('/export', methods=['GET'])
+def download_auth_logs():
+    fmt = request.args.get('format', 'csv')
+    try:
+        chunks = export_auth_logs(fmt, request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return export_response(chunks, fmt, "auth_log_msgs_raw")
 
 @authlog_blueprint.route('/<string:auth_event_id>', methods=['GET'])
 def get_log(auth_event_id):
@@ -34,8 +56,29 @@ def delete_log(auth_event_id):
 
 @authlog_blueprint.route('/batch', methods=['POST'])
 def add_logs_batch():
+    if request.mimetype in COLUMNAR_MIMETYPES:
+        try:
+            result = create_auth_logs_columnar(request.stream, request.mimetype,
+                                               request.args.get('method'), request.args.get('on_conflict'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(result), 201
     data_list = request.get_json()
     if not isinstance(data_list, list):
         return jsonify({"error": "Expected a list of log entries"}), 400
-    return jsonify(create_auth_logs_batch(data_list)), 201
+    try:
+        return jsonify(create_auth_logs_batch(data_list, request.args.get('method'), request.args.get('on_conflict'),
+                                              request.args.get('chunk_size', type=int))), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
+@authlog_blueprint.route('/stream', methods=['POST'])
+def add_logs_stream():
+    if request.mimetype != 'application/x-ndjson':
+        return jsonify({"error": "Expected application/x-ndjson"}), 415
+    chunk_size = request.args.get('chunk_size', type=int)
+    try:
+        result = create_auth_logs_stream(request.stream, chunk_size, request.args.get('method'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result), 201
@@ -0,0 +1,13 @@
+from flask import Blueprint, request, jsonify
+from app.services.timeline import get_customer_timeline
+from app.utils.pagination import parse_page_args
+
+customer_blueprint = Blueprint('customer', __name__)
+
+@customer_blueprint.route('/<string:customer_id>/timeline', methods=['GET'])
+def get_timeline(customer_id):
+    try:
+        limit, cursor = parse_page_args(request.args)
+        return jsonify(get_customer_timeline(customer_id, limit, cursor, request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
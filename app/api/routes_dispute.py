@@ -1,18 +1,40 @@
 from flask import Blueprint, request, jsonify
 from app.services.dispute_service import (
-    get_all_disputes,
+    get_disputes_page,
+    stream_disputes,
     get_dispute_by_id,
     create_dispute,
     update_dispute,
     delete_dispute,
-    create_disputes_batch
+    create_disputes_batch,
+    create_disputes_stream,
+    create_disputes_columnar,
+    export_disputes
 )
+from app.services.columnar import COLUMNAR_MIMETYPES
+from app.services.export import export_response
+from app.utils.pagination import is_truthy, json_response, parse_page_args, stream_json_array
 
 dispute_blueprint = Blueprint('dispute', __name__)
 
 @dispute_blueprint.route('/', methods=['GET'])
 def list_disputes():
-    return jsonify(get_all_disputes())
+    try:
+        if is_truthy(request.args.get('stream', '')):
+            return stream_json_array(stream_disputes(request.args))
+        limit, cursor = parse_page_args(request.args)
+        return json_response(get_disputes_page(limit, cursor, request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@dispute_blueprint.route('/export', methods=['GET'])
+def download_disputes():
+    fmt = request.args.get('format', 'csv')
+    try:
+        chunks = export_disputes(fmt, request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return export_response(chunks, fmt, "dispute_msgs_raw")
 
 @dispute_blueprint.route('/<string:dispute_id>', methods=['GET'])
 def get_dispute(dispute_id):
@@ -34,7 +56,29 @@ def delete_dispute_route(dispute_id):
 
 @dispute_blueprint.route('/batch', methods=['POST'])
 def add_dispute_batch():
+    if request.mimetype in COLUMNAR_MIMETYPES:
+        try:
+            result = create_disputes_columnar(request.stream, request.mimetype,
+                                              request.args.get('method'), request.args.get('on_conflict'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(result), 201
     data_list = request.get_json()
     if not isinstance(data_list, list):
         return jsonify({"error": "Expected a list of dispute entries"}), 400
-    return jsonify(create_disputes_batch(data_list)), 201
+    try:
+        return jsonify(create_disputes_batch(data_list, request.args.get('method'), request.args.get('on_conflict'),
+                                             request.args.get('chunk_size', type=int))), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@dispute_blueprint.route('/stream', methods=['POST'])
+def add_disputes_stream():
+    if request.mimetype != 'application/x-ndjson':
+        return jsonify({"error": "Expected application/x-ndjson"}), 415
+    chunk_size = request.args.get('chunk_size', type=int)
+    try:
+        result = create_disputes_stream(request.stream, chunk_size, request.args.get('method'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result), 201
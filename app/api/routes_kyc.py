@@ -1,18 +1,40 @@
 from flask import Blueprint, request, jsonify
 from app.services.kyc_service import (
-    get_all_kyc_msgs,
+    get_kyc_msgs_page,
+    stream_kyc_msgs,
     get_kyc_msg_by_id,
     create_kyc_msg,
     update_kyc_msg,
     delete_kyc_msg,
-    create_kyc_batch
+    create_kyc_batch,
+    create_kyc_stream,
+    create_kyc_columnar,
+    export_kyc_msgs
 )
+from app.services.columnar import COLUMNAR_MIMETYPES
+from app.services.export import export_response
+from app.utils.pagination import is_truthy, json_response, parse_page_args, stream_json_array
 
 kyc_blueprint = Blueprint('kyc', __name__)
 
 @kyc_blueprint.route('/', methods=['GET'])
 def list_kyc():
-    return jsonify(get_all_kyc_msgs())
+    try:
+        if is_truthy(request.args.get('stream', '')):
+            return stream_json_array(stream_kyc_msgs(request.args))
+        limit, cursor = parse_page_args(request.args)
+        return json_response(get_kyc_msgs_page(limit, cursor, request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@kyc_blueprint.route('/export', methods=['GET'])
+def download_kyc_msgs():
+    fmt = request.args.get('format', 'csv')
+    try:
+        chunks = export_kyc_msgs(fmt, request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return export_response(chunks, fmt, "kyc_msgs_raw")
 
 @kyc_blueprint.route('/<string:kyc_event_id>', methods=['GET'])
 def get_kyc(kyc_event_id):
@@ -32,7 +54,29 @@ def delete_kyc(kyc_event_id):
 
 @kyc_blueprint.route('/batch', methods=['POST'])
 def add_kyc_batch():
+    if request.mimetype in COLUMNAR_MIMETYPES:
+        try:
+            result = create_kyc_columnar(request.stream, request.mimetype,
+                                         request.args.get('method'), request.args.get('on_conflict'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(result), 201
     data = request.get_json()
     if not isinstance(data, list):
         return jsonify({"error": "Expected a list of KYC records"}), 400
-    return jsonify(create_kyc_batch(data)), 201
+    try:
+        return jsonify(create_kyc_batch(data, request.args.get('method'), request.args.get('on_conflict'),
+                                        request.args.get('chunk_size', type=int))), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@kyc_blueprint.route('/stream', methods=['POST'])
+def add_kyc_stream():
+    if request.mimetype != 'application/x-ndjson':
+        return jsonify({"error": "Expected application/x-ndjson"}), 415
+    chunk_size = request.args.get('chunk_size', type=int)
+    try:
+        result = create_kyc_stream(request.stream, chunk_size, request.args.get('method'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result), 201
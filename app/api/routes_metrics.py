@@ -0,0 +1,8 @@
+from flask import Blueprint, Response
+from app.services.telemetry import render_metrics
+
+metrics_blueprint = Blueprint('metrics', __name__)
+
+@metrics_blueprint.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,23 @@
+from flask import Blueprint, jsonify
+from app.services.dedup_filter import dedup_filter_stats
+from app.services.ops_service import pool_stats
+from app.services.record_cache import cache_stats
+from app.services.velocity import velocity_stats
+
+ops_blueprint = Blueprint('ops', __name__)
+
+@ops_blueprint.route('/cache', methods=['GET'])
+def get_cache_stats():
+    return jsonify(cache_stats())
+
+@ops_blueprint.route('/pool', methods=['GET'])
+def get_pool_stats():
+    return jsonify(pool_stats())
+
+@ops_blueprint.route('/dedup', methods=['GET'])
+def get_dedup_filter_stats():
+    return jsonify(dedup_filter_stats())
+
+@ops_blueprint.route('/velocity', methods=['GET'])
+def get_velocity_stats():
+    return jsonify(velocity_stats())
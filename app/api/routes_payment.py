@@ -1,18 +1,40 @@
 from flask import Blueprint, request, jsonify
 from app.services.payment_service import (
-    get_all_payments,
+    get_payments_page,
+    stream_payments,
     get_payment_by_id,
     create_payment,
     create_payments_batch,  # Import the batch creation function
     update_payment,
-    delete_payment
+    delete_payment,
+    create_payments_stream,
+    create_payments_columnar,
+    export_payments
 )
+from app.services.columnar import COLUMNAR_MIMETYPES
+from app.services.export import export_response
+from app.utils.pagination import is_truthy, json_response, parse_page_args, stream_json_array
 
 payment_blueprint = Blueprint('payment', __name__)
 
 @payment_blueprint.route('/', methods=['GET'])
 def list_payments():
-    return jsonify(get_all_payments())
+    try:
+        if is_truthy(request.args.get('stream', '')):
+            return stream_json_array(stream_payments(request.args))
+        limit, cursor = parse_page_args(request.args)
+        return json_response(get_payments_page(limit, cursor, request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@payment_blueprint.route('/export', methods=['GET'])
+def download_payments():
+    fmt = request.args.get('format', 'csv')
+    try:
+        chunks = export_payments(fmt, request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return export_response(chunks, fmt, "payment_msgs_raw")
 
 @payment_blueprint.route('/<string:message_id>', methods=['GET'])
 def get_payment(message_id):
@@ -27,12 +49,24 @@ def add_payment():
 def add_payments_batch():
     """
     API endpoint to create multiple payment records in a single batch.
+    Arrow IPC stream and Parquet bodies are validated and loaded column-wise.
     """
+    if request.mimetype in COLUMNAR_MIMETYPES:
+        try:
+            result = create_payments_columnar(request.stream, request.mimetype,
+                                              request.args.get('method'), request.args.get('on_conflict'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(result), 201
     data_list = request.get_json()
     if not isinstance(data_list, list):
         return jsonify({"error": "Invalid input. Expected a list of payment records."}), 400
 
-    result = create_payments_batch(data_list)
+    try:
+        result = create_payments_batch(data_list, request.args.get('method'), request.args.get('on_conflict'),
+                                       request.args.get('chunk_size', type=int))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     return jsonify(result), 201
 
 @payment_blueprint.route('/<string:message_id>', methods=['PUT'])
@@ -43,3 +77,14 @@ def modify_payment(message_id):
 @payment_blueprint.route('/<string:message_id>', methods=['DELETE'])
 def remove_payment(message_id):
     return jsonify(delete_payment(message_id))
+
+@payment_blueprint.route('/stream', methods=['POST'])
+def add_payments_stream():
+    if request.mimetype != 'application/x-ndjson':
+        return jsonify({"error": "Expected application/x-ndjson"}), 415
+    chunk_size = request.args.get('chunk_size', type=int)
+    try:
+        result = create_payments_stream(request.stream, chunk_size, request.args.get('method'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result), 201
@@ -0,0 +1,11 @@
+from flask import Blueprint, request, jsonify
+from app.services.rollups import query_rollup
+
+rollups_blueprint = Blueprint('rollups', __name__)
+
+@rollups_blueprint.route('/<string:name>', methods=['GET'])
+def get_rollup(name):
+    try:
+        return jsonify(query_rollup(name, request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
@@ -0,0 +1,11 @@
+from flask import Blueprint, request, jsonify
+from app.services.velocity import get_velocity
+
+velocity_blueprint = Blueprint('velocity', __name__)
+
+@velocity_blueprint.route('/', methods=['GET'])
+def get_counts():
+    try:
+        return jsonify(get_velocity(request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
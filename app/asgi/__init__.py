@@ -0,0 +1,57 @@
+"""
+Asyncio serving mode for the raw-message ingestion API.
+
+Serves the payment/authlog/dispute/kyc routes with the same URLs, validation and response
+bodies as the Flask blueprints, on Starlette with SQLAlchemy's asyncio engine (asyncpg).
+A worker keeps many requests in flight while they wait on PostgreSQL, instead of one (or
+GUNICORN_THREADS) per sync worker. Run it with::
+
+    SERVER_MODE=asgi gunicorn -c gunicorn.conf.py "app.asgi:create_asgi_app()"
+
+The auth, ops and /metrics endpoints, the GET-by-id cache, group commit and request
+profiling stay on the sync server. So do three /batch features: chunked commit
+(``?chunk_size=``, rejected with a 400), Arrow/Parquet bodies (rejected with a 415) and the
+duplicate-key pre-check, so with DEDUP_FILTER_ENABLED a stored key fails the whole batch
+("Failed to save batch") instead of being reported per row. Writes still send the ``rows_written``/``rows_inserted``
+notifications after commit, to the same receivers (cache invalidation, duplicate-key
+filter, velocity counters, rollups), hosted by a Flask app built from the same config.
+"""
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+
+from app import create_app
+from app.asgi.db import create_engine
+from app.asgi.entities import ENTITIES
+from app.asgi.routes import entity_routes, json_response
+from app.config.settings import get_config
+from app.models import db
+
+
+def load_config():
+    """The sync app's Config as a dict, the way Flask's ``config.from_object`` reads it."""
+    config = get_config()
+    return {key: getattr(config, key) for key in dir(config) if key.isupper()}
+
+
+async def _bad_request(request, exc):
+    return json_response({"error": str(exc)}, 400)
+
+
+def create_asgi_app(config=None):
+    config = config or load_config()
+    engine = create_engine(config["SQLALCHEMY_DATABASE_URI"])
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await engine.dispose()
+        with app.state.flask_app.app_context():
+            db.engine.dispose()
+
+    app = Starlette(routes=[entity_routes(entity) for entity in ENTITIES],
+                    exception_handlers={ValueError: _bad_request}, lifespan=lifespan)
+    app.state.engine = engine
+    app.state.config = config
+    app.state.flask_app = create_app(config)
+    return app
@@ -0,0 +1,44 @@
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config.pool import pool_settings
+
+# Sync driver URL prefix -> asyncio driver used by the ASGI server.
+_ASYNC_DRIVERS = {
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url):
+    """Rewrite DATABASE_URL for the asyncio driver (asyncpg for PostgreSQL)."""
+    scheme, sep, rest = url.partition("://")
+    if scheme in _ASYNC_DRIVERS.values():
+        return url
+    if scheme not in _ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver configured for '{scheme}'")
+    return f"{_ASYNC_DRIVERS[scheme]}{sep}{rest}"
+
+
+def create_engine(database_url):
+    """
+    Async engine for ``database_url``, sized by the same DB_POOL_PROFILE as the sync server.
+
+    With asyncio, one process keeps many requests in flight, so the pool size caps database
+    concurrency per process and pool_timeout bounds how long a request queues for a connection.
+    """
+    url = async_database_url(database_url)
+    if not url.startswith("postgresql"):
+        return create_async_engine(url)
+    settings = pool_settings()
+    options = {
+        "pool_size": settings["pool_size"],
+        "max_overflow": settings["max_overflow"],
+        "pool_timeout": settings["pool_timeout"],
+        "pool_recycle": settings["pool_recycle"],
+        "pool_pre_ping": settings["pool_pre_ping"],
+    }
+    if settings["statement_timeout_ms"]:
+        options["connect_args"] = {"server_settings": {"statement_timeout": str(settings["statement_timeout_ms"])}}
+    return create_async_engine(url, **options)
+
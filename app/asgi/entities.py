@@ -0,0 +1,57 @@
+from sqlalchemy import inspect
+
+from app.models.auth_log_msg import AuthLogMessage
+from app.models.dispute_msg import DisputeMessage
+from app.models.kyc_msg import KYCMessage
+from app.models.payment_msg import PaymentMessage
+from app.services import auth_service, dispute_service, kyc_service, payment_service
+from app.services.validation import get_validator
+
+
+def _payment_batch_result(inserted, failed_records):
+    return {"success_count": inserted, "failure_count": len(failed_records), "failed_records": failed_records}
+
+
+def _message_batch_result(template):
+    def result(inserted, failed_records):
+        body = {"message": template.format(inserted)}
+        if failed_records:
+            body["failed_records"] = failed_records
+        return body
+    return result
+
+
+class Entity:
+    """
+    One raw-message resource served by the ASGI app.
+
+    List queries, keyset order and the row serializer come from the entity's sync service
+    module, and payloads go through the same compiled validator, so both servers validate,
+    filter, page and encode identically. Validated rows carry Python values (datetimes,
+    floats), which asyncpg's binary parameters need.
+    """
+
+    def __init__(self, prefix, model, service, list_error, batch_result):
+        self.prefix = prefix
+        self.model = model
+        self.table = model.__table__
+        self.pk = self.table.c[inspect(model).primary_key[0].key]
+        self.list_error = list_error
+        self.list_query = service.list_query
+        self.key_columns = service.KEYSET
+        self.serializer = service.serializer
+        self.validator = get_validator(model)
+        self.batch_result = batch_result
+
+
+# Same URL prefixes and batch response shapes as the Flask blueprints.
+ENTITIES = (
+    Entity("/api/payment", PaymentMessage, payment_service,
+           "Invalid input. Expected a list of payment records.", _payment_batch_result),
+    Entity("/api/authlog", AuthLogMessage, auth_service, "Expected a list of log entries",
+           _message_batch_result("{} log(s) inserted successfully")),
+    Entity("/api/dispute", DisputeMessage, dispute_service, "Expected a list of dispute entries",
+           _message_batch_result("{} dispute(s) inserted successfully")),
+    Entity("/api/kyc", KYCMessage, kyc_service, "Expected a list of KYC records",
+           _message_batch_result("{} KYC records inserted successfully")),
+)
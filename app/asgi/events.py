@@ -0,0 +1,18 @@
+from starlette.concurrency import run_in_threadpool
+
+
+async def notify(app, send, *args):
+    """
+    Run a write notification (``app.services.events.notify_*``) after its commit.
+
+    The receivers (record cache, duplicate-key filter, velocity counters, rollups, metrics)
+    are the sync server's: they run inside the Flask app the ASGI app keeps for them, on a
+    worker thread, since some of them query or write the database.
+    """
+    flask_app = app.state.flask_app
+
+    def run():
+        with flask_app.app_context():
+            send(*args)
+
+    await run_in_threadpool(run)
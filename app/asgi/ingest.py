@@ -0,0 +1,139 @@
+import json
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.asgi.events import notify
+from app.services.events import notify_rows_inserted, notify_rows_upserted
+from app.services.ingest import WRITE_METHODS, normalize_row
+from app.services.upsert import check_conflict_action, upsert_rows
+from app.services.validation import get_validator
+
+try:
+    from asyncpg import PostgresError
+except ImportError:  # asyncpg is only needed for PostgreSQL
+    PostgresError = SQLAlchemyError
+
+# asyncpg's COPY runs on the raw driver connection, so its errors are not wrapped by SQLAlchemy.
+DB_ERRORS = (SQLAlchemyError, PostgresError)
+
+
+async def aiter_lines(blocks):
+    """Split an async iterable of byte blocks (the request body) into lines, like ``iter_lines``."""
+    pending = []
+    async for block in blocks:
+        *lines, rest = block.split(b"\n")
+        if lines:
+            if pending:
+                pending.append(lines[0])
+                lines[0] = b"".join(pending)
+                pending = []
+            for line in lines:
+                yield line
+        if rest:
+            pending.append(rest)
+    if pending:
+        yield b"".join(pending)
+
+
+def resolve_write_method(config, dialect_name, method=None):
+    """Same rules as the sync server: ``copy`` degrades to plain inserts off PostgreSQL."""
+    method = method or config["BATCH_WRITE_METHOD"]
+    if method not in WRITE_METHODS:
+        raise ValueError(f"Unknown write method '{method}', expected one of {', '.join(WRITE_METHODS)}")
+    if method == "copy" and dialect_name != "postgresql":
+        return "orm"
+    return method
+
+
+def validate_rows(entity, data_list):
+    """Validate and coerce each record with the sync paths' compiled validator, collecting rejects."""
+    return get_validator(entity.model).validate_batch(data_list)
+
+
+async def write_rows(conn, entity, rows, method):
+    if not rows:
+        return
+    if method == "copy":
+        # asyncpg's binary COPY; runs inside the transaction already open on this connection.
+        columns = [column.key for column in entity.table.columns]
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            entity.table.name, schema_name=entity.table.schema, columns=columns,
+            records=[tuple(row[name] for name in columns) for row in rows])
+    else:
+        await conn.execute(insert(entity.table), rows)
+
+
+async def insert_batch(app, entity, data_list, method=None, on_conflict=None):
+    """
+    Async counterpart of ``create_*_batch``: one transaction for the valid rows of the batch.
+
+    A write the database rejects is rolled back and reported as {"error", "details"}, as
+    on the sync server.
+    """
+    engine, config = app.state.engine, app.state.config
+    if on_conflict:
+        check_conflict_action(on_conflict)
+    rows, failed = validate_rows(entity, data_list)
+    try:
+        async with engine.begin() as conn:
+            if on_conflict:
+                result = await conn.run_sync(lambda sync_conn: upsert_rows(entity.model, rows, on_conflict, sync_conn))
+            else:
+                await write_rows(conn, entity, rows, resolve_write_method(config, conn.dialect.name, method))
+    except DB_ERRORS as e:
+        return {"error": "Failed to save batch", "details": str(e)}
+    if on_conflict:
+        await notify(app, notify_rows_upserted, entity.model, rows, result)
+        result["failed_records"] = failed + result["failed_records"]
+        result["failure_count"] = len(result["failed_records"])
+        return result
+    await notify(app, notify_rows_inserted, entity.model, rows)
+    return entity.batch_result(len(rows), failed)
+
+
+async def _flush_chunk(app, entity, method, index, first_line, last_line, rows, rejected):
+    summary = {"chunk": index, "first_line": first_line, "last_line": last_line,
+               "received": len(rows) + len(rejected), "inserted": 0, "rejected": rejected}
+    try:
+        async with app.state.engine.begin() as conn:
+            await write_rows(conn, entity, rows, method)
+    except Exception as e:
+        summary["error"] = str(e)
+        return summary
+    summary["inserted"] = len(rows)
+    await notify(app, notify_rows_inserted, entity.model, rows)
+    return summary
+
+
+async def ingest_ndjson(app, entity, blocks, chunk_size=None, method=None):
+    """
+    Async counterpart of ``app.services.ingest.ingest_ndjson``: same chunking, per-chunk
+    transactions and summary, reading the body as it arrives.
+    """
+    engine, config = app.state.engine, app.state.config
+    method = resolve_write_method(config, engine.dialect.name, method)
+    chunk_size = max(1, min(chunk_size or config["INGEST_CHUNK_SIZE"], config["INGEST_CHUNK_SIZE_MAX"]))
+    chunks = []
+    rows, rejected = [], []
+    first_line = None
+    line_no = 0
+    async for line in aiter_lines(blocks):
+        line_no += 1
+        if first_line is None:
+            first_line = line_no
+        if line.strip():
+            try:
+                rows.append(normalize_row(entity.model, json.loads(line)))
+            except ValueError as e:
+                rejected.append({"line": line_no, "error": str(e)})
+        if line_no - first_line + 1 >= chunk_size:
+            chunks.append(await _flush_chunk(app, entity, method, len(chunks), first_line, line_no, rows, rejected))
+            rows, rejected, first_line = [], [], None
+    if first_line is not None:
+        chunks.append(await _flush_chunk(app, entity, method, len(chunks), first_line, line_no, rows, rejected))
+
+    inserted = sum(c["inserted"] for c in chunks)
+    failed = sum(c["received"] for c in chunks) - inserted
+    return {"inserted": inserted, "failed": failed, "chunks": chunks}
@@ -0,0 +1,119 @@
+import json
+
+from sqlalchemy import delete, select, update
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Mount, Route
+
+from app.asgi.events import notify
+from app.asgi.ingest import ingest_ndjson, insert_batch
+from app.services.columnar import COLUMNAR_MIMETYPES
+from app.services.events import notify_rows_inserted, notify_rows_written
+from app.utils.pagination import is_truthy, keyset_statement, parse_page_args, split_page
+
+# Byte-compatible with Flask's jsonify in production: compact, ASCII-escaped, sorted keys.
+_dumps = json.JSONEncoder(ensure_ascii=True, separators=(",", ":"), sort_keys=True).encode
+
+
+def json_response(body, status_code=200):
+    return Response(_dumps(body) + "\n", status_code=status_code, media_type="application/json")
+
+
+def _row_tuple(entity, row):
+    return tuple(row[column.key] for column in entity.serializer.columns)
+
+
+def entity_routes(entity):
+    """The payment/authlog/dispute/kyc blueprint routes for ``entity`` as Starlette routes."""
+
+    async def list_records(request):
+        engine, config = request.app.state.engine, request.app.state.config
+        stmt = entity.list_query(request.query_params)
+        if is_truthy(request.query_params.get("stream", "")):
+            stmt = stmt.order_by(*entity.key_columns).execution_options(yield_per=config["STREAM_YIELD_PER"])
+
+            async def generate():
+                yield "["
+                separator = ""
+                async with engine.connect() as conn:
+                    async for row in await conn.stream(stmt):
+                        yield separator + entity.serializer.dumps(row)
+                        separator = ","
+                yield "]"
+
+            return StreamingResponse(generate(), media_type="application/json")
+        limit, cursor = parse_page_args(request.query_params, config)
+        async with engine.connect() as conn:
+            rows = (await conn.execute(keyset_statement(stmt, entity.key_columns, limit, cursor))).all()
+        rows, next_cursor = split_page(rows, entity.key_columns, limit)
+        return Response(entity.serializer.dump_page(rows, next_cursor), media_type="application/json")
+
+    async def get_record(request):
+        stmt = select(*entity.serializer.columns).where(entity.pk == request.path_params["record_id"])
+        async with request.app.state.engine.connect() as conn:
+            row = (await conn.execute(stmt)).first()
+        return json_response(entity.serializer.to_dict(row) if row else {"error": "Not found"})
+
+    async def create_record(request):
+        row = entity.validator(await request.json())
+        async with request.app.state.engine.begin() as conn:
+            await conn.execute(entity.table.insert(), row)
+        await notify(request.app, notify_rows_inserted, entity.model, [row])
+        return json_response(entity.serializer.to_dict(_row_tuple(entity, row)), 201)
+
+    async def create_batch(request):
+        if request.headers.get("content-type", "").split(";")[0].strip() in COLUMNAR_MIMETYPES:
+            return json_response({"error": "Arrow/Parquet batches are only served by the sync server"}, 415)
+        if "chunk_size" in request.query_params:
+            return json_response({"error": "chunk_size is only supported by the sync server"}, 400)
+        data_list = await request.json()
+        if not isinstance(data_list, list):
+            return json_response({"error": entity.list_error}, 400)
+        result = await insert_batch(request.app, entity, data_list,
+                                    request.query_params.get("method"), request.query_params.get("on_conflict"))
+        return json_response(result, 201)
+
+    async def create_stream(request):
+        if request.headers.get("content-type", "").split(";")[0].strip() != "application/x-ndjson":
+            return json_response({"error": "Expected application/x-ndjson"}, 415)
+        chunk_size = request.query_params.get("chunk_size")
+        try:
+            chunk_size = int(chunk_size) if chunk_size else None
+        except ValueError:
+            chunk_size = None
+        result = await ingest_ndjson(request.app, entity, request.stream(), chunk_size,
+                                     request.query_params.get("method"))
+        return json_response(result, 201)
+
+    async def update_record(request):
+        data = await request.json()
+        # Like the sync services, keys that are not columns are ignored.
+        values = entity.validator.coerce(data)
+        record_id = request.path_params["record_id"]
+        if values:
+            stmt = (update(entity.table).where(entity.pk == record_id)
+                    .values(values).returning(*entity.serializer.columns))
+        else:
+            stmt = select(*entity.serializer.columns).where(entity.pk == record_id)
+        async with request.app.state.engine.begin() as conn:
+            row = (await conn.execute(stmt)).first()
+        if row and values:
+            await notify(request.app, notify_rows_written, entity.model, [record_id])
+        return json_response(entity.serializer.to_dict(row) if row else {"error": "Not found"})
+
+    async def delete_record(request):
+        stmt = delete(entity.table).where(entity.pk == request.path_params["record_id"])
+        async with request.app.state.engine.begin() as conn:
+            deleted = (await conn.execute(stmt)).rowcount
+        if deleted:
+            await notify(request.app, notify_rows_written, entity.model, [request.path_params["record_id"]])
+        return json_response({"message": "Deleted"} if deleted else {"error": "Not found"})
+
+    return Mount(entity.prefix, routes=[
+        Route("/", list_records, methods=["GET"]),
+        Route("/", create_record, methods=["POST"]),
+        Route("/batch", create_batch, methods=["POST"]),
+        Route("/stream", create_stream, methods=["POST"]),
+        Route("/{record_id}", get_record, methods=["GET"]),
+        Route("/{record_id}", update_record, methods=["PUT"]),
+        Route("/{record_id}", delete_record, methods=["DELETE"]),
+    ])
@@ -0,0 +1,43 @@
+import json
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.services.partition_service import RETENTION_ACTIONS, bootstrap_schema, maintain_partitions
+from app.services.rollups import refresh_rollups
+
+schema_cli = AppGroup("schema", help="Schema bootstrap and partition maintenance.")
+rollups_cli = AppGroup("rollups", help="Dashboard rollup maintenance.")
+
+
+@schema_cli.command("bootstrap")
+@click.option("--months-back", default=0, show_default=True, help="Monthly partitions to create before the current month.")
+def bootstrap_command(months_back):
+    """Create schema, tables, indexes and (when enabled) partitions."""
+    created = bootstrap_schema(months_back, current_app.config["PARTITION_MONTHS_AHEAD"])
+    click.echo(json.dumps(created, indent=2))
+
+
+@schema_cli.command("maintain")
+@click.option("--keep-months", type=int, default=None, help="Retention window; defaults to PARTITION_RETENTION_MONTHS (0 keeps everything).")
+@click.option("--action", type=click.Choice(RETENTION_ACTIONS), default=None, help="What to do with expired partitions.")
+@click.option("--export-dir", default=None, help="Where the export action writes partition dumps.")
+def maintain_command(keep_months, action, export_dir):
+    """Create upcoming monthly partitions and apply retention. Run from cron."""
+    config = current_app.config
+    report = maintain_partitions(
+        months_ahead=config["PARTITION_MONTHS_AHEAD"],
+        keep_months=config["PARTITION_RETENTION_MONTHS"] if keep_months is None else keep_months,
+        action=action or config["PARTITION_RETENTION_ACTION"],
+        export_dir=export_dir or config["PARTITION_EXPORT_DIR"],
+    )
+    click.echo(json.dumps(report, indent=2))
+
+
+@rollups_cli.command("refresh")
+@click.option("--since", type=click.DateTime(formats=["%Y-%m-%d"]), default=None, help="First day to recompute; defaults to the watermark minus ROLLUP_REFRESH_LOOKBACK_DAYS.")
+@click.option("--full", is_flag=True, help="Rebuild every day.")
+def refresh_command(since, full):
+    """Recompute recent rollup days from the raw tables. Run from cron."""
+    click.echo(json.dumps(refresh_rollups(since.date() if since else None, full), indent=2))
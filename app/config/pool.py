@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# Named pool sizings, selected with DB_POOL_PROFILE. Sizes are per gunicorn worker process.
+# A statement_timeout_ms of 0 leaves statements unbounded; maintenance work (rollup refreshes,
+# partition retention) lifts the timeout for its own transactions either way.
+POOL_PROFILES = {
+    # One request at a time per worker (sync workers): a small pool with headroom for streams.
+    # No statement timeout unless DB_STATEMENT_TIMEOUT_MS sets one.
+    "default": {"pool_size": 5, "max_overflow": 5, "pool_timeout": 30, "pool_recycle": 1800,
+                "pool_pre_ping": True, "statement_timeout_ms": 0},
+    # gthread workers under bursty traffic: more connections, fail fast instead of queueing.
+    "burst": {"pool_size": 10, "max_overflow": 20, "pool_timeout": 5, "pool_recycle": 1800,
+              "pool_pre_ping": True, "statement_timeout_ms": 15000},
+    # Bulk /batch and /stream ingest: few long-lived connections and room for long COPYs.
+    "ingest": {"pool_size": 4, "max_overflow": 2, "pool_timeout": 60, "pool_recycle": 3600,
+               "pool_pre_ping": False, "statement_timeout_ms": 600000},
+}
+
+# Environment overrides applied on top of the selected profile.
+_OVERRIDES = {
+    "DB_POOL_SIZE": ("pool_size", int),
+    "DB_MAX_OVERFLOW": ("max_overflow", int),
+    "DB_POOL_TIMEOUT": ("pool_timeout", float),
+    "DB_POOL_RECYCLE": ("pool_recycle", int),
+    "DB_POOL_PRE_PING": ("pool_pre_ping", lambda value: value.lower() in ("1", "true", "yes")),
+    "DB_STATEMENT_TIMEOUT_MS": ("statement_timeout_ms", int),
+}
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that measures how long each checkout waited for a connection.
+
+    The wait covers blocking on an exhausted pool as well as opening a new connection,
+    which is exactly the latency requests pay before their first query. Counters are
+    per process, so each gunicorn worker reports its own.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+    def stats(self):
+        with self._stats_lock:
+            checkouts, timeouts = self.checkouts, self.timeouts
+            wait_total, wait_max = self.wait_total, self.wait_max
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": self.overflow(),
+            "max_overflow": self._max_overflow,
+            "timeout_seconds": self._timeout,
+            "checkouts": checkouts,
+            "checkout_timeouts": timeouts,
+            "checkout_wait_avg_ms": round(wait_total / checkouts * 1000, 3) if checkouts else None,
+            "checkout_wait_max_ms": round(wait_max * 1000, 3),
+        }
+
+
+def pool_settings(profile=None, environ=os.environ):
+    """The selected profile (DB_POOL_PROFILE, default ``default``) with DB_* overrides applied."""
+    profile = profile or environ.get("DB_POOL_PROFILE", "default")
+    if profile not in POOL_PROFILES:
+        raise ValueError(f"Unknown pool profile '{profile}', expected one of {', '.join(POOL_PROFILES)}")
+    settings = dict(POOL_PROFILES[profile], profile=profile)
+    for variable, (key, parse) in _OVERRIDES.items():
+        if environ.get(variable):
+            settings[key] = parse(environ[variable])
+    return settings
+
+
+def engine_options(database_url, profile=None, environ=os.environ):
+    """
+    ``SQLALCHEMY_ENGINE_OPTIONS`` for ``database_url``.
+
+    Pool sizing and the server-side statement timeout only apply to PostgreSQL; other
+    backends (SQLite in tests) keep SQLAlchemy's defaults.
+    """
+    if not database_url or not database_url.startswith("postgresql"):
+        return {}
+    settings = pool_settings(profile, environ)
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings["pool_size"],
+        "max_overflow": settings["max_overflow"],
+        "pool_timeout": settings["pool_timeout"],
+        "pool_recycle": settings["pool_recycle"],
+        "pool_pre_ping": settings["pool_pre_ping"],
+    }
+    if settings["statement_timeout_ms"]:
+        options["connect_args"] = {"options": f"-c statement_timeout={settings['statement_timeout_ms']}"}
+    return options
+
+
+def lift_statement_timeout(connection):
+    """
+    Lift the pool's statement timeout for the rest of ``connection``'s current transaction.
+
+    For maintenance statements that scan whole tables (rollup refreshes, partition exports),
+    which the request-sized timeouts of the ``burst`` and ``ingest`` profiles would cancel.
+    """
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SET LOCAL statement_timeout = 0"))
@@ -1,9 +1,78 @@
 import os
+from app.config.pool import engine_options
 
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Pool sizing and statement timeout from DB_POOL_PROFILE (default/burst/ingest) plus DB_POOL_* overrides
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
     SECRET_KEY = os.getenv("SECRET_KEY", "supersecret")
+    # List endpoints: keyset page sizes and server-side cursor batch size for ?stream=true
+    PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", 100))
+    PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", 1000))
+    STREAM_YIELD_PER = int(os.getenv("STREAM_YIELD_PER", 1000))
+    # /export: rows fetched per server-side cursor round trip, and per CSV chunk / Parquet row group
+    EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 10000))
+    # NDJSON /stream ingest: rows committed per chunk (overridable per request up to the max)
+    INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", 1000))
+    INGEST_CHUNK_SIZE_MAX = int(os.getenv("INGEST_CHUNK_SIZE_MAX", 10000))
+    # Bulk write path for /batch and /stream: "orm" or "copy" (PostgreSQL COPY, falls back to orm elsewhere)
+    BATCH_WRITE_METHOD = os.getenv("BATCH_WRITE_METHOD", "orm")
+    # Threads per gunicorn worker (gunicorn.conf.py reads the same variable)
+    GUNICORN_THREADS = int(os.getenv("GUNICORN_THREADS", 1))
+    # Group commit for single-record POSTs: flush every N rows or T milliseconds, whichever comes first.
+    # Turned off at start-up when GUNICORN_THREADS is 1: a sync worker has one request in flight, so
+    # there is nothing to group and every insert would only wait out the interval
+    GROUP_COMMIT_ENABLED = os.getenv("GROUP_COMMIT_ENABLED", "false").lower() in ("1", "true", "yes")
+    GROUP_COMMIT_MAX_ROWS = int(os.getenv("GROUP_COMMIT_MAX_ROWS", 100))
+    GROUP_COMMIT_INTERVAL_MS = int(os.getenv("GROUP_COMMIT_INTERVAL_MS", 5))
+    # Monthly partition maintenance (DB_PARTITIONING=true): partitions created ahead, retention window and action.
+    # Partitioned tables are keyed on (id, timestamp), so ids are no longer unique in the database: upserts
+    # (on_conflict) look ids up first, plain inserts do not (see app/models/partitioning.py).
+    PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", 3))
+    PARTITION_RETENTION_MONTHS = int(os.getenv("PARTITION_RETENTION_MONTHS", 0))
+    PARTITION_RETENTION_ACTION = os.getenv("PARTITION_RETENTION_ACTION", "drop")
+    PARTITION_EXPORT_DIR = os.getenv("PARTITION_EXPORT_DIR", "partition_exports")
+    # Read-through cache for GET-by-id: per-process LRU+TTL, optionally backed by a shared tier ("local")
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 10000))
+    CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", 30))
+    CACHE_SHARED_BACKEND = os.getenv("CACHE_SHARED_BACKEND", "")
+    # Duplicate-key pre-check for orm/copy /batch writes: per-table scalable Bloom filter of stored keys,
+    # snapshotted to disk per worker (merged on start) so restarts skip the warm-up scan
+    DEDUP_FILTER_ENABLED = os.getenv("DEDUP_FILTER_ENABLED", "false").lower() in ("1", "true", "yes")
+    DEDUP_FILTER_CAPACITY = int(os.getenv("DEDUP_FILTER_CAPACITY", 1000000))
+    DEDUP_FILTER_ERROR_RATE = float(os.getenv("DEDUP_FILTER_ERROR_RATE", 0.001))
+    DEDUP_FILTER_SNAPSHOT_DIR = os.getenv("DEDUP_FILTER_SNAPSHOT_DIR", "")
+    DEDUP_FILTER_SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("DEDUP_FILTER_SNAPSHOT_INTERVAL_SECONDS", 60))
+    # Sliding-window velocity counters (failed logins, payments per key), updated on insert and
+    # rebuilt from the tables once per worker. Each worker also reads the rows other workers stored every
+    # sync interval (one indexed range query per table; 0 turns it off, e.g. with WEB_CONCURRENCY=1), so
+    # their inserts show up in its counts within that interval. Rows that arrive with an event time more
+    # than the lag before the previous sync are only counted by the worker that stored them
+    VELOCITY_ENABLED = os.getenv("VELOCITY_ENABLED", "false").lower() in ("1", "true", "yes")
+    VELOCITY_SYNC_INTERVAL_SECONDS = float(os.getenv("VELOCITY_SYNC_INTERVAL_SECONDS", 5))
+    VELOCITY_SYNC_LAG_SECONDS = float(os.getenv("VELOCITY_SYNC_LAG_SECONDS", 60))
+    # Daily rollups for dashboards: updated from every insert, reconciled by `flask rollups refresh`
+    # (days from the last refresh's watermark minus the lookback are recomputed; a batch landing during
+    # a refresh can be counted twice until the next one)
+    ROLLUPS_ENABLED = os.getenv("ROLLUPS_ENABLED", "false").lower() in ("1", "true", "yes")
+    ROLLUP_REFRESH_LOOKBACK_DAYS = int(os.getenv("ROLLUP_REFRESH_LOOKBACK_DAYS", 2))
+    # /metrics: per-worker snapshots written to METRICS_DIR every interval and summed on scrape
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+    METRICS_DIR = os.getenv("METRICS_DIR", "")
+    METRICS_FLUSH_INTERVAL_SECONDS = float(os.getenv("METRICS_FLUSH_INTERVAL_SECONDS", 1))
+    # Request profiling: on X-Profile: 1 (if allowed) or for a sampled fraction of requests
+    PROFILING_HEADER_ENABLED = os.getenv("PROFILING_HEADER_ENABLED", "false").lower() in ("1", "true", "yes")
+    PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 0))
+    PROFILING_SLOW_STATEMENTS = int(os.getenv("PROFILING_SLOW_STATEMENTS", 5))
+    PROFILING_DUMP_DIR = os.getenv("PROFILING_DUMP_DIR", "")
+    # gzip/zstd: request bodies on /batch and /stream (decoded size capped), responses per Accept-Encoding
+    REQUEST_DECOMPRESSED_MAX_BYTES = int(os.getenv("REQUEST_DECOMPRESSED_MAX_BYTES", 256 * 1024 * 1024))
+    RESPONSE_COMPRESSION_ENABLED = os.getenv("RESPONSE_COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+    RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", 1024))
+    RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", 6))
+    RESPONSE_ZSTD_LEVEL = int(os.getenv("RESPONSE_ZSTD_LEVEL", 3))
 
 def get_config():
     return Config()
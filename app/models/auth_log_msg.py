@@ -1,15 +1,22 @@
-import os
 from app.models import db  # <- get shared db instance
+from app.models.partitioning import PARTITIONING_ENABLED, raw_table_args
 
 
 class AuthLogMessage(db.Model):
     __tablename__ = "auth_log_msgs_raw"
-    __table_args__ = {"schema": os.getenv("DB_SCHEMA", "as-is-data-schema")}
+    # Every index ends with (timestamp, auth_event_id) so filtered pages are keyset range scans.
+    __table_args__ = raw_table_args(
+        db.Index("ix_auth_log_msgs_raw_ts", "timestamp", "auth_event_id"),
+        db.Index("ix_auth_log_msgs_raw_customer_ts", "customer_id", "timestamp", "auth_event_id"),
+        db.Index("ix_auth_log_msgs_raw_device_ts", "device_id", "timestamp", "auth_event_id"),
+        db.Index("ix_auth_log_msgs_raw_status_ts", "auth_status", "timestamp", "auth_event_id"),
+    )
+    __mapper_args__ = {"primary_key": ["auth_event_id"]}
 
     auth_event_id = db.Column(db.String, primary_key=True)
     customer_id = db.Column(db.String, nullable=False)
     device_id = db.Column(db.String, nullable=False)
-    timestamp = db.Column(db.DateTime, nullable=False)
+    timestamp = db.Column(db.DateTime, nullable=False, primary_key=PARTITIONING_ENABLED)
     auth_type = db.Column(db.String)
     ip_address = db.Column(db.String)
     channel = db.Column(db.String)
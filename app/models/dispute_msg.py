@@ -1,9 +1,16 @@
-import os
 from app.models import db
+from app.models.partitioning import PARTITIONING_ENABLED, raw_table_args
 
 class DisputeMessage(db.Model):
     __tablename__ = "dispute_msgs_raw"
-    __table_args__ = {"schema": os.getenv("DB_SCHEMA", "as-is-data-schema")}
+    # Every index ends with (timestamp, dispute_id) so filtered pages are keyset range scans.
+    __table_args__ = raw_table_args(
+        db.Index("ix_dispute_msgs_raw_ts", "timestamp", "dispute_id"),
+        db.Index("ix_dispute_msgs_raw_customer_ts", "customer_id", "timestamp", "dispute_id"),
+        db.Index("ix_dispute_msgs_raw_merchant_ts", "merchant_id", "timestamp", "dispute_id"),
+        db.Index("ix_dispute_msgs_raw_status_ts", "status", "timestamp", "dispute_id"),
+    )
+    __mapper_args__ = {"primary_key": ["dispute_id"]}
 
     dispute_id = db.Column(db.String, primary_key=True)
     transaction_id = db.Column(db.String, nullable=False)
@@ -11,7 +18,7 @@ class DisputeMessage(db.Model):
     merchant_id = db.Column(db.String, nullable=False)
     amount = db.Column(db.Float)
     currency = db.Column(db.String)
-    timestamp = db.Column(db.DateTime, nullable=False)
+    timestamp = db.Column(db.DateTime, nullable=False, primary_key=PARTITIONING_ENABLED)
     dispute_reason_code = db.Column(db.String)
     dispute_stage = db.Column(db.String)
     status = db.Column(db.String)
@@ -1,14 +1,21 @@
-import os
 from app.models import db
+from app.models.partitioning import PARTITIONING_ENABLED, raw_table_args
 
 class KYCMessage(db.Model):
     __tablename__ = "kyc_msgs_raw"
-    __table_args__ = {"schema": os.getenv("DB_SCHEMA", "as-is-data-schema")}
+    # Every index ends with (timestamp, kyc_event_id) so filtered pages are keyset range scans.
+    __table_args__ = raw_table_args(
+        db.Index("ix_kyc_msgs_raw_ts", "timestamp", "kyc_event_id"),
+        db.Index("ix_kyc_msgs_raw_customer_ts", "customer_id", "timestamp", "kyc_event_id"),
+        db.Index("ix_kyc_msgs_raw_device_ts", "device_id", "timestamp", "kyc_event_id"),
+        db.Index("ix_kyc_msgs_raw_status_ts", "verification_status", "timestamp", "kyc_event_id"),
+    )
+    __mapper_args__ = {"primary_key": ["kyc_event_id"]}
 
     kyc_event_id = db.Column(db.String, primary_key=True)
     customer_id = db.Column(db.String, nullable=False)
     device_id = db.Column(db.String, nullable=False)
-    timestamp = db.Column(db.DateTime, nullable=False)
+    timestamp = db.Column(db.DateTime, nullable=False, primary_key=PARTITIONING_ENABLED)
     kyc_type = db.Column(db.String)
     document_type = db.Column(db.String)
     document_number_hash = db.Column(db.String)
@@ -0,0 +1,24 @@
+import os
+
+DB_SCHEMA = os.getenv("DB_SCHEMA", "as-is-data-schema")
+# Native monthly RANGE (timestamp) partitioning of the *_msgs_raw tables (PostgreSQL only).
+PARTITIONING_ENABLED = os.getenv("DB_PARTITIONING", "false").lower() in ("1", "true", "yes")
+
+
+def raw_table_args(*indexes):
+    """
+    ``__table_args__`` for a raw message table.
+
+    With partitioning on, the table is declared ``PARTITION BY RANGE (timestamp)``;
+    PostgreSQL then requires ``timestamp`` in the primary key, which the models do via
+    ``primary_key=PARTITIONING_ENABLED`` while mapping identity on the id column alone.
+    The database then enforces unique (id, timestamp) only, not unique ids: upserts look
+    ids up before writing, but plain inserts and concurrent upserts of one new id with
+    different timestamps can store an id twice, and GET/PUT/DELETE by id then act on
+    either copy.
+    Indexes declared on the parent are created on every partition.
+    """
+    options = {"schema": DB_SCHEMA}
+    if PARTITIONING_ENABLED:
+        options["postgresql_partition_by"] = "RANGE (timestamp)"
+    return (*indexes, options)
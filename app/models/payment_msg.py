@@ -1,10 +1,18 @@
 from flask_sqlalchemy import SQLAlchemy
-import os
 from app.models import db 
+from app.models.partitioning import PARTITIONING_ENABLED, raw_table_args
 
 class PaymentMessage(db.Model):
     __tablename__ = "payment_msgs_raw"
-    __table_args__ = {"schema": os.getenv("DB_SCHEMA", "as-is-data-schema")}
+    # Payments page by message_id, so every index ends with it.
+    __table_args__ = raw_table_args(
+        db.Index("ix_payment_msgs_raw_card_id", "card_number_token", "message_id"),
+        db.Index("ix_payment_msgs_raw_merchant_id", "merchant_id", "message_id"),
+        db.Index("ix_payment_msgs_raw_device_id", "device_id", "message_id"),
+        db.Index("ix_payment_msgs_raw_status_id", "status", "message_id"),
+        db.Index("ix_payment_msgs_raw_ts", "timestamp", "message_id"),
+    )
+    __mapper_args__ = {"primary_key": ["message_id"]}
 
     message_id = db.Column(db.String, primary_key=True)
     card_number_token = db.Column(db.String)
@@ -22,6 +30,8 @@ class PaymentMessage(db.Model):
     status = db.Column(db.String)
     risk_score = db.Column(db.Float)
     ip_address = db.Column(db.String)
+    # Transaction time; required (and part of the key) when the table is partitioned by it.
+    timestamp = db.Column(db.DateTime, nullable=not PARTITIONING_ENABLED, primary_key=PARTITIONING_ENABLED)
 
     def to_dict(self):
         return {col.name: getattr(self, col.name) for col in self.__table__.columns}
@@ -0,0 +1,53 @@
+from app.models import db
+from app.models.partitioning import DB_SCHEMA
+
+# Daily summaries of the raw tables for dashboards. Dimension columns are part of the key,
+# so a missing value is stored as "" rather than NULL.
+
+
+class PaymentDailyRollup(db.Model):
+    __tablename__ = "payment_daily_rollup"
+    __table_args__ = {"schema": DB_SCHEMA}
+
+    day = db.Column(db.Date, primary_key=True)
+    merchant_id = db.Column(db.String, primary_key=True, default="")
+    mcc = db.Column(db.String, primary_key=True, default="")
+    country = db.Column(db.String, primary_key=True, default="")
+    channel = db.Column(db.String, primary_key=True, default="")
+    txn_count = db.Column(db.BigInteger, nullable=False, default=0)
+    declined_count = db.Column(db.BigInteger, nullable=False, default=0)
+    amount_total = db.Column(db.Float, nullable=False, default=0)
+    declined_amount = db.Column(db.Float, nullable=False, default=0)
+
+
+class DisputeDailyRollup(db.Model):
+    __tablename__ = "dispute_daily_rollup"
+    __table_args__ = {"schema": DB_SCHEMA}
+
+    day = db.Column(db.Date, primary_key=True)
+    dispute_reason_code = db.Column(db.String, primary_key=True, default="")
+    dispute_stage = db.Column(db.String, primary_key=True, default="")
+    dispute_count = db.Column(db.BigInteger, nullable=False, default=0)
+    evidence_count = db.Column(db.BigInteger, nullable=False, default=0)
+    amount_total = db.Column(db.Float, nullable=False, default=0)
+
+
+class KYCDailyRollup(db.Model):
+    __tablename__ = "kyc_daily_rollup"
+    __table_args__ = {"schema": DB_SCHEMA}
+
+    day = db.Column(db.Date, primary_key=True)
+    verification_status = db.Column(db.String, primary_key=True, default="")
+    document_type = db.Column(db.String, primary_key=True, default="")
+    event_count = db.Column(db.BigInteger, nullable=False, default=0)
+    failed_count = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class RollupWatermark(db.Model):
+    """Latest raw ``timestamp`` folded into a rollup by the last refresh."""
+    __tablename__ = "rollup_watermarks"
+    __table_args__ = {"schema": DB_SCHEMA}
+
+    rollup = db.Column(db.String, primary_key=True)
+    refreshed_through = db.Column(db.DateTime)
+    refreshed_at = db.Column(db.DateTime, nullable=False)
@@ -1,18 +1,58 @@
+from sqlalchemy import select
 from app.models import db
 from app.models.auth_log_msg import db, AuthLogMessage
+from app.services.batch_write import write_batch
+from app.services.columnar import ingest_columnar
+from app.services.events import notify_rows_inserted, notify_rows_written
+from app.services.export import export_chunks
+from app.services.group_commit import group_commit_enabled, submit_for_commit
+from app.services.ingest import ingest_ndjson
+from app.services.record_cache import cached_record
+from app.utils.filters import build_conditions
+from app.utils.pagination import iter_rows, keyset_page
+from app.utils.serializers import RowSerializer
 
-def get_all_auth_logs():
-    return [log.to_dict() for log in AuthLogMessage.query.all()]
+# Keyset order for list endpoints; the cursor carries these values of the last row served.
+KEYSET = (AuthLogMessage.__table__.c.timestamp, AuthLogMessage.__table__.c.auth_event_id)
+serializer = RowSerializer(AuthLogMessage.__table__)
+# Query-string filters accepted by the list endpoints, each backed by an index ending in KEYSET.
+_FILTERS = {
+    "customer_id": AuthLogMessage.__table__.c.customer_id,
+    "device_id": AuthLogMessage.__table__.c.device_id,
+    "auth_status": AuthLogMessage.__table__.c.auth_status,
+}
+_TIME_COLUMN = AuthLogMessage.__table__.c.timestamp
 
-def get_auth_log_by_id(auth_event_id):
+def list_query(filters):
+    return select(*serializer.columns).where(*build_conditions(filters, _FILTERS, _TIME_COLUMN))
+
+def get_auth_logs_page(limit, cursor=None, filters=None):
+    rows, next_cursor = keyset_page(list_query(filters), KEYSET, limit, cursor)
+    return serializer.dump_page(rows, next_cursor)
+
+def stream_auth_logs(filters=None):
+    return (serializer.dumps(row) for row in iter_rows(list_query(filters), KEYSET))
+
+def export_auth_logs(fmt, filters=None):
+    return export_chunks(list_query(filters), KEYSET, fmt)
+
+def _load_auth_log(auth_event_id):
     log = AuthLogMessage.query.get(auth_event_id)
-    return log.to_dict() if log else {"error": "Not found"}
+    return log.to_dict() if log else None
+
+def get_auth_log_by_id(auth_event_id):
+    log = cached_record(AuthLogMessage, auth_event_id, lambda: _load_auth_log(auth_event_id))
+    return log if log else {"error": "Not found"}
 
 def create_auth_log(data):
+    if group_commit_enabled():
+        return submit_for_commit(AuthLogMessage, data)
     log = AuthLogMessage(**data)
     db.session.add(log)
     db.session.commit()
-    return log.to_dict()
+    result = log.to_dict()
+    notify_rows_inserted(AuthLogMessage, [result])
+    return result
 
 def update_auth_log(auth_event_id, data):
     log = AuthLogMessage.query.get(auth_event_id)
@@ -22,6 +62,7 @@ def update_auth_log(auth_event_id, data):
         if hasattr(log, key):
             setattr(log, key, value)
     db.session.commit()
+    notify_rows_written(AuthLogMessage, [auth_event_id])
     return log.to_dict()
 
 def delete_auth_log(auth_event_id):
@@ -30,10 +71,21 @@ def delete_auth_log(auth_event_id):
         return {"error": "Not found"}
     db.session.delete(log)
     db.session.commit()
+    notify_rows_written(AuthLogMessage, [auth_event_id])
     return {"message": "Deleted"}
 
-def create_auth_logs_batch(data_list):
-    logs = [AuthLogMessage(**data) for data in data_list]
-    db.session.bulk_save_objects(logs)
-    db.session.commit()
-    return {"message": f"{len(logs)} log(s) inserted successfully"}
+def _batch_summary(written, failed_records):
+    result = {"message": f"{len(written)} log(s) inserted successfully"}
+    if failed_records:
+        result["failed_records"] = failed_records
+    return result
+
+def create_auth_logs_batch(data_list, method=None, on_conflict=None, chunk_size=None):
+    return write_batch(AuthLogMessage, data_list, _batch_summary, method, on_conflict, chunk_size)
+
+def create_auth_logs_stream(stream, chunk_size=None, method=None):
+    return ingest_ndjson(AuthLogMessage, stream, chunk_size, method)
+
+
+def create_auth_logs_columnar(stream, mimetype, method=None, on_conflict=None):
+    return ingest_columnar(AuthLogMessage, stream, mimetype, _batch_summary, method, on_conflict)
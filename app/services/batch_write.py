@@ -0,0 +1,61 @@
+from functools import partial
+
+from app.models import db
+from app.services.chunked_commit import resolve_commit_chunk_size, write_batch_in_chunks
+from app.services.dedup_filter import write_new_rows
+from app.services.events import notify_rows_inserted, notify_rows_upserted
+from app.services.ingest import copy_batch, insert_rows, resolve_write_method
+from app.services.profiling import phase
+from app.services.telemetry import observe_batch
+from app.services.upsert import check_conflict_action, upsert_rows
+from app.services.validation import get_validator
+
+
+def _validate_and_insert(model, data_list):
+    with phase("build"):
+        rows, failed_records = get_validator(model).validate_batch(data_list)
+    return lambda: (write_new_rows(model, data_list, rows, failed_records, insert_rows), failed_records)
+
+
+def write_batch(model, data_list, summarize, method=None, on_conflict=None, chunk_size=None):
+    """
+    Write a /batch payload of ``model`` rows the way the request asks, shared by every entity.
+
+    ``chunk_size`` (see resolve_commit_chunk_size) hands the batch to write_batch_in_chunks and
+    ``on_conflict`` the valid rows to upsert_rows, whose results are returned with the rejected
+    rows added. Otherwise the valid rows are COPYed or inserted in one transaction, skipping
+    stored keys, and the entity's ``summarize(written, failed_records)`` builds the response.
+    A write that fails is rolled back and reported as {"error", "details"}.
+
+    Raises:
+        ValueError: On an unknown write method or on_conflict action.
+    """
+    observe_batch(model, "batch", len(data_list))
+    chunk_size = resolve_commit_chunk_size(chunk_size)
+    if chunk_size:
+        return write_batch_in_chunks(model, data_list, method, on_conflict, chunk_size)
+    if on_conflict:
+        check_conflict_action(on_conflict)
+        with phase("build"):
+            rows, failed_records = get_validator(model).validate_batch(data_list)
+        write = partial(upsert_rows, model, rows, on_conflict)
+    elif resolve_write_method(method) == "copy":
+        write = partial(copy_batch, model, data_list)
+    else:
+        write = _validate_and_insert(model, data_list)
+
+    try:
+        with phase("flush"):
+            result = write()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return {"error": "Failed to save batch", "details": str(e)}
+    if on_conflict:
+        notify_rows_upserted(model, rows, result)
+        result["failed_records"] = failed_records + result["failed_records"]
+        result["failure_count"] = len(result["failed_records"])
+        return result
+    written, failed_records = result
+    notify_rows_inserted(model, written)
+    return summarize(written, failed_records)
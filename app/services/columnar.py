@@ -0,0 +1,254 @@
+import io
+import math
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, String, inspect
+
+from app.models import db
+from app.services.copy_loader import copy_from
+from app.services.dedup_filter import get_key_filter, write_new_keys
+from app.services.events import notify_rows_inserted, notify_rows_upserted, notify_rows_written, rows_inserted
+from app.services.ingest import insert_rows, resolve_write_method
+from app.services.profiling import phase
+from app.services.telemetry import observe_batch
+from app.services.upsert import check_conflict_action, upsert_rows
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # columnar ingest is optional
+    pa = None
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+ARROW_FILE = "application/vnd.apache.arrow.file"
+PARQUET = "application/vnd.apache.parquet"
+COLUMNAR_MIMETYPES = (ARROW_STREAM, ARROW_FILE, PARQUET, "application/x-parquet")
+
+
+def _arrow_type(column):
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, String):
+        return pa.string()
+    raise ValueError(f"Column '{column.key}' has no columnar mapping")
+
+
+def arrow_schema(table):
+    """Arrow schema matching ``table``'s columns, in table order."""
+    return pa.schema([pa.field(column.key, _arrow_type(column), nullable=column.nullable) for column in table.columns])
+
+
+def _cast_timestamps(values, target):
+    # Arrow parses naive and zone-qualified ISO strings with different types, so each kind
+    # is cast on its own and the zone-qualified ones are stored as naive UTC (as parse_timestamp does).
+    # The offset must follow a time, or the day of a date-only value ("2024-06-01") would match.
+    aware = pc.match_substring_regex(values, r"[T ]\d\d:\d\d(:\d\d(\.\d+)?)?([Zz]|[+-]\d\d(:?\d\d)?)$")
+    naive_values = pc.cast(pc.if_else(aware, None, values), target)
+    aware_values = pc.cast(pc.cast(pc.if_else(aware, values, None), pa.timestamp("us", tz="UTC")), target)
+    return pc.if_else(aware, aware_values, naive_values)
+
+
+def _cast_column(column, values, target):
+    if values.type == target:
+        return values
+    try:
+        if pa.types.is_timestamp(target) and (pa.types.is_string(values.type) or pa.types.is_large_string(values.type)):
+            return _cast_timestamps(values, target)
+        return pc.cast(values, target)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        raise ValueError(f"Column '{column.key}': {e}")
+
+
+def read_batches(stream, mimetype):
+    """Record batches of an Arrow IPC stream (read incrementally), Arrow file or Parquet body."""
+    if pa is None:
+        raise ValueError("Columnar ingest requires pyarrow")
+    try:
+        if mimetype == ARROW_STREAM:
+            yield from pa_ipc.open_stream(stream)
+            return
+        body = pa.BufferReader(stream.read())
+        if mimetype == ARROW_FILE:
+            reader = pa_ipc.open_file(body)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i)
+        else:
+            yield from pq.ParquetFile(body).iter_batches()
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Invalid {mimetype} body: {e}")
+
+
+def validate_batch(model, batch, offset=0):
+    """
+    Conform a record batch to ``model``'s table, one vectorized check per column.
+
+    Unknown columns reject the request, missing ones become nulls, and each column is
+    cast to the model's type as a whole. Rows with nulls in NOT NULL columns, or nan/inf
+    in float columns, are split off and reported by their row number in the request.
+
+    Returns:
+        tuple: (pyarrow.Table in table column order, list of {"row", "error"})
+    """
+    columns = model.__table__.columns
+    unknown = set(batch.schema.names) - set(columns.keys())
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    arrays = []
+    for column in columns:
+        target = _arrow_type(column)
+        if column.key in batch.schema.names:
+            arrays.append(_cast_column(column, batch.column(column.key), target))
+        else:
+            arrays.append(pa.nulls(batch.num_rows, target))
+    table = pa.Table.from_arrays(arrays, names=columns.keys())
+
+    required = [column.key for column in columns if not column.nullable]
+    floats = [column.key for column in columns if isinstance(column.type, Float)]
+    invalid = None
+    for mask in ([pc.is_null(table.column(name)) for name in required]
+                 + [pc.invert(pc.is_finite(table.column(name))) for name in floats]):
+        invalid = mask if invalid is None else pc.or_kleene(invalid, mask)
+    rejected = []
+    if invalid is not None and pc.any(invalid).as_py():
+        for index in pc.indices_nonzero(pc.fill_null(invalid, False)).to_pylist():
+            absent = [name for name in required if table.column(name)[index].as_py() is None]
+            errors = [f"Missing required field(s): {', '.join(absent)}"] if absent else []
+            errors += [f"Invalid value for '{name}': expected a finite number" for name in floats
+                       if not math.isfinite(table.column(name)[index].as_py() or 0.0)]
+            rejected.append({"row": offset + index, "error": "; ".join(errors)})
+        table = table.filter(pc.invert(pc.fill_null(invalid, False)))
+    return table, rejected
+
+
+def copy_table(model, table):
+    """COPY an Arrow table through pyarrow's CSV writer; runs in the session transaction."""
+    buffer = io.BytesIO()
+    pa_csv.write_csv(table, buffer)
+    buffer.seek(0)
+    preparer = db.session.get_bind().dialect.identifier_preparer
+    sql = "COPY {} ({}) FROM STDIN WITH (FORMAT csv, HEADER true)".format(
+        preparer.format_table(model.__table__),
+        ", ".join(preparer.quote(name) for name in table.column_names),
+    )
+    copy_from(sql, buffer)
+
+
+def _write_table(model, table, rows, write):
+    if write == "copy":
+        copy_table(model, table)
+    else:
+        insert_rows(model, rows)
+
+
+def _write_new(model, table, rows, write, row_numbers, failed_records):
+    """
+    Write ``table`` (and its ``rows`` dicts, if materialized), skipping stored keys as write_new_rows does.
+
+    Duplicates are appended to ``failed_records`` by their ``row_numbers`` in the body.
+
+    Returns:
+        tuple: (the table written, its rows or None)
+    """
+    key_filter = get_key_filter(model)
+    if key_filter is None:
+        _write_table(model, table, rows, write)
+        return table, rows
+
+    def take(positions):
+        return table.take(pa.array(positions, pa.int64())), [rows[i] for i in positions] if rows is not None else None
+
+    name = key_filter.column.key
+    positions, duplicates = write_new_keys(key_filter, table.column(name).to_pylist(),
+                                           lambda kept: _write_table(model, *take(kept), write))
+    failed_records.extend({"row": row_numbers[i], "error": f"Duplicate {name} '{key}'"} for i, key in duplicates)
+    return take(positions)
+
+
+def ingest_columnar(model, stream, mimetype, summarize, method=None, on_conflict=None):
+    """
+    Load an Arrow/Parquet batch body into ``model``'s table in one transaction.
+
+    Rows never become JSON or ORM objects: each record batch is validated as columns and
+    written with COPY (``copy`` on PostgreSQL) or one Core executemany (``orm``), skipping
+    keys the duplicate-key filter finds stored. With ``on_conflict`` the rows go through the
+    same upsert as JSON batches.
+
+    There is no chunked commit: the body is one transaction, as it was before /batch could
+    be chunked. Clients that want partial commits send several bodies, or NDJSON to /stream.
+
+    Returns:
+        dict: The entity's ``summarize(written, failed_records)``, as for JSON batches (the
+        upsert result with ``on_conflict``); rejected rows are reported as {"row", "error"}
+        with their position in the body.
+    """
+    if on_conflict:
+        check_conflict_action(on_conflict)
+    write = "upsert" if on_conflict else resolve_write_method(method)
+    pk = inspect(model).primary_key[0].key
+    batches = read_batches(stream, mimetype)
+    written, failed_records, received = [], [], 0
+    upserted = None
+    # Row dicts are only materialized for rows_inserted receivers (e.g. the velocity counters).
+    rows = [] if rows_inserted.receivers else None
+    try:
+        while True:
+            with phase("parse"):
+                batch = next(batches, None)
+            if batch is None:
+                break
+            with phase("build"):
+                table, rejected = validate_batch(model, batch, received)
+            rejected_rows = {failure["row"] for failure in rejected}
+            row_numbers = [row for row in range(received, received + batch.num_rows) if row not in rejected_rows]
+            received += batch.num_rows
+            failed_records.extend(rejected)
+            if not table.num_rows:
+                continue
+            with phase("flush"):
+                batch_rows = table.to_pylist() if write != "copy" or rows is not None else None
+                if write == "upsert":
+                    upserted = _merge_upserts(upserted, upsert_rows(model, batch_rows, on_conflict))
+                else:
+                    table, batch_rows = _write_new(model, table, batch_rows, write, row_numbers, failed_records)
+            written.extend(table.column(pk).to_pylist())
+            if rows is not None:
+                rows.extend(batch_rows)
+        db.session.commit()
+    except ValueError:
+        db.session.rollback()
+        raise
+    except Exception as e:
+        db.session.rollback()
+        return {"error": "Failed to save batch", "details": str(e)}
+    finally:
+        observe_batch(model, "columnar", received)
+
+    if upserted is not None:
+        notify_rows_upserted(model, rows or [], upserted)
+        upserted["failed_records"] = failed_records + upserted["failed_records"]
+        upserted["failure_count"] = len(upserted["failed_records"])
+        return upserted
+    if rows is not None:
+        notify_rows_inserted(model, rows)
+    else:
+        notify_rows_written(model, written)
+    failed_records.sort(key=lambda failure: failure["row"])
+    return summarize(written, failed_records)
+
+
+def _merge_upserts(total, result):
+    if total is None:
+        return result
+    for key in ("inserted", "updated", "duplicate", "failed_records"):
+        total[key] += result[key]
+    for key in ("inserted", "updated", "duplicate", "failure"):
+        total[f"{key}_count"] += result[f"{key}_count"]
+    return total
@@ -0,0 +1,106 @@
+from datetime import date, datetime
+
+from sqlalchemy.exc import DBAPIError
+
+from app.models import db
+
+# COPY text format: tab-separated, \N for NULL, backslash escapes for control characters.
+_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+_LINES_PER_READ = 500
+
+
+def supports_copy():
+    """COPY FROM STDIN is only available on PostgreSQL through psycopg2."""
+    dialect = db.session.get_bind().dialect
+    return dialect.name == "postgresql" and dialect.driver == "psycopg2"
+
+
+def _copy_expert(cursor, sql, source):
+    cursor.copy_expert(sql, source)
+
+
+def copy_from(sql, source):
+    """
+    Run ``COPY ... FROM STDIN`` reading ``source`` on the session's connection.
+
+    The raw driver cursor raises driver exceptions; they are re-raised as SQLAlchemy's
+    (e.g. IntegrityError for a duplicate key), so callers handle COPY failures like any
+    other statement's: savepoint fallbacks, chunk bisection and batch error reporting.
+    """
+    connection = db.session.connection()
+    dialect = connection.dialect
+    dbapi_connection = connection.connection
+    cursor = dbapi_connection.cursor()
+    try:
+        _copy_expert(cursor, sql, source)
+        return
+    except dialect.loaded_dbapi.Error as e:
+        error, invalidated = e, dialect.is_disconnect(e, dbapi_connection, cursor)
+    finally:
+        cursor.close()
+    if invalidated:
+        connection.invalidate(error)
+    raise DBAPIError.instance(sql, None, error, dialect.loaded_dbapi.Error, dialect=dialect,
+                              connection_invalidated=invalidated) from error
+
+
+def _format_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value).translate(_ESCAPES)
+
+
+class _LineReader:
+    """File-like adapter over an iterator of text lines, as consumed by ``copy_expert``."""
+
+    def __init__(self, lines):
+        self._lines = lines
+        self._buffer = ""
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            batch = [line for _, line in zip(range(_LINES_PER_READ), self._lines)]
+            if not batch:
+                break
+            self._buffer += "".join(batch)
+        if size < 0:
+            data, self._buffer = self._buffer, ""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+
+def copy_rows(model, rows, columns=None):
+    """
+    Stream row dicts into ``model``'s table with ``COPY ... FROM STDIN``.
+
+    Rows are encoded lazily as they are read by psycopg2, so no ORM objects and no
+    intermediate copy of the batch are built. Runs inside the current session
+    transaction; the caller commits.
+
+    Returns:
+        int: Number of rows copied.
+    """
+    columns = columns or model.__table__.columns.keys()
+    preparer = db.session.get_bind().dialect.identifier_preparer
+    sql = "COPY {} ({}) FROM STDIN".format(
+        preparer.format_table(model.__table__),
+        ", ".join(preparer.quote(name) for name in columns),
+    )
+    count = 0
+
+    def lines():
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield "\t".join(_format_value(row.get(name)) for name in columns) + "\n"
+
+    copy_from(sql, _LineReader(lines()))
+    return count
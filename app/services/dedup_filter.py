@@ -0,0 +1,306 @@
+import atexit
+import os
+import threading
+import time
+
+from flask import current_app, has_app_context
+from sqlalchemy import inspect, select
+from sqlalchemy.exc import IntegrityError
+
+from app.models import db
+from app.models.auth_log_msg import AuthLogMessage
+from app.models.dispute_msg import DisputeMessage
+from app.models.kyc_msg import KYCMessage
+from app.models.payment_msg import PaymentMessage
+from app.services.events import rows_written
+from app.services.upsert import existing_keys
+from app.services.validation import kept_indexes
+from app.utils.bloom import ScalableBloomFilter
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+FILTERED_MODELS = (PaymentMessage, AuthLogMessage, DisputeMessage, KYCMessage)
+_WARMUP_YIELD_PER = 10000
+
+
+class KeyFilter:
+    """
+    Duplicate-key pre-check for one table: a scalable Bloom filter of its stored keys.
+
+    A key the filter has never seen is certainly new; a key it may have seen needs an
+    exact lookup. Until the filter is loaded from a snapshot or warmed up from the table,
+    every key counts as possibly seen, so results are exact from the first request.
+
+    Each worker only learns the keys it writes, so each one snapshots to its own
+    ``<table>.<pid>.bloom`` and a starting worker loads the union of all of them.
+    """
+
+    def __init__(self, model, capacity, error_rate, snapshot_dir=""):
+        self.model = model
+        self.column = model.__table__.c[inspect(model).primary_key[0].key]
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.snapshot_dir = snapshot_dir
+        self.bloom = None
+        self._pending = []
+        self._lock = threading.Lock()
+        self.counters = {"checked": 0, "definitely_new": 0, "exact_checks": 0, "duplicates": 0,
+                         "stale_fallbacks": 0}
+
+    @property
+    def ready(self):
+        return self.bloom is not None
+
+    def might_contain(self, key):
+        bloom = self.bloom
+        return bloom is None or key in bloom
+
+    @property
+    def snapshot_path(self):
+        if not self.snapshot_dir:
+            return None
+        return os.path.join(self.snapshot_dir, f"{self.model.__tablename__}.{os.getpid()}.bloom")
+
+    def count(self, **increments):
+        with self._lock:
+            for name, increment in increments.items():
+                self.counters[name] += increment
+
+    def add(self, keys):
+        with self._lock:
+            if self.bloom is None:
+                self._pending.extend(keys)
+            else:
+                self.bloom.update(keys)
+
+    def _install(self, bloom):
+        with self._lock:
+            bloom.update(self._pending)
+            self._pending = []
+            self.bloom = bloom
+
+    def _snapshot_paths(self):
+        """Every worker's snapshot of this table, as {pid: path}."""
+        prefix, suffix = f"{self.model.__tablename__}.", ".bloom"
+        paths = {}
+        for name in os.listdir(self.snapshot_dir):
+            pid = name[len(prefix):-len(suffix)]
+            if name.startswith(prefix) and name.endswith(suffix) and pid.isdigit():
+                paths[int(pid)] = os.path.join(self.snapshot_dir, name)
+        return paths
+
+    def load_snapshot(self):
+        """
+        Load the union of every worker's snapshot.
+
+        The union is written back as this worker's snapshot, and the snapshots of
+        processes that have exited are removed once folded in.
+        """
+        if not self.snapshot_dir:
+            return False
+        paths = self._snapshot_paths()
+        bloom = None
+        for path in paths.values():
+            try:
+                snapshot = ScalableBloomFilter.load(path)
+                if bloom is None:
+                    bloom = snapshot
+                else:
+                    bloom.union(snapshot)
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring Bloom filter snapshot %s: %s", path, e)
+        if bloom is None:
+            return False
+        self._install(bloom)
+        try:
+            self.write_snapshot()
+        except OSError as e:
+            logger.warning("Could not snapshot %s: %s", self.snapshot_path, e)
+            return True
+        for pid, path in paths.items():
+            if pid != os.getpid() and not _is_running(pid):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        return True
+
+    def warm_up(self):
+        """Build the filter from every key in the table (one server-side cursor scan)."""
+        started = time.perf_counter()
+        bloom = ScalableBloomFilter(self.capacity, self.error_rate)
+        with db.engine.connect() as conn:
+            result = conn.execution_options(yield_per=_WARMUP_YIELD_PER).execute(select(self.column))
+            for key in result.scalars():
+                bloom.add(key)
+        self._install(bloom)
+        logger.info("Warmed %s duplicate-key filter with %d keys in %.1fs",
+                    self.model.__tablename__, len(bloom), time.perf_counter() - started)
+        self.write_snapshot()
+
+    def write_snapshot(self):
+        if self.snapshot_path and self.bloom is not None:
+            self.bloom.dump(self.snapshot_path)
+
+    def stats(self):
+        with self._lock:
+            stats = {"ready": self.ready, **self.counters}
+        if self.bloom is not None:
+            stats.update(self.bloom.stats())
+        return stats
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class DuplicateKeyFilters:
+    """The per-table key filters of one app, started once per process (after any fork)."""
+
+    def __init__(self, app, models=FILTERED_MODELS):
+        config = app.config
+        self.app = app
+        self.snapshot_interval = config["DEDUP_FILTER_SNAPSHOT_INTERVAL_SECONDS"]
+        snapshot_dir = config["DEDUP_FILTER_SNAPSHOT_DIR"]
+        if snapshot_dir:
+            os.makedirs(snapshot_dir, exist_ok=True)
+        self.filters = {model: KeyFilter(model, config["DEDUP_FILTER_CAPACITY"], config["DEDUP_FILTER_ERROR_RATE"],
+                                         snapshot_dir)
+                        for model in models}
+        self._pid = None
+
+    def ensure_started(self, background=True):
+        """Load snapshots, else warm up from the tables; cheap enough to call on every request."""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        cold = [key_filter for key_filter in self.filters.values() if not key_filter.load_snapshot()]
+        if background:
+            threading.Thread(target=self._warm_up, args=(cold,), name="dedup-warmup", daemon=True).start()
+            if self.snapshot_interval > 0:
+                threading.Thread(target=self._snapshot_forever, name="dedup-snapshot", daemon=True).start()
+            atexit.register(self.write_snapshots)
+        else:
+            self._warm_up(cold)
+
+    def _warm_up(self, key_filters):
+        with self.app.app_context():
+            for key_filter in key_filters:
+                try:
+                    key_filter.warm_up()
+                except Exception:
+                    logger.exception("Warm-up of the %s duplicate-key filter failed; keys stay exact-checked",
+                                     key_filter.model.__tablename__)
+
+    def _snapshot_forever(self):
+        while True:
+            time.sleep(self.snapshot_interval)
+            self.write_snapshots()
+
+    def write_snapshots(self):
+        for key_filter in self.filters.values():
+            try:
+                key_filter.write_snapshot()
+            except OSError as e:
+                logger.warning("Could not snapshot %s: %s", key_filter.snapshot_path, e)
+
+    def stats(self):
+        return {model.__tablename__: key_filter.stats() for model, key_filter in self.filters.items()}
+
+
+def init_dedup_filter(app):
+    """Attach the duplicate-key filters to ``app`` when DEDUP_FILTER_ENABLED is set."""
+    if app.config["DEDUP_FILTER_ENABLED"]:
+        app.extensions["dedup_filter"] = DuplicateKeyFilters(app)
+
+
+def get_key_filter(model):
+    filters = current_app.extensions.get("dedup_filter")
+    if filters is None:
+        return None
+    filters.ensure_started()
+    return filters.filters.get(model)
+
+
+def write_new_rows(model, data_list, rows, failed_records, write):
+    """
+    Write the validated ``rows`` of ``data_list`` with ``write(model, rows)``, skipping stored keys.
+
+    Without a filter this is just ``write``. Otherwise see write_new_keys; rows whose key
+    exists, or repeats an earlier row of the batch, are appended to ``failed_records`` by index.
+
+    Returns:
+        list: The rows written.
+    """
+    key_filter = get_key_filter(model)
+    if key_filter is None:
+        write(model, rows)
+        return rows
+    name = key_filter.column.key
+    indexes = kept_indexes(len(data_list), failed_records)
+    positions, duplicates = write_new_keys(key_filter, [row[name] for row in rows],
+                                           lambda kept: write(model, [rows[i] for i in kept]))
+    failed_records.extend({"index": indexes[i], "data": data_list[indexes[i]], "error": f"Duplicate {name} '{key}'"}
+                          for i, key in duplicates)
+    failed_records.sort(key=lambda failure: failure["index"])
+    return [rows[i] for i in positions]
+
+
+def write_new_keys(key_filter, keys, write):
+    """
+    Call ``write(positions)`` with the positions in ``keys`` whose key is not stored yet.
+
+    Keys the filter has never seen are written straight away; only possible duplicates are
+    looked up. If the filter missed a key written by another process since it last saw the
+    table, the write fails under a savepoint and every key of the batch is looked up instead.
+
+    Returns:
+        tuple: (positions written, list of (position, key) for stored or repeated keys)
+    """
+    fresh, duplicates = {}, []
+    for position, key in enumerate(keys):
+        if key in fresh:
+            duplicates.append((position, key))
+        else:
+            fresh[key] = position
+    maybe = [key for key in fresh if key_filter.might_contain(key)]
+    key_filter.count(checked=len(fresh), definitely_new=len(fresh) - len(maybe), exact_checks=len(maybe))
+
+    connection = db.session.connection()
+    stored = existing_keys(connection, key_filter.column, maybe) if maybe else set()
+    to_write = [position for key, position in fresh.items() if key not in stored]
+    try:
+        if to_write:
+            with db.session.begin_nested():
+                write(to_write)
+    except IntegrityError:
+        key_filter.count(stale_fallbacks=1)
+        stored = existing_keys(connection, key_filter.column, list(fresh))
+        # Keys stored behind the filter's back (by another worker): it knows them from now on.
+        key_filter.add(list(stored))
+        to_write = [position for key, position in fresh.items() if key not in stored]
+        write(to_write)
+
+    duplicates.extend((fresh[key], key) for key in stored)
+    duplicates.sort()
+    key_filter.count(duplicates=len(duplicates))
+    return to_write, duplicates
+
+
+@rows_written.connect
+def _add_written_keys(model, keys, **_):
+    key_filter = get_key_filter(model) if has_app_context() else None
+    if key_filter is not None:
+        key_filter.add(keys)
+
+
+def dedup_filter_stats():
+    filters = current_app.extensions.get("dedup_filter")
+    return filters.stats() if filters is not None else {"enabled": False}
@@ -1,18 +1,58 @@
+from sqlalchemy import select
 from app.models import db
 from app.models.dispute_msg import DisputeMessage
+from app.services.batch_write import write_batch
+from app.services.columnar import ingest_columnar
+from app.services.events import notify_rows_inserted, notify_rows_written
+from app.services.export import export_chunks
+from app.services.group_commit import group_commit_enabled, submit_for_commit
+from app.services.ingest import ingest_ndjson
+from app.services.record_cache import cached_record
+from app.utils.filters import build_conditions
+from app.utils.pagination import iter_rows, keyset_page
+from app.utils.serializers import RowSerializer
 
-def get_all_disputes():
-    return [d.to_dict() for d in DisputeMessage.query.all()]
+# Keyset order for list endpoints; the cursor carries these values of the last row served.
+KEYSET = (DisputeMessage.__table__.c.timestamp, DisputeMessage.__table__.c.dispute_id)
+serializer = RowSerializer(DisputeMessage.__table__)
+# Query-string filters accepted by the list endpoints, each backed by an index ending in KEYSET.
+_FILTERS = {
+    "customer_id": DisputeMessage.__table__.c.customer_id,
+    "merchant_id": DisputeMessage.__table__.c.merchant_id,
+    "status": DisputeMessage.__table__.c.status,
+}
+_TIME_COLUMN = DisputeMessage.__table__.c.timestamp
 
-def get_dispute_by_id(dispute_id):
+def list_query(filters):
+    return select(*serializer.columns).where(*build_conditions(filters, _FILTERS, _TIME_COLUMN))
+
+def get_disputes_page(limit, cursor=None, filters=None):
+    rows, next_cursor = keyset_page(list_query(filters), KEYSET, limit, cursor)
+    return serializer.dump_page(rows, next_cursor)
+
+def stream_disputes(filters=None):
+    return (serializer.dumps(row) for row in iter_rows(list_query(filters), KEYSET))
+
+def export_disputes(fmt, filters=None):
+    return export_chunks(list_query(filters), KEYSET, fmt)
+
+def _load_dispute(dispute_id):
     dispute = DisputeMessage.query.get(dispute_id)
-    return dispute.to_dict() if dispute else {"error": "Not found"}
+    return dispute.to_dict() if dispute else None
+
+def get_dispute_by_id(dispute_id):
+    dispute = cached_record(DisputeMessage, dispute_id, lambda: _load_dispute(dispute_id))
+    return dispute if dispute else {"error": "Not found"}
 
 def create_dispute(data):
+    if group_commit_enabled():
+        return submit_for_commit(DisputeMessage, data)
     dispute = DisputeMessage(**data)
     db.session.add(dispute)
     db.session.commit()
-    return dispute.to_dict()
+    result = dispute.to_dict()
+    notify_rows_inserted(DisputeMessage, [result])
+    return result
 
 def update_dispute(dispute_id, data):
     dispute = DisputeMessage.query.get(dispute_id)
@@ -22,6 +62,7 @@ def update_dispute(dispute_id, data):
         if hasattr(dispute, key):
             setattr(dispute, key, value)
     db.session.commit()
+    notify_rows_written(DisputeMessage, [dispute_id])
     return dispute.to_dict()
 
 def delete_dispute(dispute_id):
@@ -30,10 +71,21 @@ def delete_dispute(dispute_id):
         return {"error": "Not found"}
     db.session.delete(dispute)
     db.session.commit()
+    notify_rows_written(DisputeMessage, [dispute_id])
     return {"message": "Deleted"}
 
-def create_disputes_batch(data_list):
-    disputes = [DisputeMessage(**data) for data in data_list]
-    db.session.bulk_save_objects(disputes)
-    db.session.commit()
-    return {"message": f"{len(disputes)} dispute(s) inserted successfully"}
+def _batch_summary(written, failed_records):
+    result = {"message": f"{len(written)} dispute(s) inserted successfully"}
+    if failed_records:
+        result["failed_records"] = failed_records
+    return result
+
+def create_disputes_batch(data_list, method=None, on_conflict=None, chunk_size=None):
+    return write_batch(DisputeMessage, data_list, _batch_summary, method, on_conflict, chunk_size)
+
+def create_disputes_stream(stream, chunk_size=None, method=None):
+    return ingest_ndjson(DisputeMessage, stream, chunk_size, method)
+
+
+def create_disputes_columnar(stream, mimetype, method=None, on_conflict=None):
+    return ingest_columnar(DisputeMessage, stream, mimetype, _batch_summary, method, on_conflict)
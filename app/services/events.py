@@ -0,0 +1,69 @@
+from blinker import Namespace
+from sqlalchemy import inspect
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_signals = Namespace()
+
+# Sent after a commit that inserted, upserted, updated or deleted rows.
+# sender: the model class; keys: primary-key values (the ORM identity) of the rows written.
+rows_written = _signals.signal("rows-written")
+# Sent after a commit that inserted rows, just before rows_written.
+# sender: the model class; rows: the inserted rows as validated column dicts (see RowValidator).
+rows_inserted = _signals.signal("rows-inserted")
+
+
+def row_keys(model, rows):
+    """Primary-key values of ``rows`` (dicts keyed by column name), skipping rows without one."""
+    name = inspect(model).primary_key[0].key
+    return [row[name] for row in rows if isinstance(row, dict) and row.get(name) is not None]
+
+
+def _send(signal, model, **kwargs):
+    """
+    Call each receiver of ``signal`` in turn, logging (not raising) its errors.
+
+    The rows are committed by the time a notification goes out; a failing receiver
+    (cache, counters, rollups) must neither stop the others nor fail the request.
+    """
+    for receiver in signal.receivers_for(model):
+        try:
+            receiver(model, **kwargs)
+        except Exception:
+            logger.exception("%s receiver %s failed for %s", signal.name, getattr(receiver, "__name__", receiver),
+                             model.__tablename__)
+
+
+def notify_rows_written(model, keys):
+    if keys:
+        _send(rows_written, model, keys=keys)
+
+
+def _send_inserted(model, rows):
+    if rows and rows_inserted.receivers:
+        _send(rows_inserted, model, rows=rows)
+
+
+def notify_rows_inserted(model, rows):
+    _send_inserted(model, rows)
+    notify_rows_written(model, row_keys(model, rows))
+
+
+def notify_rows_upserted(model, rows, result):
+    """
+    Notify an ``upsert_rows`` ``result``: its inserts (picked out of ``rows``, the validated
+    rows that were upserted) and its updates.
+    """
+    if rows_inserted.receivers:
+        name = inspect(model).primary_key[0].key
+        pending = {str(key) for key in result["inserted"]}
+        inserted = []
+        for row in rows:
+            key = str(row.get(name)) if isinstance(row, dict) else None
+            if key in pending:
+                pending.discard(key)
+                inserted.append(row)
+        _send_inserted(model, inserted)
+    notify_rows_written(model, result["inserted"] + result["updated"])
@@ -0,0 +1,94 @@
+from flask import Response, current_app, stream_with_context
+
+from app.models import db
+from app.services.columnar import arrow_schema
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # export is optional
+    pa = None
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class _ChunkSink:
+    """Write-only file object the Arrow writers encode into; ``drain`` hands the bytes on."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _writer(fmt, sink, schema):
+    if fmt == "csv":
+        return pa_csv.CSVWriter(sink, schema)
+    return pq.ParquetWriter(sink, schema)
+
+
+def check_export_format(fmt):
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of {', '.join(EXPORT_FORMATS)}")
+    if pa is None:
+        raise ValueError("Export requires pyarrow")
+
+
+def export_chunks(stmt, order_by, fmt, chunk_size=None):
+    """
+    Encode every row of ``stmt`` as CSV or Parquet, one chunk of bytes at a time.
+
+    Rows come from a server-side cursor ``chunk_size`` at a time; each fetch becomes one
+    Arrow record batch, written as CSV lines or one Parquet row group and yielded before
+    the next fetch, so memory stays at one chunk however many rows match. ``stmt`` must
+    select whole-table columns in table order (``select(*serializer.columns)``).
+    """
+    check_export_format(fmt)
+    chunk_size = chunk_size or current_app.config["EXPORT_CHUNK_SIZE"]
+    schema = arrow_schema(stmt.selected_columns[0].table)
+    stmt = stmt.order_by(*order_by).execution_options(yield_per=chunk_size)
+
+    def generate():
+        sink = _ChunkSink()
+        writer = _writer(fmt, sink, schema)
+        for rows in db.session.execute(stmt).partitions():
+            columns = zip(*rows)
+            writer.write_batch(pa.record_batch(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema))
+            yield sink.drain()
+        # CSV still carries its header, Parquet its footer, even when nothing matched.
+        writer.close()
+        yield sink.drain()
+
+    return generate()
+
+
+def export_response(chunks, fmt, filename):
+    """Stream encoded export ``chunks`` as a download named ``filename.<fmt>``."""
+    response = Response(stream_with_context(chunks), mimetype=EXPORT_FORMATS[fmt])
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    return response
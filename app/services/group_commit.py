@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from flask import current_app
+
+from app.models import db
+from app.services.events import notify_rows_inserted
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class GroupCommitter:
+    """
+    Write-behind queue that commits single-record inserts in groups.
+
+    Callers block in ``submit`` until the transaction holding their row has committed,
+    so a 201 still means the row is durable; only the number of commits per row changes.
+    A group is flushed once it holds ``max_rows`` rows or ``interval_ms`` after its first
+    row arrived, whichever comes first. If a group fails, its rows are retried one by
+    one so each caller gets its own outcome.
+    """
+
+    def __init__(self, app, max_rows, interval_ms):
+        self.app = app
+        self.max_rows = max_rows
+        self.interval = interval_ms / 1000.0
+        self.groups_flushed = 0
+        self.rows_flushed = 0
+        self._pending = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+
+    def submit(self, model, data):
+        future = Future()
+        with self._cond:
+            self._ensure_worker()
+            self._pending.append((model, data, future))
+            if len(self._pending) >= self.max_rows:
+                self._cond.notify()
+        return future.result()
+
+    def _ensure_worker(self):
+        # Started lazily so each forked gunicorn worker gets its own flusher thread.
+        if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+            self._thread.start()
+
+    def _next_group(self):
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = time.monotonic() + self.interval
+            while len(self._pending) < self.max_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            group = self._pending[:self.max_rows]
+            self._pending = self._pending[self.max_rows:]
+            return group
+
+    def _run(self):
+        while True:
+            group = self._next_group()
+            try:
+                with self.app.app_context():
+                    self._flush(group)
+            except Exception as e:
+                logger.exception("Group commit flush failed")
+                for _, _, future in group:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _flush(self, group):
+        staged = []
+        for model, data, future in group:
+            try:
+                staged.append((model(**data), data, future))
+            except Exception as e:
+                future.set_exception(e)
+        if not staged:
+            return
+        try:
+            db.session.add_all([obj for obj, _, _ in staged])
+            db.session.flush()
+            # Serialize before commit so expire_on_commit does not cost one SELECT per row.
+            results = [obj.to_dict() for obj, _, _ in staged]
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            self._flush_one_by_one(staged)
+            return
+        self.groups_flushed += 1
+        self.rows_flushed += len(staged)
+        written = {}
+        for (obj, _, _), result in zip(staged, results):
+            written.setdefault(type(obj), []).append(result)
+        for model, rows in written.items():
+            notify_rows_inserted(model, rows)
+        for (_, _, future), result in zip(staged, results):
+            future.set_result(result)
+
+    def _flush_one_by_one(self, staged):
+        for obj, data, future in staged:
+            fresh = type(obj)(**data)
+            try:
+                db.session.add(fresh)
+                db.session.flush()
+                result = fresh.to_dict()
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                future.set_exception(e)
+                continue
+            self.groups_flushed += 1
+            self.rows_flushed += 1
+            notify_rows_inserted(type(fresh), [result])
+            future.set_result(result)
+
+
+def init_group_commit(app):
+    """Turn GROUP_COMMIT_ENABLED off when workers serve one request at a time (GUNICORN_THREADS=1)."""
+    if app.config["GROUP_COMMIT_ENABLED"] and app.config["GUNICORN_THREADS"] < 2:
+        logger.warning("GROUP_COMMIT_ENABLED needs GUNICORN_THREADS > 1 to batch anything; "
+                       "group commit is off")
+        app.config["GROUP_COMMIT_ENABLED"] = False
+
+
+def get_group_committer():
+    app = current_app._get_current_object()
+    committer = app.extensions.get("group_commit")
+    if committer is None:
+        committer = app.extensions.setdefault("group_commit", GroupCommitter(
+            app, app.config["GROUP_COMMIT_MAX_ROWS"], app.config["GROUP_COMMIT_INTERVAL_MS"]))
+    return committer
+
+
+def group_commit_enabled():
+    return current_app.config["GROUP_COMMIT_ENABLED"]
+
+
+def submit_for_commit(model, data):
+    """Queue one row for the next group commit and wait until it is durable."""
+    return get_group_committer().submit(model, data)
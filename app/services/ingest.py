@@ -0,0 +1,131 @@
+import json
+
+from flask import current_app
+from sqlalchemy import insert
+
+from app.models import db
+from app.services.copy_loader import copy_rows, supports_copy
+from app.services.dedup_filter import write_new_rows
+from app.services.events import notify_rows_inserted
+from app.services.profiling import phase
+from app.services.telemetry import observe_batch
+from app.services.validation import get_validator
+
+READ_BLOCK_SIZE = 64 * 1024
+WRITE_METHODS = ("orm", "copy")
+
+
+def iter_lines(stream, block_size=READ_BLOCK_SIZE):
+    """
+    Split a byte stream into lines while reading it in fixed-size blocks.
+
+    Only each new block is searched for newlines; the unfinished line is kept as its
+    blocks and joined once, when its end arrives, so long lines cost linear time.
+    """
+    pending = []
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        *lines, rest = block.split(b"\n")
+        if lines:
+            if pending:
+                pending.append(lines[0])
+                lines[0] = b"".join(pending)
+                pending = []
+            yield from lines
+        if rest:
+            pending.append(rest)
+    if pending:
+        yield b"".join(pending)
+
+
+def normalize_row(model, row):
+    """Validate a payload dict and map it onto the full column set of ``model``; raises ValueError on bad input."""
+    return get_validator(model)(row)
+
+
+def insert_rows(model, rows):
+    """Insert already-normalized row dicts with one executemany, no ORM objects."""
+    if rows:
+        db.session.execute(insert(model), rows)
+
+
+def resolve_write_method(method=None):
+    """
+    Pick the bulk write path for a request: ``method`` if given, else BATCH_WRITE_METHOD.
+
+    ``copy`` silently degrades to ``orm`` on backends without COPY support (e.g. SQLite).
+    """
+    method = method or current_app.config["BATCH_WRITE_METHOD"]
+    if method not in WRITE_METHODS:
+        raise ValueError(f"Unknown write method '{method}', expected one of {', '.join(WRITE_METHODS)}")
+    if method == "copy" and not supports_copy():
+        return "orm"
+    return method
+
+
+def copy_batch(model, data_list):
+    """
+    COPY the valid rows of a batch payload in one stream, skipping rows that fail validation
+    and, with the duplicate-key filter enabled, rows whose key is already stored.
+
+    Returns:
+        tuple: (rows copied, list of {"index", "data", "error"} for rejected rows)
+    """
+    rows, failed = get_validator(model).validate_batch(data_list)
+    return write_new_rows(model, data_list, rows, failed, copy_rows), failed
+
+
+def _flush_chunk(model, write, index, first_line, last_line, rows, rejected):
+    summary = {"chunk": index, "first_line": first_line, "last_line": last_line,
+               "received": len(rows) + len(rejected), "inserted": 0, "rejected": rejected}
+    observe_batch(model, "stream", summary["received"])
+    try:
+        with phase("flush"):
+            write(model, rows)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        summary["error"] = str(e)
+        return summary
+    summary["inserted"] = len(rows)
+    notify_rows_inserted(model, rows)
+    return summary
+
+
+def ingest_ndjson(model, stream, chunk_size=None, method=None):
+    """
+    Ingest newline-delimited JSON from ``stream``, committing every ``chunk_size`` lines.
+
+    Only one chunk of parsed rows is held at a time, so memory is bounded by the chunk
+    size rather than the payload. A chunk that fails to insert is rolled back on its own;
+    chunks already committed stay committed.
+
+    Returns:
+        dict: Per-chunk summaries plus inserted/failed totals.
+    """
+    write = copy_rows if resolve_write_method(method) == "copy" else insert_rows
+    chunk_size = max(1, min(chunk_size or current_app.config["INGEST_CHUNK_SIZE"],
+                            current_app.config["INGEST_CHUNK_SIZE_MAX"]))
+    chunks = []
+    rows, rejected = [], []
+    first_line = None
+    line_no = 0
+    for line_no, line in enumerate(iter_lines(stream), start=1):
+        if first_line is None:
+            first_line = line_no
+        if line.strip():
+            try:
+                rows.append(normalize_row(model, json.loads(line)))
+            except ValueError as e:
+                rejected.append({"line": line_no, "error": str(e)})
+        if line_no - first_line + 1 >= chunk_size:
+            chunks.append(_flush_chunk(model, write, len(chunks), first_line, line_no, rows, rejected))
+            rows, rejected, first_line = [], [], None
+    if first_line is not None:
+        chunks.append(_flush_chunk(model, write, len(chunks), first_line, line_no, rows, rejected))
+
+    inserted = sum(c["inserted"] for c in chunks)
+    failed = sum(c["received"] for c in chunks) - inserted
+    return {"inserted": inserted, "failed": failed, "chunks": chunks}
@@ -1,18 +1,58 @@
+from sqlalchemy import select
 from app.models import db
 from app.models.kyc_msg import KYCMessage
+from app.services.batch_write import write_batch
+from app.services.columnar import ingest_columnar
+from app.services.events import notify_rows_inserted, notify_rows_written
+from app.services.export import export_chunks
+from app.services.group_commit import group_commit_enabled, submit_for_commit
+from app.services.ingest import ingest_ndjson
+from app.services.record_cache import cached_record
+from app.utils.filters import build_conditions
+from app.utils.pagination import iter_rows, keyset_page
+from app.utils.serializers import RowSerializer
 
-def get_all_kyc_msgs():
-    return [msg.to_dict() for msg in KYCMessage.query.all()]
+# Keyset order for list endpoints; the cursor carries these values of the last row served.
+KEYSET = (KYCMessage.__table__.c.timestamp, KYCMessage.__table__.c.kyc_event_id)
+serializer = RowSerializer(KYCMessage.__table__)
+# Query-string filters accepted by the list endpoints, each backed by an index ending in KEYSET.
+_FILTERS = {
+    "customer_id": KYCMessage.__table__.c.customer_id,
+    "device_id": KYCMessage.__table__.c.device_id,
+    "verification_status": KYCMessage.__table__.c.verification_status,
+}
+_TIME_COLUMN = KYCMessage.__table__.c.timestamp
 
-def get_kyc_msg_by_id(kyc_event_id):
+def list_query(filters):
+    return select(*serializer.columns).where(*build_conditions(filters, _FILTERS, _TIME_COLUMN))
+
+def get_kyc_msgs_page(limit, cursor=None, filters=None):
+    rows, next_cursor = keyset_page(list_query(filters), KEYSET, limit, cursor)
+    return serializer.dump_page(rows, next_cursor)
+
+def stream_kyc_msgs(filters=None):
+    return (serializer.dumps(row) for row in iter_rows(list_query(filters), KEYSET))
+
+def export_kyc_msgs(fmt, filters=None):
+    return export_chunks(list_query(filters), KEYSET, fmt)
+
+def _load_kyc_msg(kyc_event_id):
     msg = KYCMessage.query.get(kyc_event_id)
-    return msg.to_dict() if msg else {"error": "Not found"}
+    return msg.to_dict() if msg else None
+
+def get_kyc_msg_by_id(kyc_event_id):
+    msg = cached_record(KYCMessage, kyc_event_id, lambda: _load_kyc_msg(kyc_event_id))
+    return msg if msg else {"error": "Not found"}
 
 def create_kyc_msg(data):
+    if group_commit_enabled():
+        return submit_for_commit(KYCMessage, data)
     msg = KYCMessage(**data)
     db.session.add(msg)
     db.session.commit()
-    return msg.to_dict()
+    result = msg.to_dict()
+    notify_rows_inserted(KYCMessage, [result])
+    return result
 
 def update_kyc_msg(kyc_event_id, data):
     msg = KYCMessage.query.get(kyc_event_id)
@@ -22,6 +62,7 @@ def update_kyc_msg(kyc_event_id, data):
         if hasattr(msg, key):
             setattr(msg, key, value)
     db.session.commit()
+    notify_rows_written(KYCMessage, [kyc_event_id])
     return msg.to_dict()
 
 def delete_kyc_msg(kyc_event_id):
@@ -30,13 +71,21 @@ def delete_kyc_msg(kyc_event_id):
         return {"error": "Not found"}
     db.session.delete(msg)
     db.session.commit()
+    notify_rows_written(KYCMessage, [kyc_event_id])
     return {"message": "Deleted"}
 
-def create_kyc_batch(data_list):
-    for row in data_list:
-        if not row.get("timestamp"):
-            row["timestamp"] = None
-    msgs = [KYCMessage(**row) for row in data_list]
-    db.session.bulk_save_objects(msgs)
-    db.session.commit()
-    return {"message": f"{len(msgs)} KYC records inserted successfully"}
+def _batch_summary(written, failed_records):
+    result = {"message": f"{len(written)} KYC records inserted successfully"}
+    if failed_records:
+        result["failed_records"] = failed_records
+    return result
+
+def create_kyc_batch(data_list, method=None, on_conflict=None, chunk_size=None):
+    return write_batch(KYCMessage, data_list, _batch_summary, method, on_conflict, chunk_size)
+
+def create_kyc_stream(stream, chunk_size=None, method=None):
+    return ingest_ndjson(KYCMessage, stream, chunk_size, method)
+
+
+def create_kyc_columnar(stream, mimetype, method=None, on_conflict=None):
+    return ingest_columnar(KYCMessage, stream, mimetype, _batch_summary, method, on_conflict)
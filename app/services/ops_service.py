@@ -0,0 +1,15 @@
+import os
+
+from app.config.pool import InstrumentedQueuePool
+from app.models import db
+
+
+def pool_stats():
+    """Connection-pool state of this worker process; checkout timings need InstrumentedQueuePool."""
+    pool = db.engine.pool
+    stats = {"pid": os.getpid(), "pool": type(pool).__name__}
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(pool.stats())
+    else:
+        stats["status"] = pool.status()
+    return stats
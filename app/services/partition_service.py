@@ -0,0 +1,176 @@
+import gzip
+import os
+import re
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.config.pool import lift_statement_timeout
+from app.models import db
+from app.models.auth_log_msg import AuthLogMessage
+from app.models.dispute_msg import DisputeMessage
+from app.models.kyc_msg import KYCMessage
+from app.models.partitioning import DB_SCHEMA, PARTITIONING_ENABLED
+from app.models.payment_msg import PaymentMessage
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+RAW_MODELS = (AuthLogMessage, PaymentMessage, DisputeMessage, KYCMessage)
+RETENTION_ACTIONS = ("drop", "detach", "export")
+_MONTHLY_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def month_start(dt):
+    return datetime(dt.year, dt.month, 1)
+
+
+def add_months(dt, months):
+    index = dt.year * 12 + dt.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table_name, start):
+    return f"{table_name}_p{start.year:04d}{start.month:02d}"
+
+
+def plan_partitions(now, months_back=0, months_ahead=3):
+    """Monthly [start, end) ranges from ``months_back`` before ``now`` to ``months_ahead`` after it."""
+    first = month_start(now)
+    return [(add_months(first, i), add_months(first, i + 1)) for i in range(-months_back, months_ahead + 1)]
+
+
+def expired_partitions(partition_names, keep_months, now):
+    """Names of monthly partitions that end on or before the start of the retention window."""
+    cutoff = add_months(month_start(now), -keep_months)
+    expired = []
+    for name in partition_names:
+        match = _MONTHLY_SUFFIX.search(name)
+        if match and add_months(datetime(int(match.group(1)), int(match.group(2)), 1), 1) <= cutoff:
+            expired.append(name)
+    return sorted(expired)
+
+
+def _qualified(name):
+    preparer = db.engine.dialect.identifier_preparer
+    return f"{preparer.quote_schema(DB_SCHEMA)}.{preparer.quote(name)}"
+
+
+def list_partitions(model):
+    rows = db.session.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "JOIN pg_namespace n ON n.oid = p.relnamespace "
+        "WHERE n.nspname = :schema AND p.relname = :table"
+    ), {"schema": DB_SCHEMA, "table": model.__tablename__})
+    return [row[0] for row in rows]
+
+
+def ensure_partitions(model, months_back=0, months_ahead=3, now=None):
+    """
+    Create the monthly partitions around ``now`` plus a DEFAULT partition, if missing.
+
+    The default partition only catches rows outside every monthly range so inserts never
+    fail; keeping partitions created ahead of time keeps it empty.
+
+    Returns:
+        list: Names of the partitions that were created.
+    """
+    parent = _qualified(model.__tablename__)
+    existing = set(list_partitions(model))
+    created = []
+    for start, end in plan_partitions(now or datetime.utcnow(), months_back, months_ahead):
+        name = partition_name(model.__tablename__, start)
+        if name in existing:
+            continue
+        db.session.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {_qualified(name)} PARTITION OF {parent} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        created.append(name)
+    default = f"{model.__tablename__}_default"
+    if default not in existing:
+        db.session.execute(text(f"CREATE TABLE IF NOT EXISTS {_qualified(default)} PARTITION OF {parent} DEFAULT"))
+        created.append(default)
+    db.session.commit()
+    return created
+
+
+def _export_partition(name, export_dir):
+    os.makedirs(export_dir, exist_ok=True)
+    path = os.path.join(export_dir, f"{name}.csv.gz")
+    cursor = db.session.connection().connection.cursor()
+    try:
+        with gzip.open(path, "wt", encoding="utf-8", newline="") as out:
+            cursor.copy_expert(f"COPY {_qualified(name)} TO STDOUT WITH (FORMAT csv, HEADER true)", out)
+    finally:
+        cursor.close()
+    return path
+
+
+def apply_retention(model, keep_months, action="drop", export_dir=None, now=None):
+    """
+    Remove monthly partitions older than ``keep_months`` whole months.
+
+    Expired partitions are detached from the parent (``detach``), detached and dropped
+    (``drop``), or copied to ``<export_dir>/<partition>.csv.gz`` and then dropped
+    (``export``). Data leaves a partition at a time, never through row-by-row DELETEs.
+
+    Returns:
+        list: One {"partition", "action", "path"?} entry per expired partition.
+    """
+    if action not in RETENTION_ACTIONS:
+        raise ValueError(f"Unknown retention action '{action}', expected one of {', '.join(RETENTION_ACTIONS)}")
+    if action == "export" and not export_dir:
+        raise ValueError("export_dir is required for the export action")
+    parent = _qualified(model.__tablename__)
+    results = []
+    for name in expired_partitions(list_partitions(model), keep_months, now or datetime.utcnow()):
+        result = {"partition": name, "action": action}
+        # A partition export copies a whole month; DETACH can wait on locks.
+        lift_statement_timeout(db.session.connection())
+        if action == "export":
+            result["path"] = _export_partition(name, export_dir)
+        db.session.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {_qualified(name)}"))
+        if action != "detach":
+            db.session.execute(text(f"DROP TABLE {_qualified(name)}"))
+        db.session.commit()
+        logger.info("Retention: %s %s", action, name)
+        results.append(result)
+    return results
+
+
+def bootstrap_schema(months_back=0, months_ahead=3):
+    """
+    Create the schema, tables and indexes, and the partitions when partitioning is on.
+
+    Adds ``payment_msgs_raw.timestamp`` to tables created before it existed. Converting an
+    existing unpartitioned table to a partitioned one is a data migration and is not done here.
+    """
+    postgres = db.engine.dialect.name == "postgresql"
+    if postgres:
+        db.session.execute(text(f"CREATE SCHEMA IF NOT EXISTS {db.engine.dialect.identifier_preparer.quote_schema(DB_SCHEMA)}"))
+        db.session.commit()
+    db.create_all()
+    if postgres:
+        db.session.execute(text(
+            f"ALTER TABLE {_qualified(PaymentMessage.__tablename__)} ADD COLUMN IF NOT EXISTS timestamp TIMESTAMP WITHOUT TIME ZONE"
+        ))
+        db.session.commit()
+    created = {}
+    if postgres and PARTITIONING_ENABLED:
+        for model in RAW_MODELS:
+            created[model.__tablename__] = ensure_partitions(model, months_back, months_ahead)
+    return created
+
+
+def maintain_partitions(months_ahead=3, keep_months=0, action="drop", export_dir=None):
+    """Create upcoming partitions for every raw table and, if ``keep_months`` is set, apply retention."""
+    report = {}
+    for model in RAW_MODELS:
+        entry = {"created": ensure_partitions(model, 0, months_ahead)}
+        if keep_months:
+            entry["retention"] = apply_retention(model, keep_months, action, export_dir)
+        report[model.__tablename__] = entry
+    return report
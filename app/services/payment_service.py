@@ -1,52 +1,84 @@
+from sqlalchemy import select
 from app.models import db
 from app.models.payment_msg import PaymentMessage
+from app.services.batch_write import write_batch
+from app.services.columnar import ingest_columnar
+from app.services.events import notify_rows_inserted, notify_rows_written
+from app.services.export import export_chunks
+from app.services.group_commit import group_commit_enabled, submit_for_commit
+from app.services.ingest import ingest_ndjson
+from app.services.record_cache import cached_record
+from app.utils.filters import build_conditions
+from app.utils.pagination import iter_rows, keyset_page
+from app.utils.serializers import RowSerializer
 
-def get_all_payments():
-    payments = PaymentMessage.query.all()
-    return [p.to_dict() for p in payments]
+# Keyset order for list endpoints; the cursor carries these values of the last row served.
+KEYSET = (PaymentMessage.__table__.c.message_id,)
+serializer = RowSerializer(PaymentMessage.__table__)
+# Query-string filters accepted by the list endpoints, each backed by an index ending in KEYSET.
+_FILTERS = {
+    "card_number_token": PaymentMessage.__table__.c.card_number_token,
+    "merchant_id": PaymentMessage.__table__.c.merchant_id,
+    "device_id": PaymentMessage.__table__.c.device_id,
+    "status": PaymentMessage.__table__.c.status,
+}
+_TIME_COLUMN = PaymentMessage.__table__.c.timestamp
+# Exports walk ix_payment_msgs_raw_ts, so a from/to month reads only its own index range.
+_EXPORT_ORDER = (_TIME_COLUMN,) + KEYSET
 
-def get_payment_by_id(message_id):
+def list_query(filters):
+    return select(*serializer.columns).where(*build_conditions(filters, _FILTERS, _TIME_COLUMN))
+
+def get_payments_page(limit, cursor=None, filters=None):
+    rows, next_cursor = keyset_page(list_query(filters), KEYSET, limit, cursor)
+    return serializer.dump_page(rows, next_cursor)
+
+def stream_payments(filters=None):
+    return (serializer.dumps(row) for row in iter_rows(list_query(filters), KEYSET))
+
+def export_payments(fmt, filters=None):
+    return export_chunks(list_query(filters), _EXPORT_ORDER, fmt)
+
+def _load_payment(message_id):
     payment = PaymentMessage.query.get(message_id)
-    return payment.to_dict() if payment else {"error": "Not found"}
+    return payment.to_dict() if payment else None
+
+def get_payment_by_id(message_id):
+    payment = cached_record(PaymentMessage, message_id, lambda: _load_payment(message_id))
+    return payment if payment else {"error": "Not found"}
 
 def create_payment(data):
+    if group_commit_enabled():
+        return submit_for_commit(PaymentMessage, data)
     payment = PaymentMessage(**data)
     db.session.add(payment)
     db.session.commit()
-    return payment.to_dict()
+    result = payment.to_dict()
+    notify_rows_inserted(PaymentMessage, [result])
+    return result
 
-def create_payments_batch(data_list):
+def _batch_summary(written, failed_records):
+    return {
+        "success_count": len(written),
+        "failure_count": len(failed_records),
+        "failed_records": failed_records,
+    }
+
+def create_payments_batch(data_list, method=None, on_conflict=None, chunk_size=None):
     """
-    Creates multiple payment records in a single transaction.
+    Creates multiple payment records in a single transaction, or in transactions of
+    ``chunk_size`` rows (see write_batch_in_chunks).
 
     Args:
         data_list (list): A list of dictionaries, where each dictionary represents a payment record.
+        method (str): Write path, "orm" or "copy"; defaults to BATCH_WRITE_METHOD.
+        on_conflict (str): "ignore" or "update" for idempotent ingest keyed on message_id.
+        chunk_size (int): Rows per transaction (chunked summary); defaults to one transaction.
 
     Returns:
         dict: A summary of the operation, including success and failure counts.
     """
-    payments = []
-    failed_records = []
-    for data in data_list:
-        try:
-            payment = PaymentMessage(**data)
-            payments.append(payment)
-        except Exception as e:
-            failed_records.append({"data": data, "error": str(e)})
-
-    if payments:
-        try:
-            db.session.bulk_save_objects(payments)  # Efficiently save multiple objects
-            db.session.commit()
-        except Exception as e:
-            db.session.rollback()
-            return {"error": "Failed to save batch", "details": str(e)}
-
-    return {
-        "success_count": len(payments),
-        "failure_count": len(failed_records),
-        "failed_records": failed_records,
-    }
+    return write_batch(PaymentMessage, data_list, _batch_summary, method, on_conflict, chunk_size)
 
 def update_payment(message_id, data):
     payment = PaymentMessage.query.get(message_id)
@@ -58,6 +90,7 @@ def update_payment(message_id, data):
             setattr(payment, key, value)
 
     db.session.commit()
+    notify_rows_written(PaymentMessage, [message_id])
     return payment.to_dict()
 
 def delete_payment(message_id):
@@ -67,4 +100,12 @@ def delete_payment(message_id):
 
     db.session.delete(payment)
     db.session.commit()
+    notify_rows_written(PaymentMessage, [message_id])
     return {"message": "Deleted"}
+
+def create_payments_stream(stream, chunk_size=None, method=None):
+    return ingest_ndjson(PaymentMessage, stream, chunk_size, method)
+
+
+def create_payments_columnar(stream, mimetype, method=None, on_conflict=None):
+    return ingest_columnar(PaymentMessage, stream, mimetype, _batch_summary, method, on_conflict)
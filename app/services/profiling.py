@@ -0,0 +1,212 @@
+import cProfile
+import heapq
+import json
+import os
+import pstats
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import current_app, g, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.utils.logger import get_logger
+from app.utils.pagination import is_truthy
+
+logger = get_logger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PHASES = ("parse", "build", "flush", "commit", "serialize")
+_active = ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    """Timings collected for one profiled request: phases, SQL statements and a cProfile run."""
+
+    def __init__(self, slow_statements=5):
+        self.id = uuid.uuid4().hex[:12]
+        self.started = time.perf_counter()
+        self.total = None
+        self.phases = {}
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self._slow_limit = slow_statements
+        self._slowest = []
+        self.profiler = cProfile.Profile()
+
+    def add_phase(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_statement(self, statement, seconds, executemany):
+        self.sql_count += 1
+        self.sql_time += seconds
+        entry = (seconds, self.sql_count, statement, executemany)
+        if len(self._slowest) < self._slow_limit:
+            heapq.heappush(self._slowest, entry)
+        elif self._slow_limit:
+            heapq.heappushpop(self._slowest, entry)
+
+    def slowest_statements(self):
+        return [{"ms": round(seconds * 1000, 3), "executemany": executemany, "statement": statement}
+                for seconds, _, statement, executemany in sorted(self._slowest, reverse=True)]
+
+    def breakdown(self):
+        """Milliseconds per phase, SQL total and the untracked remainder of the request."""
+        phases = {name: round(self.phases[name] * 1000, 3) for name in PHASES if name in self.phases}
+        tracked = sum(self.phases.get(name, 0.0) for name in PHASES)
+        return {
+            "phases_ms": phases,
+            "other_ms": round(max(self.total - tracked, 0.0) * 1000, 3),
+            "total_ms": round(self.total * 1000, 3),
+            "sql_ms": round(self.sql_time * 1000, 3),
+            "sql_statements": self.sql_count,
+        }
+
+    def server_timing(self):
+        parts = [f"{name};dur={self.phases[name] * 1000:.3f}" for name in PHASES if name in self.phases]
+        parts.append(f'sql;dur={self.sql_time * 1000:.3f};desc="{self.sql_count} statements"')
+        parts.append(f"total;dur={self.total * 1000:.3f}")
+        return ", ".join(parts)
+
+    def top_functions(self, limit=10):
+        """The ``limit`` functions with the highest cumulative time in the cProfile run."""
+        stats = pstats.Stats(self.profiler).stats
+        ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        return [{"function": f"{path}:{line}({name})", "calls": calls,
+                 "own_ms": round(own * 1000, 3), "cumulative_ms": round(cumulative * 1000, 3)}
+                for (path, line, name), (_, calls, own, cumulative, _) in ranked]
+
+
+@contextmanager
+def phase(name):
+    """Attribute the enclosed time to ``name`` in the current request's profile, if any."""
+    profile = _active.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_phase(name, time.perf_counter() - started)
+
+
+class ProfilingJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider with ``jsonify`` timed as the serialize phase."""
+
+    def response(self, *args, **kwargs):
+        with phase("serialize"):
+            return super().response(*args, **kwargs)
+
+
+def init_profiling(app):
+    """
+    Profile requests carrying ``X-Profile: 1`` (PROFILING_HEADER_ENABLED) and a random
+    PROFILING_SAMPLE_RATE fraction of all requests; nothing is hooked in when both are off.
+    """
+    if not app.config["PROFILING_HEADER_ENABLED"] and not app.config["PROFILING_SAMPLE_RATE"]:
+        return
+    app.json = ProfilingJSONProvider(app)
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_discard_profile)
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Session, "before_commit", _before_commit)
+        event.listen(Session, "after_commit", _after_commit)
+
+
+def _wants_profile(config):
+    if config["PROFILING_HEADER_ENABLED"] and is_truthy(request.headers.get(PROFILE_HEADER, "")):
+        return True
+    rate = config["PROFILING_SAMPLE_RATE"]
+    return rate > 0 and random.random() < rate
+
+
+def _start_profile():
+    config = current_app.config
+    if not _wants_profile(config):
+        return
+    profile = RequestProfile(config["PROFILING_SLOW_STATEMENTS"])
+    g.profile_token = _active.set(profile)
+    try:
+        profile.profiler.enable()
+    except ValueError:
+        # Another profiler is already running in this process (e.g. a concurrent profiled request).
+        profile.profiler = None
+    if request.is_json:
+        # Parse up front so the time is attributed; Flask caches the result for the view.
+        with phase("parse"):
+            request.get_json(silent=True)
+
+
+def _finish_profile(response):
+    profile = _active.get()
+    if profile is None:
+        return response
+    if profile.profiler is not None:
+        profile.profiler.disable()
+    profile.total = time.perf_counter() - profile.started
+    response.headers["Server-Timing"] = profile.server_timing()
+    response.headers["X-Profile-Id"] = profile.id
+    report = {"id": profile.id, "method": request.method, "path": request.path,
+              "status": response.status_code, **profile.breakdown(),
+              "slowest_statements": profile.slowest_statements()}
+    if profile.profiler is not None:
+        report["top_functions"] = profile.top_functions()
+    logger.info("Profile %s", json.dumps(report))
+    dump_dir = current_app.config["PROFILING_DUMP_DIR"]
+    if dump_dir:
+        _dump(dump_dir, profile, report)
+    return response
+
+
+def _dump(dump_dir, profile, report):
+    os.makedirs(dump_dir, exist_ok=True)
+    base = os.path.join(dump_dir, f"{time.strftime('%Y%m%dT%H%M%S')}-{profile.id}")
+    with open(f"{base}.json", "w") as out:
+        json.dump(report, out, indent=2)
+    if profile.profiler is not None:
+        # Load with pstats.Stats(path) or snakeviz.
+        profile.profiler.dump_stats(f"{base}.prof")
+
+
+def _discard_profile(exc):
+    token = g.pop("profile_token", None)
+    if token is not None:
+        profile = _active.get()
+        if profile is not None and profile.profiler is not None:
+            profile.profiler.disable()
+        _active.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active.get() is not None:
+        conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _active.get()
+    if profile is None:
+        return
+    starts = conn.info.get("profile_started")
+    if starts:
+        profile.add_statement(statement, time.perf_counter() - starts.pop(), executemany)
+
+
+def _before_commit(session):
+    if _active.get() is not None:
+        session.info["profile_commit_started"] = time.perf_counter()
+
+
+def _after_commit(session):
+    started = session.info.pop("profile_commit_started", None)
+    profile = _active.get()
+    if started is not None and profile is not None:
+        profile.add_phase("commit", time.perf_counter() - started)
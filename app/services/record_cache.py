@@ -0,0 +1,59 @@
+from flask import current_app
+
+from app.services.events import rows_written
+from app.utils.cache import LocalSharedBackend, ReadThroughCache
+
+# CACHE_SHARED_BACKEND values; a Redis/memcached adapter implementing CacheBackend plugs in here.
+SHARED_BACKENDS = {"local": LocalSharedBackend}
+
+
+def init_record_cache(app):
+    """Attach the GET-by-id cache to ``app`` when CACHE_ENABLED is set."""
+    if not app.config["CACHE_ENABLED"]:
+        return
+    backend = app.config["CACHE_SHARED_BACKEND"]
+    if backend and backend not in SHARED_BACKENDS:
+        raise ValueError(f"Unknown cache backend '{backend}', expected one of {', '.join(SHARED_BACKENDS)}")
+    shared = SHARED_BACKENDS[backend]() if backend else None
+    app.extensions["record_cache"] = ReadThroughCache(
+        app.config["CACHE_MAX_ENTRIES"], app.config["CACHE_TTL_SECONDS"], shared)
+
+
+def get_record_cache():
+    return current_app.extensions.get("record_cache")
+
+
+def _cache_key(model, key):
+    return f"{model.__tablename__}:{key}"
+
+
+def cached_record(model, key, loader):
+    """
+    Return ``loader()`` for the record ``key`` of ``model`` through the cache.
+
+    ``loader`` returns the record dict or None; misses (None) are not cached so a row
+    inserted later is visible immediately. Callers get their own copy of the dict.
+    """
+    cache = get_record_cache()
+    if cache is None:
+        return loader()
+    record = cache.get_or_load(_cache_key(model, key), loader)
+    return dict(record) if record is not None else None
+
+
+def invalidate_records(model, keys):
+    cache = get_record_cache()
+    if cache is None:
+        return
+    for key in keys:
+        cache.invalidate(_cache_key(model, key))
+
+
+@rows_written.connect
+def _invalidate_written(model, keys, **_):
+    invalidate_records(model, keys)
+
+
+def cache_stats():
+    cache = get_record_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
@@ -0,0 +1,249 @@
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import case, cast, delete, func, select
+
+from app.config.pool import lift_statement_timeout
+from app.models import db
+from app.models.dispute_msg import DisputeMessage
+from app.models.kyc_msg import KYCMessage
+from app.models.payment_msg import PaymentMessage
+from app.models.rollups import DisputeDailyRollup, KYCDailyRollup, PaymentDailyRollup, RollupWatermark
+from app.services.events import rows_inserted
+from app.services.upsert import insert_for_dialect
+from app.utils.filters import parse_timestamp
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# COUNT(*) when ``column`` is None, else SUM(column); over rows where where[0] is one of where[1], if given.
+Measure = namedtuple("Measure", "name column where")
+# ``numerator / denominator`` of the summed measures, computed when reading; a (rollup, measure)
+# denominator is summed from that rollup over the same days.
+Rate = namedtuple("Rate", "name numerator denominator")
+Rollup = namedtuple("Rollup", "name source table dimensions measures rates")
+
+ROLLUPS = {
+    rollup.name: rollup for rollup in (
+        Rollup("payments", PaymentMessage, PaymentDailyRollup, ("merchant_id", "mcc", "country", "channel"), (
+            Measure("txn_count", None, None),
+            Measure("declined_count", None, ("status", ("declined",))),
+            Measure("amount_total", "amount", None),
+            Measure("declined_amount", "amount", ("status", ("declined",))),
+        ), (Rate("decline_rate", "declined_count", "txn_count"),)),
+        Rollup("disputes", DisputeMessage, DisputeDailyRollup, ("dispute_reason_code", "dispute_stage"), (
+            Measure("dispute_count", None, None),
+            Measure("evidence_count", None, ("evidence_provided", (True,))),
+            Measure("amount_total", "amount", None),
+        ), (Rate("dispute_rate", "dispute_count", ("payments", "txn_count")),
+            Rate("evidence_rate", "evidence_count", "dispute_count"))),
+        Rollup("kyc", KYCMessage, KYCDailyRollup, ("verification_status", "document_type"), (
+            Measure("event_count", None, None),
+            Measure("failed_count", None, ("verification_status", ("failed",))),
+        ), (Rate("failure_rate", "failed_count", "event_count"),)),
+    )
+}
+_ROLLUP_BY_SOURCE = {rollup.source: rollup for rollup in ROLLUPS.values()}
+_RESERVED_ARGS = ("group_by", "from", "to")
+
+
+def _day(value):
+    if isinstance(value, str):
+        value = parse_timestamp(value) if value.strip() else None
+    return value.date() if value is not None else None
+
+
+def rollup_deltas(rollup, rows):
+    """
+    Fold inserted ``rows`` into per-(day, dimensions) measure deltas.
+
+    Rows without a usable timestamp are skipped, as the refresh skips them.
+
+    Returns:
+        list: Rollup rows ({"day", dimensions..., measures...}) in primary-key order, so
+        concurrent batches lock the rollup rows they share in the same order.
+    """
+    deltas = {}
+    for row in rows:
+        try:
+            day = _day(row.get("timestamp"))
+        except ValueError:
+            continue
+        if day is None:
+            continue
+        key = (day, *(row.get(name) or "" for name in rollup.dimensions))
+        values = deltas.get(key)
+        if values is None:
+            values = deltas[key] = [0] * len(rollup.measures)
+        for i, measure in enumerate(rollup.measures):
+            if measure.where and row.get(measure.where[0]) not in measure.where[1]:
+                continue
+            values[i] += 1 if measure.column is None else (row.get(measure.column) or 0)
+    names = ("day", *rollup.dimensions, *(measure.name for measure in rollup.measures))
+    return [dict(zip(names, key + tuple(values))) for key, values in sorted(deltas.items())]
+
+
+def apply_deltas(rollup, rows):
+    """
+    Add a batch's measures to the rollup with one ``INSERT ... ON CONFLICT DO UPDATE SET m = m + excluded.m``.
+
+    Deltas are applied after the batch commits. A batch that commits before a refresh reads
+    the raw table, but whose delta is applied after the refresh, is counted twice on its
+    days until the next refresh of those days recomputes them.
+    """
+    deltas = rollup_deltas(rollup, rows)
+    if not deltas:
+        return 0
+    table = rollup.table.__table__
+    with db.engine.begin() as conn:
+        stmt = insert_for_dialect(table, conn)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(table.primary_key.columns),
+            set_={measure.name: table.c[measure.name] + stmt.excluded[measure.name] for measure in rollup.measures},
+        )
+        conn.execute(stmt, deltas)
+    return len(deltas)
+
+
+def _measure_expression(source, measure):
+    value = 1 if measure.column is None else func.coalesce(source.c[measure.column], 0)
+    if measure.where:
+        value = case((source.c[measure.where[0]].in_(measure.where[1]), value), else_=0)
+    return func.coalesce(func.sum(value), 0)
+
+
+def refresh_rollup(rollup, since=None, full=False, lookback_days=None):
+    """
+    Recompute the rollup's days from ``since`` on from the raw table, in one transaction.
+
+    Without ``since``, the refresh starts ``lookback_days`` before the day of the stored
+    watermark (the latest raw timestamp the previous refresh saw), so rows that arrived
+    late, or were updated or deleted since, are folded in; with no watermark or ``full``
+    every day is rebuilt. Ingest deltas keep the rollup current between refreshes.
+
+    Returns:
+        dict: The refreshed range, the rollup rows written and the new watermark.
+    """
+    source = rollup.source.__table__
+    table = rollup.table.__table__
+    if lookback_days is None:
+        lookback_days = current_app.config["ROLLUP_REFRESH_LOOKBACK_DAYS"]
+    with db.engine.begin() as conn:
+        lift_statement_timeout(conn)
+        if since is None and not full:
+            watermark = conn.execute(select(RollupWatermark.refreshed_through)
+                                     .where(RollupWatermark.rollup == rollup.name)).scalar()
+            if watermark is not None:
+                since = watermark.date() - timedelta(days=lookback_days)
+        through = conn.execute(select(func.max(source.c.timestamp))).scalar()
+
+        day = func.date(source.c.timestamp)
+        dimensions = [func.coalesce(source.c[name], "") for name in rollup.dimensions]
+        query = (select(day, *dimensions, *(_measure_expression(source, m) for m in rollup.measures))
+                 .where(source.c.timestamp.is_not(None))
+                 .group_by(day, *dimensions))
+        clear = delete(table)
+        if since is not None:
+            query = query.where(source.c.timestamp >= datetime.combine(since, datetime.min.time()))
+            clear = clear.where(table.c.day >= since)
+        conn.execute(clear)
+        columns = ["day", *rollup.dimensions, *(measure.name for measure in rollup.measures)]
+        written = conn.execute(table.insert().from_select(columns, query)).rowcount
+
+        stmt = insert_for_dialect(RollupWatermark.__table__, conn)
+        values = {"refreshed_through": through, "refreshed_at": datetime.utcnow()}
+        conn.execute(stmt.values(rollup=rollup.name, **values)
+                     .on_conflict_do_update(index_elements=["rollup"], set_=values))
+    return {"rollup": rollup.name, "since": since.isoformat() if since else None, "rows": written,
+            "refreshed_through": through.isoformat() if through else None}
+
+
+def refresh_rollups(since=None, full=False):
+    return [refresh_rollup(rollup, since, full) for rollup in ROLLUPS.values()]
+
+
+def init_rollups(app):
+    """Keep the rollups current from every insert when ROLLUPS_ENABLED is set."""
+    if app.config["ROLLUPS_ENABLED"]:
+        rows_inserted.connect(_fold_inserted_rows)
+
+
+def _fold_inserted_rows(model, rows, **_):
+    rollup = _ROLLUP_BY_SOURCE.get(model)
+    if rollup is None or not has_app_context() or not current_app.config["ROLLUPS_ENABLED"]:
+        return
+    try:
+        apply_deltas(rollup, rows)
+    except Exception:
+        # The rows are committed; the next refresh of their days folds them in.
+        logger.exception("Updating the %s rollup failed", rollup.name)
+
+
+def _parse_day(args, name):
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid '{name}' date '{value}', expected YYYY-MM-DD")
+
+
+def query_rollup(name, args):
+    """
+    Read a rollup summed over ``group_by`` (comma-separated, default "day"), with rates.
+
+    ``from``/``to`` bound the days (inclusive); any dimension can be filtered by value.
+
+    Raises:
+        ValueError: On an unknown rollup, grouping, filter or a malformed date.
+    """
+    rollup = ROLLUPS.get(name)
+    if rollup is None:
+        raise ValueError(f"Unknown rollup '{name}', expected one of {', '.join(ROLLUPS)}")
+    groupable = ("day", *rollup.dimensions)
+    group_by = [column for column in args.get("group_by", "day").split(",") if column]
+    unknown = sorted(set(group_by) - set(groupable)) + sorted(set(args) - set(_RESERVED_ARGS) - set(rollup.dimensions))
+    if unknown:
+        raise ValueError(f"Unknown rollup column(s): {', '.join(unknown)}; expected {', '.join(groupable)}")
+
+    first, last = _parse_day(args, "from"), _parse_day(args, "to")
+    filters = {column: args[column] for column in rollup.dimensions if column in args}
+    query = _summed(rollup, group_by, [m.name for m in rollup.measures], first, last, filters)
+    others = {}
+    for rate in rollup.rates:
+        if isinstance(rate.denominator, tuple):
+            other, measure = rate.denominator
+            by_day = "day" in group_by
+            summed = db.session.execute(_summed(ROLLUPS[other], ["day"] if by_day else [], [measure], first, last))
+            others[rate.denominator] = {row.day if by_day else None: row._mapping[measure] for row in summed}
+
+    rows = []
+    for row in db.session.execute(query).mappings():
+        row = dict(row)
+        for rate in rollup.rates:
+            if isinstance(rate.denominator, tuple):
+                denominator = others[rate.denominator].get(row.get("day"))
+            else:
+                denominator = row[rate.denominator]
+            row[rate.name] = row[rate.numerator] / denominator if denominator else None
+        if "day" in row:
+            row["day"] = row["day"].isoformat()
+        rows.append(row)
+    return {"rollup": name, "group_by": group_by, "rows": rows}
+
+
+def _summed(rollup, group_by, measures, first=None, last=None, filters=None):
+    table = rollup.table.__table__
+    keys = [table.c[column] for column in group_by]
+    # PostgreSQL sums BIGINT to NUMERIC; cast back so counts stay integers.
+    query = select(*keys, *(cast(func.coalesce(func.sum(table.c[name]), 0), table.c[name].type).label(name)
+                            for name in measures))
+    if first:
+        query = query.where(table.c.day >= first)
+    if last:
+        query = query.where(table.c.day <= last)
+    for column, value in (filters or {}).items():
+        query = query.where(table.c[column] == value)
+    return query.group_by(*keys).order_by(*keys) if keys else query
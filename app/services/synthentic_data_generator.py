@@ -1,5 +1,8 @@
-import random, hashlib, secrets
-from faker import Faker
+import binascii, hashlib, itertools, pickle, string, tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from faker.providers.address import Provider as AddressProvider
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
@@ -8,7 +11,7 @@ import os
 import requests
 import time
 
-def write_dataframe_to_db_via_api(df, api_url, batch_size=1000):
+def write_dataframe_to_db_via_api(df, api_url, batch_size=1000, payload_format='json'):
     """
     Writes the rows of a DataFrame to the payment_msg table using the batch add_payment API.
 
@@ -16,412 +19,400 @@ def write_dataframe_to_db_via_api(df, api_url, batch_size=1000):
         df (pd.DataFrame): The DataFrame containing payment data.
         api_url (str): The base URL of the batch add_payment API endpoint.
         batch_size (int): Number of records to send in each batch.
+        payload_format (str): 'json' (a list of records) or 'arrow' (an Arrow IPC stream,
+            which the API validates and loads column-wise without per-row JSON).
     """
-    # Convert all Timestamp columns to ISO 8601 strings
     df = df.copy()
-    for col in df.select_dtypes(include=['datetime64[ns]', 'datetime64[ns, UTC]']).columns:
-        df[col] = df[col].dt.strftime('%Y-%m-%dT%H:%M:%S.%fZ')  # ISO 8601 format
+    if payload_format != 'arrow':
+        # Convert all Timestamp columns to ISO 8601 strings
+        for col in df.select_dtypes(include=['datetime64[ns]', 'datetime64[ns, UTC]']).columns:
+            df[col] = df[col].dt.strftime('%Y-%m-%dT%H:%M:%S.%fZ')  # ISO 8601 format
 
     for i in range(0, len(df), batch_size):
-        batch = df.iloc[i:i+batch_size].to_dict(orient='records')  # Convert batch to list of dictionaries
-        response = requests.post(api_url, json=batch)
+        if payload_format == 'arrow':
+            response = requests.post(api_url, data=dataframe_to_arrow_stream(df.iloc[i:i+batch_size]),
+                                     headers={'Content-Type': 'application/vnd.apache.arrow.stream'})
+        else:
+            batch = df.iloc[i:i+batch_size].to_dict(orient='records')  # Convert batch to list of dictionaries
+            response = requests.post(api_url, json=batch)
         if response.status_code != 201:
             print(f"Failed to insert batch starting at index {i}")
             print(f"Error: {response.text}")
         else:
             print(f"Successfully inserted batch starting at index {i}")
 
-def generate_base_entities(num_customers=1000, num_merchants=1000, multiple_device_ratio=0.1, scenario_ratio=0.01, twofa_ratio=0.3):
-    """Generate base entities: customer profiles with cards & devices, and merchant list with MCCs."""
-    faker = Faker()
-    Faker.seed(0)  # Ensure reproducible fake data
+def dataframe_to_arrow_stream(df):
+    """Serialize a DataFrame as an Arrow IPC stream (the body of a columnar /batch request)."""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+# Country codes Faker's country_code() draws from; the generators draw from them as arrays.
+COUNTRY_CODES = np.array(AddressProvider.alpha_2_country_codes)
+# Predefined cities for known countries to enrich the auth log location field
+KNOWN_CITIES = {
+    'US': ['New York','Los Angeles','Chicago','Houston','Miami'],
+    'GB': ['London','Manchester','Birmingham','Glasgow'],
+    'CA': ['Toronto','Vancouver','Montreal','Calgary'],
+    'AU': ['Sydney','Melbourne','Brisbane','Perth'],
+    'IN': ['Mumbai','Delhi','Bangalore','Kolkata'],
+    'DE': ['Berlin','Munich','Frankfurt','Hamburg'],
+    'FR': ['Paris','Lyon','Marseille','Toulouse'],
+    'CN': ['Beijing','Shanghai','Guangzhou','Shenzhen'],
+    'JP': ['Tokyo','Osaka','Yokohama','Nagoya'],
+    'BR': ['Sao Paulo','Rio de Janeiro','Brasilia'],
+    'MX': ['Mexico City','Guadalajara','Monterrey'],
+    'RU': ['Moscow','Saint Petersburg','Novosibirsk'],
+    'ES': ['Madrid','Barcelona','Valencia'],
+    'IT': ['Rome','Milan','Naples'],
+    'ZA': ['Johannesburg','Cape Town','Durban'],
+    'NG': ['Lagos','Abuja','Kano'],
+    'KE': ['Nairobi','Mombasa'],
+    'AE': ['Dubai','Abu Dhabi'],
+    'NL': ['Amsterdam','Rotterdam','The Hague'],
+    'SE': ['Stockholm','Gothenburg','Malmo']
+}
+# Country-to-currency mapping for assigning transaction currency
+CURRENCY_MAP = {
+    'US': 'USD', 'GB': 'GBP', 'CA': 'CAD', 'AU': 'AUD', 'SG': 'SGD', 'JP': 'JPY', 'CN': 'CNY', 'IN': 'INR',
+    'DE': 'EUR', 'FR': 'EUR', 'IT': 'EUR', 'ES': 'EUR', 'NL': 'EUR', 'BE': 'EUR', 'IE': 'EUR', 'PT': 'EUR',
+    'AT': 'EUR', 'FI': 'EUR', 'GR': 'EUR', 'BR': 'BRL', 'MX': 'MXN', 'RU': 'RUB', 'ZA': 'ZAR', 'AE': 'AED',
+    'KE': 'KES', 'NG': 'NGN', 'SE': 'SEK', 'CH': 'CHF', 'HK': 'HKD'
+}
+CARD_NETWORKS = np.array(['Visa', 'Mastercard', 'AMEX', 'Discover', 'JCB'])
+HIGH_RISK_MCC = np.array([7995, 5967, 7273, 5912, 5122, 4214, 6211, 4829, 6051, 5966])  # gambling, adult, pharma, etc.
+NORMAL_MCC = np.array([5411, 5812, 5813, 5300, 5331, 4511, 7011, 5941, 5999, 5200, 5311, 4111, 4812])  # common retail/travel
+_LETTERS = np.array(list(string.ascii_letters))
+_OCTET_BYTES = np.array([f'{i}.'.encode() for i in range(256)], dtype='S4').view(np.uint8).reshape(256, 4)
+
+def make_rng(seed=None):
+    """NumPy random generator for the generate_* functions; a fixed seed reproduces the same datasets."""
+    return np.random.default_rng(seed)
+
+def _random_times(rng, start_date, end_date, size):
+    """Uniform whole-second timestamps in [start_date, end_date] as datetime64[us]."""
+    span = int((end_date - start_date).total_seconds())
+    return np.datetime64(start_date, 'us') + rng.integers(0, span + 1, size).astype('timedelta64[s]')
+
+def _random_ipv4(rng, size):
+    """Dotted-quad IPv4 strings drawn as uint32 (class A-C space, like faker.ipv4())."""
+    ips = rng.integers(1 << 24, 224 << 24, size, dtype=np.uint32)
+    octets = np.stack([(ips >> shift) & 255 for shift in (24, 16, 8, 0)], axis=1)
+    # Lay out each address as "a.b.c.d." in 16 bytes, squeeze out the padding and drop the last dot
+    chars = _OCTET_BYTES[octets].reshape(size, 16)
+    chars = np.take_along_axis(chars, np.argsort(chars == 0, axis=1, kind='stable'), axis=1)
+    chars[np.arange(size), np.count_nonzero(chars, axis=1) - 1] = 0
+    return chars.view('S16').ravel().astype(str)
+
+def _random_hex(rng, min_bytes, max_bytes, size):
+    """Hex strings of min_bytes..max_bytes random bytes each (what secrets.token_hex gives per row)."""
+    lengths = rng.integers(min_bytes, max_bytes + 1, size)
+    out = np.empty(size, dtype=object)
+    for length in range(min_bytes, max_bytes + 1):
+        rows = np.flatnonzero(lengths == length)
+        if len(rows):
+            hexed = binascii.hexlify(rng.bytes(length * len(rows)))
+            out[rows] = np.frombuffer(hexed, dtype=f'S{2 * length}').astype(str)
+    return out
+
+def _random_digits(rng, digits, size):
+    numbers = rng.integers(0, 10 ** digits, size).astype(str)
+    return np.char.zfill(numbers, digits) if numbers.size else numbers  # zfill fails on empty arrays (shards without ATO users)
+
+def _random_letters(rng, count, size):
+    letters = _LETTERS[rng.integers(0, len(_LETTERS), (size, count))]
+    return letters[:, 0] if count == 1 else np.char.add(letters[:, 0], letters[:, 1])
+
+def _sha256_hex(values):
+    return np.array([hashlib.sha256(value.encode('utf-8')).hexdigest() for value in values], dtype=object)
+
+def _other_country(rng, country):
+    """A country code different from each of ``country`` (skipping it in the draw, not redrawing)."""
+    home = pd.Index(COUNTRY_CODES).get_indexer(country)
+    picked = rng.integers(0, len(COUNTRY_CODES) - 1, len(country))
+    picked += (home >= 0) & (picked >= home)
+    return COUNTRY_CODES[picked]
+
+def _locations(rng, country):
+    """"City, CC" for countries with known cities, else the country code."""
+    location = np.array(country, dtype=object)
+    for code, cities in KNOWN_CITIES.items():
+        rows = np.flatnonzero(country == code)
+        if len(rows):
+            location[rows] = np.char.add(np.array(cities)[rng.integers(0, len(cities), len(rows))], f', {code}')
+    return location
+
+def _pick_device(rng, customers, users):
+    """One of each user's trusted devices, uniformly."""
+    second = customers['second_device'][users]
+    use_second = (second > 0) & (rng.random(len(users)) < 0.5)
+    return np.where(use_second, second, customers['first_device'][users])
+
+def _customer_arrays(customers_info):
+    """The customers_info dicts as column arrays in user_id order (a shard's users need not start at 1)."""
+    user_ids = np.array(sorted(customers_info), dtype=np.int64)
+    infos = [customers_info[user_id] for user_id in user_ids.tolist()]
+    return {
+        'user_id': user_ids,
+        'home_country': np.array([info['home_country'] for info in infos]),
+        'first_device': np.array([info['devices'][0] for info in infos]),
+        'second_device': np.array([info['devices'][1] if len(info['devices']) > 1 else 0 for info in infos]),
+        'attacker_device': np.array([info.get('attacker_device', 0) for info in infos]),
+        'card_token': np.array([info['card_token'] for info in infos], dtype=object),
+        'card_network': np.array([info['card_network'] for info in infos], dtype=object),
+        'twofa_enabled': np.array([info['twofa_enabled'] for info in infos], dtype=bool),
+    }
+
+def _positions(customers, user_ids):
+    """Row positions in _customer_arrays of the given user ids."""
+    return np.searchsorted(customers['user_id'], np.array(list(user_ids), dtype=np.int64))
+
+def _merchant_arrays(merchants):
+    infos = [merchants[m_id] for m_id in range(1, len(merchants) + 1)]
+    return {
+        'mcc': np.array([m['mcc'] for m in infos]),
+        'country': np.array([m['country'] for m in infos]),
+        'high_risk': np.array([m['category'] == 'high_risk' for m in infos], dtype=bool),
+    }
+
+def _draw_population(num_customers, multiple_device_ratio=0.1, scenario_ratio=0.01, twofa_ratio=0.3, rng=None):
+    """
+    Per-customer draws that span all customers: ATO and 2FA selections, home countries and
+    device ids (numbered consecutively across users). Arrays are indexed by user_id - 1.
+    """
+    user_ids = np.arange(1, num_customers + 1)
+    # Select subsets of users for special scenarios: users targeted by ATO, users with 2FA enabled
+    scenario = np.isin(user_ids, rng.choice(user_ids, int(num_customers * scenario_ratio), replace=False))
+    twofa = np.isin(user_ids, rng.choice(user_ids, int(num_customers * twofa_ratio), replace=False))
+    # Assign 1 (or occasionally 2) trusted devices to each user, plus an attacker's device (not in devices) for scenario users
+    has_second = rng.random(num_customers) < multiple_device_ratio
+    first_device = np.cumsum(1 + has_second + scenario) - has_second - scenario
+    # Assign a home country (ISO country code) for contextualizing location anomalies
+    home_country = COUNTRY_CODES[rng.integers(0, len(COUNTRY_CODES), num_customers)]
+    return {'scenario': scenario, 'twofa': twofa, 'has_second': has_second, 'first_device': first_device,
+            'home_country': home_country}
+
+def _draw_customers(population, first_user_id, rng):
+    """Customer profiles (customers_info) and ATO targets for a slice of the population starting at first_user_id."""
+    num_customers = len(population['scenario'])
+    # Card token = SHA-256 of a card number on a random network
+    card_networks = CARD_NETWORKS[rng.integers(0, len(CARD_NETWORKS), num_customers)]
+    card_tokens = _sha256_hex(_random_digits(rng, 16, num_customers))
     customers_info = {}
-    next_device_id = 1
-    # Select subsets of users for special scenarios:
-    scenario_users = set(random.sample(range(1, num_customers+1), int(num_customers * scenario_ratio)))  # users targeted by ATO
-    twofa_users = set(random.sample(range(1, num_customers+1), int(num_customers * twofa_ratio)))        # users with 2FA enabled
-    # Credit card network mapping for gateway_provider field
-    card_network_map = {'visa': 'Visa', 'mastercard': 'Mastercard', 'amex': 'AMEX', 'discover': 'Discover', 'jcb': 'JCB'}
-    for user_id in range(1, num_customers+1):
-        # Assign 1 (or occasionally 2) trusted devices to each user
-        device_ids = [next_device_id]; next_device_id += 1
-        if random.random() < multiple_device_ratio:
-            device_ids.append(next_device_id); next_device_id += 1
-        # If this user is in the scenario list, create an extra device as the attacker's device (not in device_ids)
-        attacker_device_id = None
-        if user_id in scenario_users:
-            attacker_device_id = next_device_id; next_device_id += 1
-        # Generate a credit card number and token (hashed) for the user
-        card_type = random.choice(list(card_network_map.keys()))
-        card_number = faker.credit_card_number(card_type=card_type)
-        card_token = hashlib.sha256(card_number.encode('utf-8')).hexdigest()
-        card_network = card_network_map[card_type]
-        # Assign a home country (ISO country code) for contextualizing location anomalies
-        country_code = faker.country_code()
-        customers_info[user_id] = {
-            'card_token': card_token,
-            'devices': device_ids,
-            'home_country': country_code,
-            'card_network': card_network,
-            'twofa_enabled': (user_id in twofa_users)
+    for i in range(num_customers):
+        first_device = int(population['first_device'][i])
+        devices = [first_device, first_device + 1] if population['has_second'][i] else [first_device]
+        customers_info[first_user_id + i] = {
+            'card_token': card_tokens[i],
+            'devices': devices,
+            'home_country': str(population['home_country'][i]),
+            'card_network': str(card_networks[i]),
+            'twofa_enabled': bool(population['twofa'][i])
         }
-        if attacker_device_id:
-            customers_info[user_id]['attacker_device'] = attacker_device_id
-    # Generate merchants with random MCC codes (10% high-risk categories, 90% normal)
-    merchants = {}
-    high_risk_mcc = [7995, 5967, 7273, 5912, 5122, 4214, 6211, 4829, 6051, 5966]  # high-risk MCCs (gambling, adult, pharma, etc.)
-    normal_mcc    = [5411, 5812, 5813, 5300, 5331, 4511, 7011, 5941, 5999, 5200, 5311, 4111, 4812]      # common retail/travel MCCs
-    for m_id in range(1, num_merchants+1):
-        if random.random() < 0.1:
-            mcc = random.choice(high_risk_mcc); category = 'high_risk'
-        else:
-            mcc = random.choice(normal_mcc); category = 'normal'
-        m_country = faker.country_code()  # assign a country code for the merchant
-        merchants[m_id] = {'mcc': mcc, 'country': m_country, 'category': category}
+        if population['scenario'][i]:
+            customers_info[first_user_id + i]['attacker_device'] = devices[-1] + 1
+    scenario_users = set((first_user_id + np.flatnonzero(population['scenario'])).tolist())
+    return customers_info, scenario_users
+
+def _draw_merchants(num_merchants, rng):
+    """Merchants with random MCC codes (10% high-risk categories, 90% normal) and countries."""
+    high_risk = rng.random(num_merchants) < 0.1
+    mccs = np.where(high_risk, HIGH_RISK_MCC[rng.integers(0, len(HIGH_RISK_MCC), num_merchants)],
+                    NORMAL_MCC[rng.integers(0, len(NORMAL_MCC), num_merchants)])
+    m_countries = COUNTRY_CODES[rng.integers(0, len(COUNTRY_CODES), num_merchants)]
+    return {m_id: {'mcc': int(mccs[i]), 'country': str(m_countries[i]), 'category': 'high_risk' if high_risk[i] else 'normal'}
+            for i, m_id in enumerate(range(1, num_merchants + 1))}
+
+def generate_base_entities(num_customers=1000, num_merchants=1000, multiple_device_ratio=0.1, scenario_ratio=0.01, twofa_ratio=0.3, rng=None):
+    """Generate base entities: customer profiles with cards & devices, and merchant list with MCCs."""
+    rng = rng if rng is not None else make_rng()
+    population = _draw_population(num_customers, multiple_device_ratio, scenario_ratio, twofa_ratio, rng)
+    merchants = _draw_merchants(num_merchants, rng)
+    customers_info, scenario_users = _draw_customers(population, 1, rng)
     return customers_info, merchants, scenario_users
 
-def generate_auth_log(customers_info, scenario_users, start_date, end_date):
+def _login_failures(rng, twofa, fail_count):
+    """Split each session's failures into password failures and (2FA users with several failures, half the time) a final OTP failure."""
+    otp_fail = twofa & (fail_count > 1) & (rng.random(len(fail_count)) < 0.5)
+    return fail_count - otp_fail, otp_fail
+
+def generate_auth_log(customers_info, scenario_users, start_date, end_date, rng=None):
     """Generate authentication log entries, including normal login attempts and account takeover events."""
-    faker = Faker()
-    records = []
-    auth_event_id = 1
-    start_ts = int(start_date.timestamp()); end_ts = int(end_date.timestamp())
-    compromised_times = {}  # to record the timestamp of successful attacker login for scenario users
+    rng = rng if rng is not None else make_rng()
+    customers = _customer_arrays(customers_info)
     num_users = len(customers_info)
-    # Simulate number of login sessions per user (Poisson distribution for variability)
-    session_counts = np.random.poisson(12, size=num_users)  # ~12 sessions per user on average over 3 years
-    session_counts = [max(1, int(x)) for x in session_counts]
-    # Predefined cities for known countries to enrich location field
-    known_cities = {
-        'US': ['New York','Los Angeles','Chicago','Houston','Miami'],
-        'GB': ['London','Manchester','Birmingham','Glasgow'],
-        'CA': ['Toronto','Vancouver','Montreal','Calgary'],
-        'AU': ['Sydney','Melbourne','Brisbane','Perth'],
-        'IN': ['Mumbai','Delhi','Bangalore','Kolkata'],
-        'DE': ['Berlin','Munich','Frankfurt','Hamburg'],
-        'FR': ['Paris','Lyon','Marseille','Toulouse'],
-        'CN': ['Beijing','Shanghai','Guangzhou','Shenzhen'],
-        'JP': ['Tokyo','Osaka','Yokohama','Nagoya'],
-        'BR': ['Sao Paulo','Rio de Janeiro','Brasilia'],
-        'MX': ['Mexico City','Guadalajara','Monterrey'],
-        'RU': ['Moscow','Saint Petersburg','Novosibirsk'],
-        'ES': ['Madrid','Barcelona','Valencia'],
-        'IT': ['Rome','Milan','Naples'],
-        'ZA': ['Johannesburg','Cape Town','Durban'],
-        'NG': ['Lagos','Abuja','Kano'],
-        'KE': ['Nairobi','Mombasa'],
-        'AE': ['Dubai','Abu Dhabi'],
-        'NL': ['Amsterdam','Rotterdam','The Hague'],
-        'SE': ['Stockholm','Gothenburg','Malmo']
-    }
-    for idx, user_id in enumerate(range(1, num_users+1)):
-        info = customers_info[user_id]
-        home_country = info['home_country']
-        user_devices = info['devices']
-        twofa_enabled = info['twofa_enabled']
-        # Simulate each login session for this user
-        for s in range(session_counts[idx]):
-            # Randomly decide if this session has failures before success
-            fail_count = 0
-            if random.random() < 0.2:  # 20% chance of having login failures in a session
-                fail_count = 1
-                if random.random() < 0.1:  # 10% chance (of those) to have more than one failure
-                    fail_count = random.randint(2, 4)  # could be 2 to 4 failed attempts
-            # Choose a random timestamp for the successful login in this session
-            success_ts = random.randint(start_ts, end_ts)
-            success_time = datetime.fromtimestamp(success_ts)
-            device_id = random.choice(user_devices)  # pick one of the user's known devices
-            channel = random.choice(['Web', 'Mobile'])
-            # Determine location string (use city if country is known for better realism)
-            if home_country in known_cities:
-                city = random.choice(known_cities[home_country])
-                location = f"{city}, {home_country}"
-            else:
-                location = home_country
-            # Occasionally simulate login from a different country (travel or VPN scenario)
-            if random.random() < 0.05:
-                alt_country = home_country
-                while alt_country == home_country:
-                    alt_country = faker.country_code()
-                if alt_country in known_cities:
-                    city = random.choice(known_cities[alt_country]); location = f"{city}, {alt_country}"
-                else:
-                    location = alt_country
-            # If there are failures, log them just before the success_time
-            otp_fail = False
-            pass_fail_count = fail_count
-            if twofa_enabled and fail_count > 1 and random.random() < 0.5:
-                # If user has 2FA and multiple failures, treat the last failure as an OTP failure
-                otp_fail = True
-                pass_fail_count = fail_count - 1
-            for attempt in range(1, pass_fail_count + 1):
-                fail_time = success_time - timedelta(seconds=5 * (pass_fail_count - attempt + (1 if otp_fail else 0)))
-                records.append({
-                    'auth_event_id': auth_event_id,
-                    'customer_id': user_id,
-                    'device_id': device_id,
-                    'timestamp': fail_time,
-                    'auth_type': 'password',
-                    'ip_address': faker.ipv4(),
-                    'channel': channel,
-                    'location': location,
-                    'auth_status': 'failure',
-                    'failure_reason': 'Wrong password',
-                    'login_attempts': attempt
-                })
-                auth_event_id += 1
-            if twofa_enabled and otp_fail:
-                # Log a 2FA (OTP) failure as the last failure before success
-                attempt_num = pass_fail_count + 1
-                fail_time = success_time - timedelta(seconds=2)
-                records.append({
-                    'auth_event_id': auth_event_id,
-                    'customer_id': user_id,
-                    'device_id': device_id,
-                    'timestamp': fail_time,
-                    'auth_type': '2FA',
-                    'ip_address': faker.ipv4(),
-                    'channel': channel,
-                    'location': location,
-                    'auth_status': 'failure',
-                    'failure_reason': 'OTP mismatch',
-                    'login_attempts': attempt_num
-                })
-                auth_event_id += 1
-            # Log the successful login event
-            total_attempts = fail_count + 1
-            records.append({
-                'auth_event_id': auth_event_id,
-                'customer_id': user_id,
-                'device_id': device_id,
-                'timestamp': success_time,
-                'auth_type': '2FA' if twofa_enabled else 'password',
-                'ip_address': faker.ipv4(),
-                'channel': channel,
-                'location': location,
-                'auth_status': 'success',
-                'failure_reason': '',
-                'login_attempts': total_attempts
-            })
-            auth_event_id += 1
-        # If this user is targeted for an account takeover scenario, simulate an attacker login session
-        if user_id in scenario_users:
-            comp_ts = random.randint(start_ts, end_ts)
-            comp_time = datetime.fromtimestamp(comp_ts)
-            attacker_device = info['attacker_device']
-            # Pick an attacker location different from user's home country
-            attacker_country = info['home_country']
-            while attacker_country == info['home_country']:
-                attacker_country = faker.country_code()
-            if attacker_country in known_cities:
-                city = random.choice(known_cities[attacker_country]); attacker_location = f"{city}, {attacker_country}"
-            else:
-                attacker_location = attacker_country
-            channel = random.choice(['Web', 'Mobile'])
-            # Attacker failures before success
-            fail_count = random.randint(1, 4)  # assume attacker will have at least 1 failed attempt
-            otp_fail = False
-            pass_fail_count = fail_count
-            if info['twofa_enabled'] and fail_count > 1 and random.random() < 0.5:
-                otp_fail = True
-                pass_fail_count = fail_count - 1
-            for attempt in range(1, pass_fail_count + 1):
-                fail_time = comp_time - timedelta(seconds=5 * (pass_fail_count - attempt + (1 if otp_fail else 0)))
-                records.append({
-                    'auth_event_id': auth_event_id,
-                    'customer_id': user_id,
-                    'device_id': attacker_device,
-                    'timestamp': fail_time,
-                    'auth_type': 'password',
-                    'ip_address': faker.ipv4(),
-                    'channel': channel,
-                    'location': attacker_location,
-                    'auth_status': 'failure',
-                    'failure_reason': 'Wrong password',
-                    'login_attempts': attempt
-                })
-                auth_event_id += 1
-            if info['twofa_enabled'] and otp_fail:
-                attempt_num = pass_fail_count + 1
-                fail_time = comp_time - timedelta(seconds=2)
-                records.append({
-                    'auth_event_id': auth_event_id,
-                    'customer_id': user_id,
-                    'device_id': attacker_device,
-                    'timestamp': fail_time,
-                    'auth_type': '2FA',
-                    'ip_address': faker.ipv4(),
-                    'channel': channel,
-                    'location': attacker_location,
-                    'auth_status': 'failure',
-                    'failure_reason': 'OTP mismatch',
-                    'login_attempts': attempt_num
-                })
-                auth_event_id += 1
-            # Successful attacker login (account takeover success)
-            total_attempts = fail_count + 1
-            records.append({
-                'auth_event_id': auth_event_id,
-                'customer_id': user_id,
-                'device_id': attacker_device,
-                'timestamp': comp_time,
-                'auth_type': '2FA' if info['twofa_enabled'] else 'password',
-                'ip_address': faker.ipv4(),
-                'channel': channel,
-                'location': attacker_location,
-                'auth_status': 'success',
-                'failure_reason': '',
-                'login_attempts': total_attempts
-            })
-            auth_event_id += 1
-            compromised_times[user_id] = comp_time  # record the time of compromise for use in transaction generation
+    # Simulate number of login sessions per user (Poisson distribution for variability), one row per session
+    session_counts = np.maximum(1, rng.poisson(12, size=num_users))  # ~12 sessions per user on average over 3 years
+    users = np.repeat(np.arange(num_users), session_counts)
+    n = len(users)
+    # 20% of sessions have a failure before success; 10% of those have 2 to 4 failed attempts
+    fail_count = np.where(rng.random(n) < 0.2, np.where(rng.random(n) < 0.1, rng.integers(2, 5, n), 1), 0)
+    success_time = _random_times(rng, start_date, end_date, n)
+    device = _pick_device(rng, customers, users)
+    channel = np.array(['Web', 'Mobile'])[rng.integers(0, 2, n)]
+    # Occasionally (5%) log in from a different country (travel or VPN scenario)
+    country = customers['home_country'][users]
+    travelling = rng.random(n) < 0.05
+    country = np.where(travelling, _other_country(rng, country), country)
+    location = _locations(rng, country)
+
+    # Account takeover: one attacker session per scenario user, from the attacker's device in another country
+    attacked = _positions(customers, sorted(scenario_users))
+    k = len(attacked)
+    comp_time = _random_times(rng, start_date, end_date, k)
+    attacker_location = _locations(rng, _other_country(rng, customers['home_country'][attacked]))
+    attacker_channel = np.array(['Web', 'Mobile'])[rng.integers(0, 2, k)]
+    attacker_fails = rng.integers(1, 5, k)  # assume attacker will have at least 1 failed attempt
+
+    # Sessions in generation order: each user's own sessions, then the attacker's
+    users = np.concatenate([users, attacked])
+    order = np.argsort(users, kind='stable')
+    users = users[order]
+    fail_count = np.concatenate([fail_count, attacker_fails])[order]
+    success_time = np.concatenate([success_time, comp_time])[order]
+    device = np.concatenate([device, customers['attacker_device'][attacked]])[order]
+    channel = np.concatenate([channel, attacker_channel])[order]
+    location = np.concatenate([location, attacker_location])[order]
+    twofa = customers['twofa_enabled'][users]
+    pass_fail_count, otp_fail = _login_failures(rng, twofa, fail_count)
+
+    # Explode sessions into events: password failures, an optional OTP failure, then the success
+    events_per_session = pass_fail_count + otp_fail + 1
+    session = np.repeat(np.arange(len(users)), events_per_session)
+    attempt = np.arange(len(session)) - np.repeat(np.cumsum(events_per_session) - events_per_session, events_per_session) + 1
+    passes, otp = pass_fail_count[session], otp_fail[session]
+    is_password_fail = attempt <= passes
+    is_success = attempt == events_per_session[session]
+    # Password failures 5s apart before the success (before the OTP failure, 2s before success, if any)
+    offset = np.where(is_password_fail, 5 * (passes - attempt + otp), np.where(is_success, 0, 2))
+    df_auth = pd.DataFrame({
+        'auth_event_id': np.arange(1, len(session) + 1),
+        'customer_id': customers['user_id'][users[session]],
+        'device_id': device[session],
+        'timestamp': success_time[session] - offset.astype('timedelta64[s]'),
+        'auth_type': np.where(is_password_fail | (is_success & ~twofa[session]), 'password', '2FA'),
+        'ip_address': _random_ipv4(rng, len(session)),
+        'channel': channel[session],
+        'location': location[session],
+        'auth_status': np.where(is_success, 'success', 'failure'),
+        'failure_reason': np.where(is_password_fail, 'Wrong password', np.where(is_success, '', 'OTP mismatch')),
+        'login_attempts': np.where(is_success, fail_count[session] + 1, attempt),
+    })
     # Sort all events by time for realism
-    records.sort(key=lambda x: x['timestamp'])
-    df_auth = pd.DataFrame(records)
+    df_auth = df_auth.sort_values('timestamp', kind='stable', ignore_index=True)
+    # Time of the successful attacker login per scenario user, for use in transaction generation
+    compromised_times = dict(zip(customers['user_id'][attacked].tolist(), pd.DatetimeIndex(comp_time).to_pydatetime()))
     return df_auth, compromised_times
 
-def generate_payment_msgs(customers_info, merchants, scenario_users, compromised_times, start_date, end_date):
+def _currencies(rng, country):
+    """Currency of each merchant country, or a random major currency when unmapped."""
+    currency = pd.Series(country).map(CURRENCY_MAP).to_numpy(dtype=object)
+    unmapped = pd.isna(currency)
+    currency[unmapped] = np.array(['USD', 'EUR', 'GBP', 'AUD'])[rng.integers(0, 4, unmapped.sum())]
+    return currency
+
+def _approved_auth_codes(rng, size):
+    return _random_digits(rng, 6, size)
+
+def generate_payment_msgs(customers_info, merchants, scenario_users, compromised_times, start_date, end_date, rng=None):
     """Generate payment transaction records with embedded fraud signals and anomalies."""
-    faker = Faker()
-    records = []
-    message_id = 1
-    start_ts = int(start_date.timestamp()); end_ts = int(end_date.timestamp())
-    scenario_tx_ids = []  # list of message_ids for fraudulent transactions (for dispute referencing)
-    num_users = len(customers_info)
+    rng = rng if rng is not None else make_rng()
+    customers = _customer_arrays(customers_info)
+    merchant_arrays = _merchant_arrays(merchants)
+    num_users, num_merchants = len(customers_info), len(merchants)
     # Determine how many transactions each user makes (Poisson distribution around 10)
-    trans_counts = np.random.poisson(10, size=num_users)
-    trans_counts = [max(1, int(x)) for x in trans_counts]
-    # Country-to-currency mapping for assigning transaction currency
-    currency_map = {
-        'US': 'USD', 'GB': 'GBP', 'CA': 'CAD', 'AU': 'AUD', 'SG': 'SGD', 'JP': 'JPY', 'CN': 'CNY', 'IN': 'INR',
-        'DE': 'EUR', 'FR': 'EUR', 'IT': 'EUR', 'ES': 'EUR', 'NL': 'EUR', 'BE': 'EUR', 'IE': 'EUR', 'PT': 'EUR',
-        'AT': 'EUR', 'FI': 'EUR', 'GR': 'EUR', 'BR': 'BRL', 'MX': 'MXN', 'RU': 'RUB', 'ZA': 'ZAR', 'AE': 'AED',
-        'KE': 'KES', 'NG': 'NGN', 'SE': 'SEK', 'CH': 'CHF', 'HK': 'HKD'
-    }
-    for idx, user_id in enumerate(range(1, num_users+1)):
-        info = customers_info[user_id]
-        card_token = info['card_token']; user_country = info['home_country']
-        for t in range(trans_counts[idx]):
-            # Pick a merchant (favor lower IDs to simulate popular merchants)
-            if random.random() < 0.8:
-                merchant_id = random.randint(1, min(len(merchants), 200))
-            else:
-                merchant_id = random.randint(1, len(merchants))
-            m_info = merchants[merchant_id]
-            mcc = m_info['mcc']; merch_country = m_info['country']
-            device_id = random.choice(info['devices'])
-            channel = random.choice(['POS', 'Online', 'Mobile'])
-            # Amount: 98% transactions are small (< $500), 2% are large (up to $10k)
-            amount = round(random.uniform(1, 500), 2) if random.random() < 0.98 else round(random.uniform(500, 10000), 2)
-            currency = currency_map.get(merch_country, random.choice(['USD', 'EUR', 'GBP', 'AUD']))
-            trans_time = datetime.fromtimestamp(random.randint(start_ts, end_ts))
-            ip_address = faker.ipv4()
-            # Compute a risk score based on anomalies
-            risk_score = 0
-            if amount > 2000:
-                risk_score += 30  # high amount
-            if user_country != merch_country:
-                risk_score += 20  # foreign transaction
-            if m_info['category'] == 'high_risk':
-                risk_score += 20  # high-risk industry merchant
-            if device_id not in info['devices'] or device_id != info['devices'][0]:
-                risk_score += 5   # using a secondary/new device
-            risk_score = min(100, max(0, risk_score + random.randint(-5, 5)))  # add noise and clamp 0-100
-            # Decide status: higher risk increases chance of decline
-            base_decline_prob = 0.03
-            if risk_score > 80:
-                base_decline_prob = 0.2  # very risky -> 20% decline
-            elif risk_score > 50:
-                base_decline_prob = 0.1  # moderately risky -> 10% decline
-            if random.random() < base_decline_prob:
-                status = 'declined'
-                response_code = '07' if risk_score > 80 else random.choice(['05', '51', '54', '65'])
-                auth_code = ''  # no auth code on decline
-            else:
-                status = 'approved'
-                response_code = '00'
-                auth_code = str(random.randint(0, 999999)).zfill(6)
-            iso_message_hex = secrets.token_hex(random.randint(8, 16))  # random hex string to simulate ISO8583 message content
-            gateway_provider = info['card_network']
-            records.append({
-                'message_id': message_id,
-                'card_number_token': card_token,
-                'merchant_id': merchant_id,
-                'device_id': device_id,
-                'amount': amount,
-                'currency': currency,
-                'mcc': mcc,
-                'channel': channel,
-                'country': merch_country,
-                'response_code': response_code,
-                'auth_code': auth_code,
-                'iso_message_hex': iso_message_hex,
-                'gateway_provider': gateway_provider,
-                'status': status,
-                'risk_score': int(risk_score),
-                'ip_address': ip_address,
-                'timestamp': trans_time
-            })
-            message_id += 1
+    trans_counts = np.maximum(1, rng.poisson(10, size=num_users))
+    users = np.repeat(np.arange(num_users), trans_counts)
+    n = len(users)
+    # Pick a merchant (favor lower IDs to simulate popular merchants)
+    merchant_id = np.where(rng.random(n) < 0.8, rng.integers(1, min(num_merchants, 200) + 1, n), rng.integers(1, num_merchants + 1, n))
+    mcc = merchant_arrays['mcc'][merchant_id - 1]; merch_country = merchant_arrays['country'][merchant_id - 1]
+    device_id = _pick_device(rng, customers, users)
+    channel = np.array(['POS', 'Online', 'Mobile'])[rng.integers(0, 3, n)]
+    # Amount: 98% transactions are small (< $500), 2% are large (up to $10k)
+    amount = np.round(np.where(rng.random(n) < 0.98, rng.uniform(1, 500, n), rng.uniform(500, 10000, n)), 2)
+    # Compute a risk score based on anomalies: high amount, foreign transaction, high-risk merchant, secondary device
+    risk_score = (30 * (amount > 2000) + 20 * (customers['home_country'][users] != merch_country)
+                  + 20 * merchant_arrays['high_risk'][merchant_id - 1] + 5 * (device_id != customers['first_device'][users]))
+    risk_score = np.clip(risk_score + rng.integers(-5, 6, n), 0, 100)  # add noise and clamp 0-100
+    # Decide status: higher risk increases chance of decline (3%, 10% above 50, 20% above 80)
+    decline_prob = np.select([risk_score > 80, risk_score > 50], [0.2, 0.1], 0.03)
+    declined = rng.random(n) < decline_prob
+    response_code = np.where(declined, np.where(risk_score > 80, '07', np.array(['05', '51', '54', '65'])[rng.integers(0, 4, n)]), '00')
+    auth_code = np.where(declined, '', _approved_auth_codes(rng, n))  # no auth code on decline
+    df_normal = pd.DataFrame({
+        'card_number_token': customers['card_token'][users],
+        'merchant_id': merchant_id,
+        'device_id': device_id,
+        'amount': amount,
+        'currency': _currencies(rng, merch_country),
+        'mcc': mcc,
+        'channel': channel,
+        'country': merch_country,
+        'response_code': response_code,
+        'auth_code': auth_code,
+        'iso_message_hex': _random_hex(rng, 8, 16, n),  # random hex string to simulate ISO8583 message content
+        'gateway_provider': customers['card_network'][users],
+        'status': np.where(declined, 'declined', 'approved'),
+        'risk_score': risk_score,
+        'ip_address': _random_ipv4(rng, n),
+        'timestamp': _random_times(rng, start_date, end_date, n),
+    })
+
     # Inject additional fraudulent transactions post-ATO (each scenario user gets one fraud txn after compromise)
-    for user_id, comp_time in compromised_times.items():
-        info = customers_info[user_id]
-        # Often choose a high-risk merchant for the fraudulent transaction
-        if random.random() < 0.5:
-            high_risk_merchants = [mid for mid, m in merchants.items() if m['category'] == 'high_risk']
-            merchant_id = random.choice(high_risk_merchants) if high_risk_merchants else random.randint(1, len(merchants))
-        else:
-            merchant_id = random.randint(1, len(merchants))
-        m_info = merchants[merchant_id]
-        mcc = m_info['mcc']; merch_country = m_info['country']
-        device_id = info['attacker_device']
-        channel = random.choice(['Online', 'Mobile'])
-        # Fraudulent amount tends to be larger on average
-        amount = round(random.uniform(500, 10000), 2) if random.random() < 0.7 else round(random.uniform(1, 500), 2)
-        currency = currency_map.get(merch_country, random.choice(['USD', 'EUR', 'GBP', 'AUD']))
-        # Schedule this fraud transaction a short time after account takeover
-        delay_seconds = random.randint(60, 86400)  # between 1 minute and 1 day later
-        fraud_time = comp_time + timedelta(seconds=delay_seconds)
-        if fraud_time > end_date:
-            fraud_time = end_date
-        ip_address = faker.ipv4()
-        # High risk score (attacker device, possible foreign use, high amount, high-risk MCC)
-        risk_score = 0
-        if amount > 2000: risk_score += 30
-        if customers_info[user_id]['home_country'] != merch_country: risk_score += 20
-        if m_info['category'] == 'high_risk': risk_score += 20
-        risk_score += 20  # using unknown device (attacker)
-        risk_score = min(100, risk_score + random.randint(0, 5))
-        status = 'approved'  # assume the fraudulent charge went through
-        response_code = '00'; auth_code = str(random.randint(0, 999999)).zfill(6)
-        iso_message_hex = secrets.token_hex(random.randint(8, 16))
-        gateway_provider = info['card_network']
-        records.append({
-            'message_id': message_id,
-            'card_number_token': info['card_token'],
-            'merchant_id': merchant_id,
-            'device_id': device_id,
-            'amount': amount,
-            'currency': currency,
-            'mcc': mcc,
-            'channel': channel,
-            'country': merch_country,
-            'response_code': response_code,
-            'auth_code': auth_code,
-            'iso_message_hex': iso_message_hex,
-            'gateway_provider': gateway_provider,
-            'status': status,
-            'risk_score': int(risk_score),
-            'ip_address': ip_address,
-            'timestamp': fraud_time
-        })
-        scenario_tx_ids.append(message_id)
-        message_id += 1
-    df_payment = pd.DataFrame(records)
+    fraud_users = _positions(customers, compromised_times)
+    k = len(fraud_users)
+    # Often (50%) choose a high-risk merchant for the fraudulent transaction
+    high_risk_ids = np.flatnonzero(merchant_arrays['high_risk']) + 1
+    any_merchant = rng.integers(1, num_merchants + 1, k)
+    if len(high_risk_ids):
+        merchant_id = np.where(rng.random(k) < 0.5, high_risk_ids[rng.integers(0, len(high_risk_ids), k)], any_merchant)
+    else:
+        merchant_id = any_merchant
+    merch_country = merchant_arrays['country'][merchant_id - 1]
+    # Fraudulent amount tends to be larger on average
+    amount = np.round(np.where(rng.random(k) < 0.7, rng.uniform(500, 10000, k), rng.uniform(1, 500, k)), 2)
+    # Schedule the fraud transaction between 1 minute and 1 day after account takeover
+    comp_time = np.array(list(compromised_times.values()), dtype='datetime64[us]')
+    fraud_time = np.minimum(comp_time + rng.integers(60, 86401, k).astype('timedelta64[s]'), np.datetime64(end_date, 'us'))
+    # High risk score (attacker device, possible foreign use, high amount, high-risk MCC)
+    risk_score = (30 * (amount > 2000) + 20 * (customers['home_country'][fraud_users] != merch_country)
+                  + 20 * merchant_arrays['high_risk'][merchant_id - 1] + 20)
+    risk_score = np.minimum(100, risk_score + rng.integers(0, 6, k))
+    df_fraud = pd.DataFrame({
+        'card_number_token': customers['card_token'][fraud_users],
+        'merchant_id': merchant_id,
+        'device_id': customers['attacker_device'][fraud_users],
+        'amount': amount,
+        'currency': _currencies(rng, merch_country),
+        'mcc': merchant_arrays['mcc'][merchant_id - 1],
+        'channel': np.array(['Online', 'Mobile'])[rng.integers(0, 2, k)],
+        'country': merch_country,
+        'response_code': '00',  # assume the fraudulent charge went through
+        'auth_code': _approved_auth_codes(rng, k),
+        'iso_message_hex': _random_hex(rng, 8, 16, k),
+        'gateway_provider': customers['card_network'][fraud_users],
+        'status': 'approved',
+        'risk_score': risk_score,
+        'ip_address': _random_ipv4(rng, k),
+        'timestamp': fraud_time,
+    })
+    df_payment = pd.concat([df_normal, df_fraud], ignore_index=True)
+    df_payment.insert(0, 'message_id', np.arange(1, len(df_payment) + 1))
+    df_payment['risk_score'] = df_payment['risk_score'].astype(np.int64)
+    scenario_tx_ids = df_payment['message_id'].iloc[len(df_normal):].tolist()  # fraudulent transactions (for dispute referencing)
     return df_payment, scenario_tx_ids
 
-def generate_dispute_msgs(df_payment, scenario_tx_ids, customers_info, start_date, end_date):
+DISPUTE_COLUMNS = ['dispute_id', 'transaction_id', 'customer_id', 'merchant_id', 'amount', 'currency', 'timestamp',
+                   'dispute_reason_code', 'dispute_stage', 'status', 'evidence_provided', 'resolution_timestamp']
+
+def generate_dispute_msgs(df_payment, scenario_tx_ids, customers_info, start_date, end_date, rng=None):
     """Generate dispute/chargeback records for fraudulent transactions and friendly fraud cases."""
+    rng = rng if rng is not None else make_rng()
     records = []
     dispute_id = 1
     end_dt = end_date
@@ -436,13 +427,13 @@ def generate_dispute_msgs(df_payment, scenario_tx_ids, customers_info, start_dat
         merchant_id = trans['merchant_id']; amount = trans['amount']; currency = trans['currency']
         tx_time = trans['timestamp']
         # Randomly classify some as triangulation fraud disputes
-        reason_code = 'FRAUD' if random.random() < 0.5 else 'TRIANGULATION'
+        reason_code = 'FRAUD' if rng.random() < 0.5 else 'TRIANGULATION'
         # Most fraud disputes start as chargebacks; some go to arbitration
-        stage = 'Arbitration' if random.random() < 0.3 else 'Chargeback Initiated'
+        stage = 'Arbitration' if rng.random() < 0.3 else 'Chargeback Initiated'
         status = 'Closed'
-        evidence = 'Yes' if random.random() < 0.7 else 'No'  # assume merchant often provides evidence in fraud cases
+        evidence = 'Yes' if rng.random() < 0.7 else 'No'  # assume merchant often provides evidence in fraud cases
         # File the dispute a few days/weeks after the transaction
-        delay_days = random.randint(1, 90)
+        delay_days = int(rng.integers(1, 91))
         dispute_time = tx_time + timedelta(days=delay_days)
         if dispute_time > end_dt:
             dispute_time = end_dt
@@ -451,7 +442,7 @@ def generate_dispute_msgs(df_payment, scenario_tx_ids, customers_info, start_dat
             evidence = 'No'
         resolution_time = ''
         if status == 'Closed':
-            res_time = dispute_time + timedelta(days=random.randint(1, 60))
+            res_time = dispute_time + timedelta(days=int(rng.integers(1, 61)))
             if res_time > end_dt:
                 res_time = end_dt
             resolution_time = res_time
@@ -471,10 +462,10 @@ def generate_dispute_msgs(df_payment, scenario_tx_ids, customers_info, start_dat
         })
         dispute_id += 1
     # Disputes for friendly fraud (legitimate charges that were disputed)
-    approved_ids = df_payment[df_payment['status'] == 'approved']['message_id'].tolist()
-    eligible_ids = [tid for tid in approved_ids if tid not in scenario_tx_ids]
+    approved_ids = df_payment[df_payment['status'] == 'approved']['message_id'].to_numpy()
+    eligible_ids = approved_ids[~np.isin(approved_ids, scenario_tx_ids)]
     sample_size = min(len(eligible_ids), int(0.002 * len(df_payment)))  # ~0.2% of transactions turn into friendly fraud disputes
-    friendly_ids = random.sample(eligible_ids, sample_size) if sample_size > 0 else []
+    friendly_ids = rng.choice(eligible_ids, sample_size, replace=False).tolist() if sample_size > 0 else []
     for tx_id in friendly_ids:
         trans = df_indexed.loc[tx_id]
         cust_id = token_to_user.get(trans['card_number_token'])
@@ -483,16 +474,16 @@ def generate_dispute_msgs(df_payment, scenario_tx_ids, customers_info, start_dat
         reason_code = 'FRIENDLY_FRAUD'
         stage = 'Chargeback Initiated'
         # Most friendly fraud disputes are closed in favor of cardholder (they get refund)
-        status = 'Closed' if random.random() < 0.9 else 'Open'
+        status = 'Closed' if rng.random() < 0.9 else 'Open'
         evidence = 'No'  # merchant typically has no evidence for a false claim by customer
-        dispute_time = tx_time + timedelta(days=random.randint(5, 60))
+        dispute_time = tx_time + timedelta(days=int(rng.integers(5, 61)))
         if dispute_time > end_dt:
             dispute_time = end_dt
             status = 'Open'
             stage = 'Investigation'
         resolution_time = ''
         if status == 'Closed':
-            res_time = dispute_time + timedelta(days=random.randint(1, 30))
+            res_time = dispute_time + timedelta(days=int(rng.integers(1, 31)))
             if res_time > end_dt:
                 res_time = end_dt
             resolution_time = res_time
@@ -511,164 +502,356 @@ def generate_dispute_msgs(df_payment, scenario_tx_ids, customers_info, start_dat
             'resolution_timestamp': resolution_time
         })
         dispute_id += 1
-    df_dispute = pd.DataFrame(records)
+    df_dispute = pd.DataFrame(records, columns=DISPUTE_COLUMNS)  # columns kept when a small shard has no disputes
     df_dispute.sort_values('timestamp', inplace=True)
     return df_dispute
 
-def generate_kyc_msgs(customers_info, start_date, end_date, duplicate_pairs=100, duplicate_triples=10, fail_count=500):
-    """Generate KYC (Know-Your-Customer) verification events, including some failures and synthetic identity cases."""
-    faker = Faker()
-    records = []
-    kyc_event_id = 1
-    start_ts = int(start_date.timestamp()); end_ts = int(end_date.timestamp())
-    user_ids = list(customers_info.keys())
-    # Assign a random document type and number for each user
-    docs = {}
-    for user_id in user_ids:
-        home_country = customers_info[user_id]['home_country']
-        # Bias towards driver's license for some countries, otherwise passport or national ID
-        if home_country in ['US','GB','CA','AU']:
-            doc_type = random.choices(['Driver License', 'Passport'], weights=[60,40], k=1)[0]
-        else:
-            doc_type = random.choices(['Passport', 'National ID', 'Driver License'], weights=[50,30,20], k=1)[0]
-        # Generate a fake document number pattern based on type
-        if doc_type == 'Passport':
-            doc_num = faker.bothify('??#######')   # e.g. AB1234567
-        elif doc_type == 'Driver License':
-            doc_num = faker.bothify('?########')    # e.g. A12345678
-        else:  # National ID
-            doc_num = faker.numerify('#########')   # 9-digit ID
-        docs[user_id] = {'type': doc_type, 'number': doc_num}
-    # Introduce duplicates to simulate synthetic identities (pairs and triples of users sharing the same ID)
-    dup_users = set()
-    if duplicate_pairs * 2 + duplicate_triples * 3 <= len(user_ids):
-        chosen = random.sample(user_ids, duplicate_pairs*2 + duplicate_triples*3)
-        random.shuffle(chosen)
-        pair_list = chosen[:duplicate_pairs*2]
-        triple_list = chosen[duplicate_pairs*2:]
-        # Assign pairs of users the same document
-        for i in range(0, len(pair_list), 2):
-            u1, u2 = pair_list[i], pair_list[i+1]
-            dup_users.update([u1, u2])
-            docs[u2]['type'] = docs[u1]['type']
-            docs[u2]['number'] = docs[u1]['number']
-        # Assign triples of users the same document
-        for j in range(0, len(triple_list), 3):
-            if j+2 < len(triple_list):
-                u1, u2, u3 = triple_list[j], triple_list[j+1], triple_list[j+2]
-                dup_users.update([u1, u2, u3])
-                docs[u2]['type'] = docs[u1]['type']
-                docs[u2]['number'] = docs[u1]['number']
-                docs[u3]['type'] = docs[u1]['type']
-                docs[u3]['number'] = docs[u1]['number']
-    # Choose a set of users who will have an initial KYC failure (excluding those already in duplicate sets for simplicity)
-    fail_candidates = [uid for uid in user_ids if uid not in dup_users]
-    fail_users = set(random.sample(fail_candidates, min(fail_count, len(fail_candidates))))
-    # Generate KYC events for each user
-    for user_id in user_ids:
-        primary_device = customers_info[user_id]['devices'][0]
-        doc_type = docs[user_id]['type']
-        doc_number = docs[user_id]['number']
-        doc_hash = hashlib.sha256(doc_number.encode('utf-8')).hexdigest()
-        if user_id in fail_users:
-            # Create two events: one failed verification, then a successful retry
-            fail_ts = random.randint(start_ts, end_ts)
-            fail_time = datetime.fromtimestamp(fail_ts)
-            # Retry after 1–14 days
-            success_delay = random.randint(1, 14)
-            success_time = fail_time + timedelta(days=success_delay)
-            if success_time > end_date:
-                success_time = end_date
-            # Face match scores: low for failure, high for success
-            fail_score = random.randint(0, 60)
-            success_score = random.randint(80, 100)
-            ip1 = faker.ipv4(); ip2 = faker.ipv4()
-            geo1 = f"{faker.latitude():.4f},{faker.longitude():.4f}"
-            geo2 = f"{faker.latitude():.4f},{faker.longitude():.4f}"
-            records.append({
-                'kyc_event_id': kyc_event_id,
-                'customer_id': user_id,
-                'device_id': primary_device,
-                'timestamp': fail_time,
-                'kyc_type': 'Onboarding',
-                'document_type': doc_type,
-                'document_number_hash': doc_hash,
-                'face_match_score': fail_score,
-                'verification_status': 'failed',
-                'geo_location': geo1,
-                'ip_address': ip1
-            })
-            kyc_event_id += 1
-            records.append({
-                'kyc_event_id': kyc_event_id,
-                'customer_id': user_id,
-                'device_id': primary_device,
-                'timestamp': success_time,
-                'kyc_type': 'Onboarding Retry',
-                'document_type': doc_type,
-                'document_number_hash': doc_hash,
-                'face_match_score': success_score,
-                'verification_status': 'verified',
-                'geo_location': geo2,
-                'ip_address': ip2
-            })
-            kyc_event_id += 1
-        else:
-            # Single successful verification event
-            ts = random.randint(start_ts, end_ts)
-            event_time = datetime.fromtimestamp(ts)
-            score = random.randint(80, 100)
-            ip_addr = faker.ipv4()
-            geo_loc = f"{faker.latitude():.4f},{faker.longitude():.4f}"
-            records.append({
-                'kyc_event_id': kyc_event_id,
-                'customer_id': user_id,
-                'device_id': primary_device,
-                'timestamp': event_time,
-                'kyc_type': 'Onboarding',
-                'document_type': doc_type,
-                'document_number_hash': doc_hash,
-                'face_match_score': score,
-                'verification_status': 'verified',
-                'geo_location': geo_loc,
-                'ip_address': ip_addr
-            })
-            kyc_event_id += 1
-    df_kyc = pd.DataFrame(records)
-    df_kyc.sort_values('timestamp', inplace=True)
+def _document_numbers(rng, doc_type):
+    """Fake document numbers by type: passport ??#######, driver license ?########, national ID #########."""
+    n = len(doc_type)
+    passport = np.char.add(_random_letters(rng, 2, n), _random_digits(rng, 7, n))     # e.g. AB1234567
+    license_ = np.char.add(_random_letters(rng, 1, n), _random_digits(rng, 8, n))     # e.g. A12345678
+    national = _random_digits(rng, 9, n)                                              # 9-digit ID
+    return np.select([doc_type == 'Passport', doc_type == 'Driver License'], [passport, license_], national)
+
+def _document_types(rng, home_country):
+    """Bias towards driver's license for some countries, otherwise passport or national ID."""
+    n = len(home_country)
+    return np.where(np.isin(home_country, ['US', 'GB', 'CA', 'AU']),
+                    rng.choice(['Driver License', 'Passport'], n, p=[0.6, 0.4]),
+                    rng.choice(['Passport', 'National ID', 'Driver License'], n, p=[0.5, 0.3, 0.2])).astype(object)
+
+def _plan_identities(user_ids, home_country, duplicate_pairs=100, duplicate_triples=10, fail_count=500, rng=None):
+    """
+    Users sharing a document (synthetic identities, in pairs and triples) and users whose first
+    KYC check fails. Returns ({user_id: (document_type, document_number)}, set of failing user_ids).
+    """
+    n = len(user_ids)
+    shared = {}
+    if duplicate_pairs * 2 + duplicate_triples * 3 <= n:
+        chosen = rng.permutation(rng.choice(n, duplicate_pairs * 2 + duplicate_triples * 3, replace=False))
+        for group in (chosen[:duplicate_pairs * 2].reshape(-1, 2), chosen[duplicate_pairs * 2:].reshape(-1, 3)):
+            # Every member gets the document drawn for the group's first member
+            doc_type = _document_types(rng, home_country[group[:, 0]])
+            doc_number = _document_numbers(rng, doc_type)
+            for member in group.T:
+                shared.update(zip(user_ids[member].tolist(), zip(doc_type.tolist(), doc_number.tolist())))
+    # Users who will have an initial KYC failure (excluding those already in duplicate sets for simplicity)
+    fail_candidates = user_ids[~np.isin(user_ids, list(shared))]
+    fail_users = set(rng.choice(fail_candidates, min(fail_count, len(fail_candidates)), replace=False).tolist())
+    return shared, fail_users
+
+def generate_kyc_msgs(customers_info, start_date, end_date, duplicate_pairs=100, duplicate_triples=10, fail_count=500, rng=None, identities=None):
+    """
+    Generate KYC (Know-Your-Customer) verification events, including some failures and synthetic identity cases.
+
+    identities: _plan_identities() result to use instead of planning over customers_info (a shard passes the
+    slice of a plan made over all customers, since synthetic identities span shards).
+    """
+    rng = rng if rng is not None else make_rng()
+    customers = _customer_arrays(customers_info)
+    user_ids = customers['user_id']
+    n = len(user_ids)
+    if identities is None:
+        identities = _plan_identities(user_ids, customers['home_country'], duplicate_pairs, duplicate_triples, fail_count, rng)
+    shared, fail_users = identities
+    # Assign a random document type and number for each user, then the shared documents of synthetic identities
+    doc_type = _document_types(rng, customers['home_country'])
+    doc_number = _document_numbers(rng, doc_type).astype(object)
+    if shared:
+        shared_rows = _positions(customers, shared)
+        doc_type[shared_rows] = [document[0] for document in shared.values()]
+        doc_number[shared_rows] = [document[1] for document in shared.values()]
+    failed = np.isin(user_ids, list(fail_users))
+    doc_hash = _sha256_hex(doc_number)
+
+    # Failed users get two events (a failed verification, then a successful retry 1-14 days later), others one
+    events_per_user = 1 + failed
+    users = np.repeat(np.arange(n), events_per_user)
+    is_retry = np.zeros(len(users), dtype=bool)
+    is_retry[np.cumsum(events_per_user)[failed] - 1] = True
+    is_fail = failed[users] & ~is_retry
+    first_time = _random_times(rng, start_date, end_date, n)
+    retry_time = np.minimum(first_time + rng.integers(1, 15, n).astype('timedelta64[D]'), np.datetime64(end_date, 'us'))
+    # Face match scores: low for failure, high for success
+    score = np.where(is_fail, rng.integers(0, 61, len(users)), rng.integers(80, 101, len(users)))
+    geo = pd.Series(rng.uniform(-90, 90, len(users))).map('{:.4f}'.format).str.cat(
+        pd.Series(rng.uniform(-180, 180, len(users))).map('{:.4f}'.format), sep=',')
+    df_kyc = pd.DataFrame({
+        'kyc_event_id': np.arange(1, len(users) + 1),
+        'customer_id': user_ids[users],
+        'device_id': customers['first_device'][users],
+        'timestamp': np.where(is_retry, retry_time[users], first_time[users]),
+        'kyc_type': np.where(is_retry, 'Onboarding Retry', 'Onboarding'),
+        'document_type': doc_type[users],
+        'document_number_hash': doc_hash[users],
+        'face_match_score': score,
+        'verification_status': np.where(is_fail, 'failed', 'verified'),
+        'geo_location': geo.to_numpy(),
+        'ip_address': _random_ipv4(rng, len(users)),
+    })
+    df_kyc.sort_values('timestamp', inplace=True, kind='stable')
     return df_kyc
 
-# Main execution to generate all datasets and save to CSV
+# Sharded generation: id column per table, and whether the table is ordered by timestamp
+_SHARD_TABLES = {'auth': ('auth_event_id', True), 'payment': ('message_id', False),
+                 'dispute': ('dispute_id', True), 'kyc': ('kyc_event_id', True)}
+
+def _generate_shard(task):
+    """Generate every table for one customer-id range from the shard's own seed (runs in a pool worker)."""
+    rng = np.random.default_rng(task['seed'])
+    start_date, end_date = task['start_date'], task['end_date']
+    customers_info, scenario_users = _draw_customers(task['population'], task['first_user_id'], rng)
+    # compromised_times and scenario_tx_ids only link a customer's own events, so they never leave the shard
+    df_auth, compromised_times = generate_auth_log(customers_info, scenario_users, start_date, end_date, rng=rng)
+    df_payment, scenario_tx_ids = generate_payment_msgs(customers_info, task['merchants'], scenario_users, compromised_times, start_date, end_date, rng=rng)
+    df_dispute = generate_dispute_msgs(df_payment, scenario_tx_ids, customers_info, start_date, end_date, rng=rng)
+    df_kyc = generate_kyc_msgs(customers_info, start_date, end_date, rng=rng, identities=task['identities'])
+    return {'auth': df_auth, 'payment': df_payment, 'dispute': df_dispute, 'kyc': df_kyc}
+
+def plan_shards(num_customers, num_merchants, start_date, end_date, seed=None, customers_per_shard=20000,
+                multiple_device_ratio=0.1, scenario_ratio=0.01, twofa_ratio=0.3,
+                duplicate_pairs=100, duplicate_triples=10, kyc_fail_count=500):
+    """
+    Split generation into customer-id ranges of customers_per_shard users, each with its own seed.
+
+    Everything that spans customers is drawn here, once, from the master seed: the merchant table,
+    ATO/2FA selections, device id ranges and synthetic identities. Shard seeds are children of the
+    master SeedSequence by shard index, so the shards (and the output) do not depend on how many
+    workers run them.
+    """
+    master = np.random.SeedSequence(seed)
+    global_seed, shards_seed = master.spawn(2)
+    rng = np.random.default_rng(global_seed)
+    population = _draw_population(num_customers, multiple_device_ratio, scenario_ratio, twofa_ratio, rng)
+    merchants = _draw_merchants(num_merchants, rng)
+    user_ids = np.arange(1, num_customers + 1)
+    shared, fail_users = _plan_identities(user_ids, population['home_country'], duplicate_pairs, duplicate_triples, kyc_fail_count, rng)
+    bounds = range(0, num_customers, customers_per_shard)
+    tasks = []
+    for lo, seed_sequence in zip(bounds, shards_seed.spawn(len(bounds))):
+        hi = min(lo + customers_per_shard, num_customers)
+        tasks.append({
+            'seed': seed_sequence,
+            'first_user_id': lo + 1,
+            'population': {name: values[lo:hi] for name, values in population.items()},
+            'merchants': merchants,
+            'identities': ({u: doc for u, doc in shared.items() if lo < u <= hi}, {u for u in fail_users if lo < u <= hi}),
+            'start_date': start_date,
+            'end_date': end_date,
+        })
+    return tasks
+
+def generate_datasets(num_customers=1000, num_merchants=1000, start_date=datetime(2022, 1, 1), end_date=datetime(2024, 12, 31),
+                      seed=None, workers=None, customers_per_shard=20000, **options):
+    """
+    Generate the auth, payment, dispute and KYC tables across a process pool, sharded by customer id.
+
+    Shards run in parallel and come back in shard order; their ids are shifted by the row counts of
+    the shards before them (dispute transaction_ids by the payment offset), and the time-ordered
+    tables are merged with a stable sort of the already-sorted shards. With a fixed seed the result
+    is identical for any number of workers (workers=1 runs in-process).
+
+    Returns:
+        dict: DataFrames keyed 'auth', 'payment', 'dispute', 'kyc'.
+    """
+    tasks = plan_shards(num_customers, num_merchants, start_date, end_date, seed, customers_per_shard, **options)
+    return _merge_shards(_run_shards(tasks, workers))
+
+def _run_shards(tasks, workers):
+    """Shard results in shard order, keeping at most two shards per worker in flight so finished ones don't pile up."""
+    if workers == 1:
+        yield from map(_generate_shard, tasks)
+        return
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(_generate_shard, task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _offset_shard(shard, offsets):
+    """Shift a shard's local ids past the rows of the shards before it (``offsets`` is advanced in place)."""
+    if len(shard['dispute']):
+        shard['dispute']['transaction_id'] += offsets['payment']
+    for table, (id_column, _) in _SHARD_TABLES.items():
+        df = shard[table]
+        if len(df):
+            df[id_column] += offsets[table]
+        offsets[table] += len(df)
+    return shard
+
+def _merge_shards(shards):
+    frames = {table: [] for table in _SHARD_TABLES}
+    offsets = dict.fromkeys(_SHARD_TABLES, 0)
+    for shard in shards:
+        for table, df in _offset_shard(shard, offsets).items():
+            if len(df):
+                frames[table].append(df)
+    merged = {}
+    for table, (_, by_time) in _SHARD_TABLES.items():
+        df = pd.concat(frames[table], ignore_index=True) if frames[table] else pd.DataFrame()
+        if by_time and len(df):
+            df = df.sort_values('timestamp', kind='stable', ignore_index=True)
+        merged[table] = df
+    return merged
+
+def _spill(df, path, chunk_rows):
+    """Write ``df`` to ``path`` as consecutive pickled chunks of chunk_rows rows."""
+    with open(path, 'wb') as f:
+        for start in range(0, len(df), chunk_rows):
+            pickle.dump(df.iloc[start:start + chunk_rows], f, protocol=pickle.HIGHEST_PROTOCOL)
+
+def _read_spill(path):
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+def merge_sorted_chunks(runs, key):
+    """
+    K-way merge of runs of DataFrame chunks, each run sorted by ``key``, into one sorted stream of chunks.
+
+    One chunk per run is buffered. Every buffered row whose key is below the smallest last key of
+    the runs still being read is final and goes out; the run(s) holding that smallest key then read
+    their next chunk. Equal keys keep run order, exactly as a stable sort of the concatenated runs.
+    """
+    readers = [iter(run) for run in runs]
+    buffers = [next(reader, None) for reader in readers]
+    readers = [reader if buffer is not None else None for reader, buffer in zip(readers, buffers)]
+    while True:
+        reading = [i for i, reader in enumerate(readers) if reader is not None]
+        bound = min(buffers[i][key].iloc[-1] for i in reading) if reading else None
+        taken = []
+        for i, buffer in enumerate(buffers):
+            if buffer is None or not len(buffer):
+                continue
+            n = len(buffer) if bound is None else buffer[key].searchsorted(bound, side='left')
+            if n:
+                taken.append(buffer.iloc[:n])
+                buffers[i] = buffer.iloc[n:]
+        if taken:
+            yield pd.concat(taken).sort_values(key, kind='stable')
+        if bound is None:
+            return
+        for i in reading:
+            if buffers[i][key].iloc[0] == bound:  # only rows equal to the bound are left: read on
+                chunk = next(readers[i], None)
+                if chunk is None:
+                    readers[i] = None
+                else:
+                    buffers[i] = pd.concat([buffers[i], chunk])
+
+def rechunk(chunks, chunk_rows):
+    """Regroup a stream of DataFrames into frames of chunk_rows rows (the last one may be shorter)."""
+    pending, size = [], 0
+    for chunk in chunks:
+        while len(chunk):
+            part = chunk.iloc[:chunk_rows - size]
+            chunk = chunk.iloc[len(part):]
+            pending.append(part)
+            size += len(part)
+            if size == chunk_rows:
+                yield pd.concat(pending, ignore_index=True)
+                pending, size = [], 0
+    if pending:
+        yield pd.concat(pending, ignore_index=True)
+
+def _table_chunks(paths, by_time, chunk_rows):
+    runs = [_read_spill(path) for path in paths]
+    return rechunk(merge_sorted_chunks(runs, 'timestamp') if by_time else itertools.chain.from_iterable(runs), chunk_rows)
+
+@contextmanager
+def stream_datasets(num_customers=1000, num_merchants=1000, start_date=datetime(2022, 1, 1), end_date=datetime(2024, 12, 31),
+                    seed=None, workers=None, customers_per_shard=20000, chunk_rows=100000, run_chunk_rows=10000,
+                    spill_dir=None, **options):
+    """
+    Generate the same tables as generate_datasets, as streams of chunk_rows-row DataFrames.
+
+    Each shard is spilled to disk (under a temporary directory in ``spill_dir``) as soon as it
+    arrives, and the time-ordered tables are read back with merge_sorted_chunks over the shards'
+    sorted runs, i.e. an external merge sort. Memory is bounded by a few shards while generating
+    and, while reading, by one output chunk plus one run_chunk_rows spill chunk per shard.
+
+    Yields:
+        dict: An iterator of DataFrame chunks per table ('auth', 'payment', 'dispute', 'kyc'),
+        each consumable once while the context is open.
+    """
+    tasks = plan_shards(num_customers, num_merchants, start_date, end_date, seed, customers_per_shard, **options)
+    with tempfile.TemporaryDirectory(prefix='synthetic-', dir=spill_dir) as directory:
+        runs = {table: [] for table in _SHARD_TABLES}
+        offsets = dict.fromkeys(_SHARD_TABLES, 0)
+        for index, shard in enumerate(_run_shards(tasks, workers)):
+            for table, df in _offset_shard(shard, offsets).items():
+                if len(df):
+                    runs[table].append(os.path.join(directory, f'{table}-{index:06d}.pkl'))
+                    _spill(df, runs[table][-1], run_chunk_rows)
+            del shard
+        yield {table: _table_chunks(runs[table], by_time, chunk_rows) for table, (_, by_time) in _SHARD_TABLES.items()}
+
+def dispute_payload(df):
+    """Dispute rows as the batch API takes them: timestamps as strings or None, evidence_provided as a boolean."""
+    df = df.copy()
+    df['timestamp'] = df['timestamp'].astype(str)
+    df['resolution_timestamp'] = df['resolution_timestamp'].astype(str)
+    df['evidence_provided'] = df['evidence_provided'].apply(lambda x: str(x).lower() == 'yes')
+    # Replace empty strings and NaT with None (null) for resolution_timestamp
+    df['resolution_timestamp'] = df['resolution_timestamp'].replace(["", pd.NaT], None)
+    # Replace empty strings and NaT with None (null) for timestamp
+    df['timestamp'] = df['timestamp'].replace(["", pd.NaT], None)
+    return df
+
+def write_chunks_via_api(chunks, api_url, batch_size=1000, payload_format='json', prepare=None):
+    """Upload a stream of DataFrame chunks with write_dataframe_to_db_via_api, one chunk at a time."""
+    for chunk in chunks:
+        write_dataframe_to_db_via_api(prepare(chunk) if prepare else chunk, api_url, batch_size, payload_format)
+
+def write_chunks_to_csv(chunks, path, prepare=None):
+    """Append a stream of DataFrame chunks to one CSV file, with the header from the first chunk."""
+    with open(path, 'w', newline='') as f:
+        for i, chunk in enumerate(chunks):
+            (prepare(chunk) if prepare else chunk).to_csv(f, index=False, header=i == 0)
+
+def write_chunks_to_parquet(chunks, path, prepare=None):
+    """Write a stream of DataFrame chunks to one Parquet file, a row group per chunk, on the first chunk's schema."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(prepare(chunk) if prepare else chunk, preserve_index=False,
+                                         schema=writer.schema if writer else None)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
 if __name__ == "__main__":
     # Define simulation period (3 years)
     start_date = datetime(2022, 1, 1)
     end_date = datetime(2024, 12, 31)
+    # Optional seed (first argument) to reproduce the same datasets, and worker processes (second, default: all cores)
+    seed = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
 
-    # Generate base data
-    customers_info, merchants, scenario_users = generate_base_entities()
-
-    # Generate detailed logs for each table
-    df_auth, compromised_times = generate_auth_log(customers_info, scenario_users, start_date, end_date)
-    df_payment, scenario_tx_ids = generate_payment_msgs(customers_info, merchants, scenario_users, compromised_times, start_date, end_date)
-    df_dispute = generate_dispute_msgs(df_payment, scenario_tx_ids, customers_info, start_date, end_date)
-    df_kyc = generate_kyc_msgs(customers_info, start_date, end_date)
-
-    # Drop the internal timestamp from payments (not part of schema output)
-    df_payment.drop(columns=['timestamp'], inplace=True)
-    # Save each table to CSV
-    # df_payment.to_csv('payment_msgs_raw.csv', index=False)
-    write_dataframe_to_db_via_api(df_payment, 'http://ec2-3-25-114-250.ap-southeast-2.compute.amazonaws.com:8000/api/payment/batch', batch_size=1000)
-    # df_auth.to_csv('auth_log_msgs_raw.csv', index=False)
-    write_dataframe_to_db_via_api(df_auth, 'http://ec2-3-25-114-250.ap-southeast-2.compute.amazonaws.com:8000/api/authlog/batch', batch_size=1000)
-    # df_dispute.to_csv('dispute_msgs_raw.csv', index=False)
-    df_dispute['timestamp'] = df_dispute['timestamp'].astype(str)
-    df_dispute['resolution_timestamp'] = df_dispute['resolution_timestamp'].astype(str)
-    df_dispute['evidence_provided'] = df_dispute['evidence_provided'].apply(lambda x: str(x).lower() == 'yes')
-    # Replace empty strings and NaT with None (null) for resolution_timestamp
-    df_dispute['resolution_timestamp'] = df_dispute['resolution_timestamp'].replace(["", pd.NaT], None)
-    # Replace empty strings and NaT with None (null) for resolution_timestamp
-    df_dispute['timestamp'] = df_dispute['timestamp'].replace(["", pd.NaT], None)
-    write_dataframe_to_db_via_api(df_dispute, 'http://ec2-3-25-114-250.ap-southeast-2.compute.amazonaws.com:8000/api/dispute/batch', batch_size=1000)
-    df_kyc.to_csv('kyc_msgs_raw.csv', index=False)
+    # Generate base data and the detailed logs for each table, sharded by customer across processes,
+    # and hand each table to its sink chunk by chunk
+    api = 'http://ec2-3-25-114-250.ap-southeast-2.compute.amazonaws.com:8000/api'
+    with stream_datasets(1000, 1000, start_date, end_date, seed=seed, workers=workers) as tables:
+        # write_chunks_to_csv(tables['payment'], 'payment_msgs_raw.csv')
+        write_chunks_via_api(tables['payment'], f'{api}/payment/batch', batch_size=1000)
+        # write_chunks_to_csv(tables['auth'], 'auth_log_msgs_raw.csv')
+        write_chunks_via_api(tables['auth'], f'{api}/authlog/batch', batch_size=1000)
+        # write_chunks_to_csv(tables['dispute'], 'dispute_msgs_raw.csv')
+        write_chunks_via_api(tables['dispute'], f'{api}/dispute/batch', batch_size=1000, prepare=dispute_payload)
+        write_chunks_to_csv(tables['kyc'], 'kyc_msgs_raw.csv')
 
     print("Synthetic data generation completed. CSV files saved.")
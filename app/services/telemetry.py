@@ -0,0 +1,90 @@
+import time
+
+from flask import g, got_request_exception, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.services.events import rows_written
+from app.utils.metrics import SIZE_BUCKETS, registry
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "Time to build the response, per route.",
+    ("blueprint", "endpoint", "method", "status"))
+REQUEST_ERRORS = registry.counter(
+    "http_request_errors_total", "Responses with a 4xx/5xx status, per route.",
+    ("blueprint", "endpoint", "status"))
+UNHANDLED_EXCEPTIONS = registry.counter(
+    "http_unhandled_exceptions_total", "Exceptions that escaped a view.", ("endpoint", "exception"))
+BATCH_ROWS = registry.histogram(
+    "ingest_batch_rows", "Rows received per /batch request or /stream chunk.", ("entity", "path"), SIZE_BUCKETS)
+ROWS_WRITTEN = registry.counter(
+    "db_rows_written_total", "Rows committed (inserted, upserted, updated or deleted) per entity.", ("entity",))
+COMMIT_LATENCY = registry.histogram(
+    "db_commit_duration_seconds", "Session commit time including the final flush.")
+COMMIT_FAILURES = registry.counter("db_commit_failures_total", "Session commits that rolled back.")
+
+
+def init_metrics(app):
+    """Hook request, ingest and commit metrics into ``app`` when METRICS_ENABLED is set."""
+    if not app.config["METRICS_ENABLED"]:
+        return
+    registry.configure(app.config["METRICS_DIR"], app.config["METRICS_FLUSH_INTERVAL_SECONDS"])
+    app.before_request(_start_timer)
+    app.after_request(_observe_request)
+    got_request_exception.connect(_count_exception, app)
+    rows_written.connect(_count_rows)
+    if not event.contains(Session, "before_commit", _commit_started):
+        event.listen(Session, "before_commit", _commit_started)
+        event.listen(Session, "after_commit", _commit_finished)
+        event.listen(Session, "after_soft_rollback", _commit_failed)
+    app.extensions["metrics"] = registry
+
+
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+
+def _observe_request(response):
+    started = g.pop("request_started", None)
+    if started is None:
+        return response
+    registry.ensure_flusher()
+    endpoint = request.endpoint or "unmatched"
+    blueprint = request.blueprint or ""
+    status = response.status_code
+    # Streamed bodies are produced after this point, so for ?stream=true this is time to first byte.
+    REQUEST_LATENCY.observe(time.perf_counter() - started, (blueprint, endpoint, request.method, str(status)))
+    if status >= 400:
+        REQUEST_ERRORS.inc((blueprint, endpoint, str(status)))
+    return response
+
+
+def _count_exception(sender, exception, **_):
+    UNHANDLED_EXCEPTIONS.inc((request.endpoint or "unmatched", type(exception).__name__))
+
+
+def _count_rows(model, keys, **_):
+    ROWS_WRITTEN.inc((model.__tablename__,), len(keys))
+
+
+def observe_batch(model, path, rows):
+    BATCH_ROWS.observe(rows, (model.__tablename__, path))
+
+
+def _commit_started(session):
+    session.info["commit_started"] = time.perf_counter()
+
+
+def _commit_finished(session):
+    started = session.info.pop("commit_started", None)
+    if started is not None:
+        COMMIT_LATENCY.observe(time.perf_counter() - started)
+
+
+def _commit_failed(session, previous_transaction):
+    if session.info.pop("commit_started", None) is not None:
+        COMMIT_FAILURES.inc()
+
+
+def render_metrics():
+    return registry.render()
@@ -0,0 +1,136 @@
+from sqlalchemy import bindparam, inspect, literal_column, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models import db
+from app.models.partitioning import PARTITIONING_ENABLED
+from app.services.validation import get_validator
+
+CONFLICT_ACTIONS = ("ignore", "update")
+_KEY_LOOKUP_CHUNK = 500
+
+
+def insert_for_dialect(table, connection):
+    name = connection.dialect.name
+    if name == "postgresql":
+        return postgresql.insert(table)
+    if name == "sqlite":
+        return sqlite.insert(table)
+    raise ValueError(f"Idempotent ingest is not supported on {name}")
+
+
+def existing_keys(connection, pk, keys):
+    found = set()
+    for i in range(0, len(keys), _KEY_LOOKUP_CHUNK):
+        chunk = keys[i:i + _KEY_LOOKUP_CHUNK]
+        found.update(connection.execute(select(pk).where(pk.in_(chunk))).scalars())
+    return found
+
+
+def check_conflict_action(action):
+    if action not in CONFLICT_ACTIONS:
+        raise ValueError(f"Unknown on_conflict action '{action}', expected one of {', '.join(CONFLICT_ACTIONS)}")
+
+
+def _upsert_by_id(connection, table, pk, rows, action):
+    """
+    Upsert ``rows`` ({key: row}) into a partitioned table, whose primary key is (id, timestamp).
+
+    The database enforces only unique (id, timestamp) there, so a retry carrying another
+    timestamp would not conflict. Ids are looked up first instead: a stored id is a
+    duplicate for ``ignore`` and is updated by id for ``update`` (moving partitions if its
+    timestamp changed); only unseen ids are inserted. Two concurrent batches inserting the
+    same new id with different timestamps can still both store it.
+
+    Returns:
+        tuple: (inserted keys, updated keys, keys already stored and left alone)
+    """
+    existing = existing_keys(connection, pk, list(rows))
+    fresh = [row for key, row in rows.items() if key not in existing]
+    stored = [key for key in rows if key in existing]
+    updated = []
+    if stored and action == "update":
+        columns = [c.key for c in table.columns if c is not pk]
+        stmt = update(table).where(pk == bindparam("_key")).values({c: bindparam(f"_new_{c}") for c in columns})
+        connection.execute(stmt, [{"_key": key, **{f"_new_{c}": rows[key][c] for c in columns}} for key in stored])
+        updated, stored = stored, []
+    inserted = []
+    if fresh:
+        stmt = insert_for_dialect(table, connection).on_conflict_do_nothing(
+            index_elements=list(table.primary_key.columns)).returning(pk)
+        returned = set(connection.execute(stmt, fresh).scalars())
+        for row in fresh:
+            (inserted if row[pk.key] in returned else stored).append(row[pk.key])
+    return inserted, updated, stored
+
+
+def upsert_rows(model, data_list, action="ignore", connection=None):
+    """
+    Insert a batch with ``INSERT ... ON CONFLICT (pk) DO NOTHING | DO UPDATE ... RETURNING``.
+
+    A key repeated inside the batch is written once (first occurrence for ``ignore``,
+    last for ``update``) and its extra occurrences are reported as duplicates. Runs in
+    the current transaction (of ``connection``, default the session's); the caller commits.
+    Partitioned tables are keyed on (id, timestamp), so there ids are looked up first
+    (see _upsert_by_id).
+
+    Returns:
+        dict: Keys grouped by outcome (inserted / updated / duplicate), their counts,
+        and rows rejected by validation.
+    """
+    check_conflict_action(action)
+    table = model.__table__
+    pk = table.c[inspect(model).primary_key[0].key]
+    conflict_columns = [pk]
+    update_columns = [c.key for c in table.columns if not c.primary_key]
+    # The validator rejects rows without a key and coerces keys to the column type (e.g. 2 -> "2").
+    valid, failed = get_validator(model).validate_batch(data_list)
+    rows, duplicate = {}, []
+    for row in valid:
+        key = row[pk.key]
+        if key in rows:
+            duplicate.append(key)
+            if action == "update":
+                rows[key] = row
+            continue
+        rows[key] = row
+
+    inserted, updated = [], []
+    if rows:
+        connection = connection or db.session.connection()
+        stmt = insert_for_dialect(table, connection)
+        if PARTITIONING_ENABLED:
+            inserted, updated, stored = _upsert_by_id(connection, table, pk, rows, action)
+            duplicate.extend(stored)
+        elif action == "ignore":
+            stmt = stmt.on_conflict_do_nothing(index_elements=conflict_columns).returning(pk)
+            returned = set(connection.execute(stmt, list(rows.values())).scalars())
+            for key in rows:
+                (inserted if key in returned else duplicate).append(key)
+        elif connection.dialect.name == "postgresql":
+            # xmax is 0 only for tuples created by this statement, i.e. fresh inserts.
+            stmt = stmt.on_conflict_do_update(
+                index_elements=conflict_columns,
+                set_={key: stmt.excluded[key] for key in update_columns},
+            ).returning(pk, literal_column("(xmax = 0)"))
+            for key, was_inserted in connection.execute(stmt, list(rows.values())):
+                (inserted if was_inserted else updated).append(key)
+        else:
+            existing = existing_keys(connection, pk, list(rows))
+            stmt = stmt.on_conflict_do_update(
+                index_elements=conflict_columns,
+                set_={key: stmt.excluded[key] for key in update_columns},
+            )
+            connection.execute(stmt, list(rows.values()))
+            for key in rows:
+                (updated if key in existing else inserted).append(key)
+
+    return {
+        "inserted_count": len(inserted),
+        "updated_count": len(updated),
+        "duplicate_count": len(duplicate),
+        "failure_count": len(failed),
+        "inserted": inserted,
+        "updated": updated,
+        "duplicate": duplicate,
+        "failed_records": failed,
+    }
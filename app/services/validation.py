@@ -0,0 +1,157 @@
+import math
+from datetime import datetime
+from functools import lru_cache
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, String
+
+from app.utils.filters import parse_timestamp
+
+_BOOLEAN_STRINGS = {"true": True, "false": False, "1": True, "0": False}
+
+
+def _to_str(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise ValueError("expected a string")
+
+
+def _to_float(value):
+    # nan, inf and overflowing values ("1e999", huge ints) are not amounts or scores
+    if isinstance(value, (int, float, str)) and not isinstance(value, bool):
+        try:
+            number = float(value)
+        except (ValueError, OverflowError):
+            pass
+        else:
+            if math.isfinite(number):
+                return number
+    raise ValueError("expected a finite number")
+
+
+def _to_int(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    raise ValueError("expected an integer")
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (str, int)):
+        parsed = _BOOLEAN_STRINGS.get(str(value).strip().lower())
+        if parsed is not None:
+            return parsed
+    raise ValueError("expected a boolean")
+
+
+def _to_timestamp(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        # Producers send "" for an unknown time; it is stored as NULL.
+        return parse_timestamp(value) if value.strip() else None
+    raise ValueError("expected an ISO 8601 timestamp")
+
+
+def _converter_for(column):
+    if isinstance(column.type, DateTime):
+        return _to_timestamp
+    if isinstance(column.type, Boolean):
+        return _to_bool
+    if isinstance(column.type, Float):
+        return _to_float
+    if isinstance(column.type, Integer):
+        return _to_int
+    if isinstance(column.type, String):
+        return _to_str
+    return None
+
+
+class RowValidator:
+    """
+    Validator for payload dicts of one table, compiled once from its columns.
+
+    Calling it maps a dict onto the full column set, rejects unknown keys, coerces each
+    value to its column's Python type and checks required (NOT NULL / primary-key)
+    columns, reporting every problem of the row in one ValueError. Rows come out ready
+    for a Core executemany or COPY, so batches never go through ORM construction.
+    """
+
+    def __init__(self, table):
+        self.columns = tuple(table.columns.keys())
+        self._known = frozenset(self.columns)
+        self._converters = tuple((column.key, conv) for column in table.columns
+                                 if (conv := _converter_for(column)) is not None)
+        self._required = tuple(column.key for column in table.columns if column.primary_key or not column.nullable)
+
+    def __call__(self, data):
+        if not isinstance(data, dict):
+            raise ValueError("Expected a JSON object")
+        if not self._known.issuperset(data):
+            raise ValueError(f"Unknown field(s): {', '.join(sorted(set(data) - self._known))}")
+        row = {name: data.get(name) for name in self.columns}
+        errors = self._convert(row)
+        missing = [key for key in self._required if row[key] is None]
+        if missing:
+            errors.insert(0, f"Missing required field(s): {', '.join(missing)}")
+        if errors:
+            raise ValueError("; ".join(errors))
+        return row
+
+    def _convert(self, row):
+        errors = []
+        for key, convert in self._converters:
+            value = row.get(key)
+            if value is not None:
+                try:
+                    row[key] = convert(value)
+                except ValueError as e:
+                    errors.append(f"Invalid value for '{key}': {e}")
+        return errors
+
+    def coerce(self, values):
+        """
+        Coerce the columns of a partial row (e.g. the changed columns of an update) to their
+        types, without the required-column check. Keys that are not columns are dropped.
+        """
+        row = {key: value for key, value in values.items() if key in self._known}
+        errors = self._convert(row)
+        if errors:
+            raise ValueError("; ".join(errors))
+        return row
+
+    def validate_batch(self, data_list):
+        """
+        Validate a whole batch in one pass.
+
+        Returns:
+            tuple: (clean rows, list of {"index", "data", "error"} for rejected rows,
+            ``index`` being the row's position in ``data_list``)
+        """
+        rows, failed = [], []
+        for index, data in enumerate(data_list):
+            try:
+                rows.append(self(data))
+            except ValueError as e:
+                failed.append({"index": index, "data": data, "error": str(e)})
+        return rows, failed
+
+
+def kept_indexes(count, failed):
+    """Batch indexes of the rows ``validate_batch`` kept, given its ``failed`` list for ``count`` rows."""
+    rejected = {failure["index"] for failure in failed}
+    return [index for index in range(count) if index not in rejected]
+
+
+@lru_cache(maxsize=None)
+def get_validator(model):
+    return RowValidator(model.__table__)
@@ -0,0 +1,238 @@
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from flask import current_app, has_app_context
+from sqlalchemy import inspect, select
+
+from app.models import db
+from app.models.auth_log_msg import AuthLogMessage
+from app.models.payment_msg import PaymentMessage
+from app.services.events import rows_inserted
+from app.utils.filters import parse_timestamp
+from app.utils.logger import get_logger
+from app.utils.windows import SlidingWindowCounter
+
+logger = get_logger(__name__)
+
+_REBUILD_YIELD_PER = 10000
+
+# A counted event: a row of ``model`` (optionally only those where column == value), counted per key column.
+VelocityWindow = namedtuple("VelocityWindow", "name model key_columns window_seconds bucket_seconds where")
+
+VELOCITY_WINDOWS = (
+    VelocityWindow("failed_logins_15m", AuthLogMessage, ("customer_id", "device_id", "ip_address"),
+                   15 * 60, 60, ("auth_status", "failure")),
+    VelocityWindow("logins_15m", AuthLogMessage, ("customer_id", "device_id", "ip_address"),
+                   15 * 60, 60, None),
+    VelocityWindow("payments_1h", PaymentMessage, ("card_number_token", "device_id", "ip_address"),
+                   60 * 60, 300, None),
+)
+VELOCITY_KEY_COLUMNS = tuple(dict.fromkeys(column for window in VELOCITY_WINDOWS for column in window.key_columns))
+
+
+def _epoch_seconds(value):
+    """Event time of a row: stored timestamps are naive UTC, payload ones may still be ISO strings."""
+    if isinstance(value, str):
+        value = parse_timestamp(value) if value.strip() else None
+    if value is None:
+        return time.time()
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class VelocityCounters:
+    """
+    Sliding-window event counts per customer, device, card token and IP, updated on insert.
+
+    Counters start empty in every process and are rebuilt from the tables (rows inside
+    each window) once per process; inserts seen while the rebuild runs are held back and
+    applied after it, skipping rows the rebuild already counted.
+
+    Each worker counts the inserts it serves as they commit, and every ``sync_interval``
+    seconds also reads the rows other workers stored since its last read (by event time,
+    from ``sync_lag`` seconds before it, to catch rows committed late). Rows are counted once
+    by primary key, whichever way they arrive. Keys are counted by their string form, as stored.
+    """
+
+    def __init__(self, windows=VELOCITY_WINDOWS, sync_interval=5, sync_lag=60):
+        self.windows = windows
+        self.counters = {(window.name, column): SlidingWindowCounter(window.window_seconds, window.bucket_seconds)
+                         for window in windows for column in window.key_columns}
+        self.models = tuple(dict.fromkeys(window.model for window in windows))
+        self.sync_interval = sync_interval
+        self.sync_lag = sync_lag
+        self.synced_at = None
+        self.ready = False
+        self._pending = {}
+        self._lock = threading.Lock()
+        # Primary keys counted per model, with their event time, so a sync doesn't count a row twice;
+        # only kept while syncs run, and only as far back as the next sync reads.
+        self._counted = {model: {} for model in self.models}
+        self._counted_lock = threading.Lock()
+        self._pid = None
+
+    def ensure_started(self, app, background=True):
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        if background:
+            threading.Thread(target=self._run, args=(app,), name="velocity-rebuild", daemon=True).start()
+        else:
+            self._rebuild(app)
+
+    def _run(self, app):
+        self._rebuild(app)
+        while self.sync_interval > 0:
+            time.sleep(self.sync_interval)
+            try:
+                self.sync(app)
+            except Exception:
+                logger.exception("Reading other workers' rows into the velocity counters failed")
+
+    def _window_seconds(self, model):
+        return max(window.window_seconds for window in self.windows if window.model is model)
+
+    def _count(self, model, row, now):
+        try:
+            timestamp = _epoch_seconds(row.get("timestamp"))
+        except ValueError:
+            return
+        if self.sync_interval > 0 and timestamp >= self.synced_at - self.sync_lag:
+            pk = str(row.get(inspect(model).primary_key[0].key))
+            with self._counted_lock:
+                counted = self._counted[model]
+                if pk in counted:
+                    return
+                counted[pk] = timestamp
+        for window in self.windows:
+            if window.model is not model or (window.where and row.get(window.where[0]) != window.where[1]):
+                continue
+            for column in window.key_columns:
+                key = row.get(column)
+                if key is not None and key != "":
+                    self.counters[(window.name, column)].add(str(key), timestamp, now)
+
+    def add_rows(self, model, rows):
+        now = time.time()
+        if not self.ready:
+            with self._lock:
+                if not self.ready:
+                    pk = inspect(model).primary_key[0].key
+                    self._pending.update(((model, row.get(pk)), row) for row in rows)
+                    return
+        for row in rows:
+            self._count(model, row, now)
+
+    def _rebuild(self, app):
+        started = time.perf_counter()
+        self.synced_at = time.time()
+        try:
+            with app.app_context():
+                for model in self.models:
+                    self._read_rows(model, self.synced_at - self._window_seconds(model))
+        except Exception:
+            logger.exception("Rebuilding velocity counters failed; counting new rows only")
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            now = time.time()
+            for (model, _), row in pending.items():
+                self._count(model, row, now)
+            self.ready = True
+        logger.info("Rebuilt velocity counters in %.1fs", time.perf_counter() - started)
+
+    def sync(self, app):
+        """Count the rows stored since the last rebuild or sync that this worker has not counted."""
+        started = time.time()
+        with app.app_context():
+            for model in self.models:
+                self._read_rows(model, max(self.synced_at - self.sync_lag, started - self._window_seconds(model)))
+        self.synced_at = started
+        # The next sync reads from ``sync_lag`` before now on, so older rows can't come back.
+        oldest = started - self.sync_lag
+        with self._counted_lock:
+            for model, counted in self._counted.items():
+                self._counted[model] = {pk: at for pk, at in counted.items() if at >= oldest}
+
+    def _read_rows(self, model, since):
+        """Count the rows of ``model`` with an event time from ``since`` (epoch seconds) on."""
+        windows = [window for window in self.windows if window.model is model]
+        table = model.__table__
+        pk = inspect(model).primary_key[0].key
+        names = {pk, "timestamp"}
+        for window in windows:
+            names.update(window.key_columns)
+            if window.where:
+                names.add(window.where[0])
+        since = datetime.fromtimestamp(since, timezone.utc).replace(tzinfo=None)
+        stmt = select(*(table.c[name] for name in sorted(names))).where(table.c.timestamp >= since)
+        now = time.time()
+        with db.engine.connect() as conn:
+            result = conn.execution_options(yield_per=_REBUILD_YIELD_PER).execute(stmt)
+            for row in result.mappings():
+                with self._lock:
+                    self._pending.pop((model, row[pk]), None)
+                self._count(model, row, now)
+
+    def counts(self, keys):
+        """Counts of every window keyed by each of ``keys`` ({column: value})."""
+        now = time.time()
+        counts = {}
+        for column, value in keys.items():
+            counts[column] = {window.name: self.counters[(window.name, column)].count(value, now)
+                              for window in self.windows if column in window.key_columns}
+        return counts
+
+    def stats(self):
+        synced_at = datetime.fromtimestamp(self.synced_at, timezone.utc).isoformat() if self.synced_at else None
+        return {"ready": self.ready, "pending": len(self._pending), "synced_at": synced_at,
+                "counted_rows": {model.__tablename__: len(counted) for model, counted in self._counted.items()},
+                "keys": {f"{name}.{column}": len(counter) for (name, column), counter in self.counters.items()}}
+
+
+def init_velocity(app):
+    """Attach the velocity counters to ``app`` when VELOCITY_ENABLED is set."""
+    if app.config["VELOCITY_ENABLED"]:
+        app.extensions["velocity"] = VelocityCounters(sync_interval=app.config["VELOCITY_SYNC_INTERVAL_SECONDS"],
+                                                      sync_lag=app.config["VELOCITY_SYNC_LAG_SECONDS"])
+        rows_inserted.connect(_count_inserted_rows)
+
+
+def get_velocity_counters():
+    app = current_app._get_current_object()
+    velocity = app.extensions.get("velocity")
+    if velocity is not None:
+        velocity.ensure_started(app)
+    return velocity
+
+
+def _count_inserted_rows(model, rows, **_):
+    velocity = get_velocity_counters() if has_app_context() else None
+    if velocity is not None:
+        velocity.add_rows(model, rows)
+
+
+def get_velocity(args):
+    """
+    Velocity counts for the keys given in ``args`` (e.g. customer_id=C1&card_number_token=T9).
+
+    Raises:
+        ValueError: If no key or an unknown parameter is given, or the counters are disabled.
+    """
+    velocity = get_velocity_counters()
+    if velocity is None:
+        raise ValueError("Velocity counters are disabled (VELOCITY_ENABLED)")
+    unknown = sorted(set(args) - set(VELOCITY_KEY_COLUMNS))
+    if unknown:
+        raise ValueError(f"Unknown velocity key(s): {', '.join(unknown)}; expected {', '.join(VELOCITY_KEY_COLUMNS)}")
+    if not args:
+        raise ValueError(f"Give at least one of {', '.join(VELOCITY_KEY_COLUMNS)}")
+    return {"ready": velocity.ready, "counts": velocity.counts({column: args[column] for column in args})}
+
+
+def velocity_stats():
+    velocity = current_app.extensions.get("velocity")
+    return velocity.stats() if velocity is not None else {"enabled": False}
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import math
+import os
+import threading
+
+_SNAPSHOT_MAGIC = b"bloom/1\n"
+
+
+def _hash_pair(key):
+    digest = hashlib.blake2b(str(key).encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over string keys (other keys are hashed by their ``str``).
+
+    Sized for ``capacity`` keys at ``error_rate`` false positives; the ``num_hashes``
+    bit positions of a key come from one 128-bit BLAKE2b digest by double hashing.
+    """
+
+    def __init__(self, capacity, error_rate, num_bits=None, num_hashes=None, bits=None, count=0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = num_bits or max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = num_hashes or max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+
+    def _positions(self, key):
+        h1, h2 = _hash_pair(key)
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def add(self, key):
+        bits = self.bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def is_full(self):
+        return self.count >= self.capacity
+
+
+class ScalableBloomFilter:
+    """
+    Bloom filter that grows with its key count (Almeida et al.'s scalable Bloom filter).
+
+    When the current stage reaches its capacity a new one is added, ``growth`` times
+    larger with an error rate ``tightening`` times smaller, so the overall false
+    positive rate stays below ``error_rate`` however many keys arrive. There are no
+    false negatives: a key that was added is always reported as present.
+    """
+
+    def __init__(self, initial_capacity=100000, error_rate=0.001, growth=2, tightening=0.5):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self.filters = []
+        self._lock = threading.Lock()
+
+    def _new_stage(self):
+        stage = len(self.filters)
+        return BloomFilter(self.initial_capacity * self.growth ** stage,
+                           self.error_rate * (1 - self.tightening) * self.tightening ** stage)
+
+    def add(self, key):
+        with self._lock:
+            if not self.filters or self.filters[-1].is_full:
+                self.filters.append(self._new_stage())
+            self.filters[-1].add(key)
+
+    def update(self, keys):
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key):
+        return any(key in bloom for bloom in self.filters)
+
+    def __len__(self):
+        return sum(bloom.count for bloom in self.filters)
+
+    def union(self, other):
+        """
+        Add every key of ``other`` (a filter with the same parameters) by OR-ing stage bits.
+
+        Stage counts are summed (keys in both count twice), so new keys never land in a merged
+        stage past its capacity, though the merge itself can overfill it when both were nearly full.
+        """
+        params = ("initial_capacity", "error_rate", "growth", "tightening")
+        if any(getattr(self, name) != getattr(other, name) for name in params):
+            raise ValueError("Only Bloom filters with the same parameters can be merged")
+        with self._lock:
+            for stage, theirs in enumerate(other.filters):
+                if stage == len(self.filters):
+                    self.filters.append(self._new_stage())
+                ours = self.filters[stage]
+                merged = int.from_bytes(ours.bits, "little") | int.from_bytes(theirs.bits, "little")
+                ours.bits = bytearray(merged.to_bytes(len(ours.bits), "little"))
+                ours.count += theirs.count
+
+    def stats(self):
+        return {
+            "keys": len(self),
+            "stages": len(self.filters),
+            "bytes": sum(len(bloom.bits) for bloom in self.filters),
+        }
+
+    def dump(self, path):
+        """Write the filter to ``path`` atomically (a JSON header line, then each stage's bits)."""
+        with self._lock:
+            header = {
+                "initial_capacity": self.initial_capacity, "error_rate": self.error_rate,
+                "growth": self.growth, "tightening": self.tightening,
+                "stages": [{"capacity": b.capacity, "error_rate": b.error_rate, "num_bits": b.num_bits,
+                            "num_hashes": b.num_hashes, "count": b.count} for b in self.filters],
+            }
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as out:
+                out.write(_SNAPSHOT_MAGIC)
+                out.write(json.dumps(header).encode("utf-8") + b"\n")
+                for bloom in self.filters:
+                    out.write(bloom.bits)
+            os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as source:
+            if source.readline() != _SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not a Bloom filter snapshot")
+            header = json.loads(source.readline())
+            scalable = cls(header["initial_capacity"], header["error_rate"], header["growth"], header["tightening"])
+            for stage in header["stages"]:
+                bits = bytearray(source.read((stage["num_bits"] + 7) // 8))
+                if len(bits) != (stage["num_bits"] + 7) // 8:
+                    raise ValueError(f"{path} is truncated")
+                scalable.filters.append(BloomFilter(stage["capacity"], stage["error_rate"], stage["num_bits"],
+                                                    stage["num_hashes"], bits, stage["count"]))
+        return scalable
@@ -0,0 +1,180 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class CacheBackend(ABC):
+    """Minimal interface for a shared cache tier (e.g. Redis/memcached behind an adapter)."""
+
+    @abstractmethod
+    def get(self, key):
+        """Return the cached value or ``MISSING``."""
+
+    @abstractmethod
+    def set(self, key, value, ttl):
+        pass
+
+    @abstractmethod
+    def delete(self, key):
+        pass
+
+
+class LocalSharedBackend(CacheBackend):
+    """In-process stand-in for a shared backend: a TTL'd dict with no size bound."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return MISSING
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class LRUTTLCache:
+    """
+    Bounded per-process cache: least-recently-used eviction plus a per-entry TTL.
+
+    Counts hits, misses, evictions (LRU) and expirations so the size and TTL can be
+    tuned from ``stats()``.
+    """
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class ReadThroughCache:
+    """
+    Local LRU+TTL tier in front of an optional shared backend, in front of the database.
+
+    Invalidation deletes from both tiers of this process and from the shared backend;
+    other processes' local tiers only notice when their entry's TTL runs out, so the
+    local TTL bounds cross-worker staleness. A load that an invalidation of its key
+    overtakes may have read the row before the write, so its result is returned but
+    not cached (this covers invalidations within the process).
+    """
+
+    def __init__(self, max_entries, ttl, shared=None):
+        self.local = LRUTTLCache(max_entries, ttl)
+        self.shared = shared
+        self.shared_hits = self.stale_loads = 0
+        # key -> [loads in flight, invalidations since the first of them started]
+        self._loads = {}
+        self._lock = threading.Lock()
+
+    def _load(self, key, loader):
+        """``loader()``, and whether the key was invalidated while it ran."""
+        with self._lock:
+            loads = self._loads.setdefault(key, [0, 0])
+            loads[0] += 1
+            seen = loads[1]
+        try:
+            value = loader()
+        finally:
+            with self._lock:
+                loads = self._loads[key]
+                stale = loads[1] != seen
+                loads[0] -= 1
+                if not loads[0]:
+                    del self._loads[key]
+        return value, stale
+
+    def get_or_load(self, key, loader):
+        value = self.local.get(key)
+        if value is not MISSING:
+            return value
+        if self.shared is not None:
+            value = self.shared.get(key)
+            if value is not MISSING:
+                self.shared_hits += 1
+                self.local.set(key, value)
+                return value
+        value, stale = self._load(key, loader)
+        if stale:
+            self.stale_loads += 1
+        elif value is not None:
+            self.local.set(key, value)
+            if self.shared is not None:
+                self.shared.set(key, value, self.local.ttl)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            loads = self._loads.get(key)
+            if loads:
+                loads[1] += 1
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(key)
+
+    def stats(self):
+        stats = self.local.stats()
+        stats["stale_loads"] = self.stale_loads
+        if self.shared is not None:
+            stats["shared_backend"] = type(self.shared).__name__
+            stats["shared_hits"] = self.shared_hits
+        return stats
@@ -0,0 +1,160 @@
+import gzip
+import zlib
+
+from flask import current_app, request
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge, UnsupportedMediaType
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip always works
+    zstandard = None
+
+READ_BLOCK_SIZE = 64 * 1024
+# Response compression applies to these types only; everything the API returns is one of them.
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/x-ndjson", "text/plain", "text/csv"}
+
+
+def supported_encodings():
+    return ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+
+class LimitedDecodingStream:
+    """
+    Read-only stream that decodes a compressed request body as it is read.
+
+    Output is pulled from the decoder in bounded reads, so a small body that inflates to
+    gigabytes fails with 413 once ``max_size`` decoded bytes have been produced, without
+    ever holding more than one block of it.
+    """
+
+    def __init__(self, raw, encoding, max_size):
+        if encoding == "gzip":
+            self._decoded = gzip.GzipFile(fileobj=raw, mode="rb")
+        else:
+            self._decoded = zstandard.ZstdDecompressor().stream_reader(raw)
+        self.encoding = encoding
+        self.max_size = max_size
+        self.decoded_bytes = 0
+
+    def _read_block(self, size):
+        try:
+            data = self._decoded.read(size)
+        except (OSError, EOFError, zlib.error) as e:
+            raise BadRequest(f"Invalid {self.encoding} request body: {e}")
+        except Exception as e:
+            if zstandard is not None and isinstance(e, zstandard.ZstdError):
+                raise BadRequest(f"Invalid {self.encoding} request body: {e}")
+            raise
+        self.decoded_bytes += len(data)
+        if self.decoded_bytes > self.max_size:
+            raise RequestEntityTooLarge(f"Decompressed request body exceeds {self.max_size} bytes")
+        return data
+
+    def read(self, size=-1):
+        if size is not None and size >= 0:
+            return self._read_block(size)
+        blocks = []
+        while True:
+            block = self._read_block(READ_BLOCK_SIZE)
+            if not block:
+                return b"".join(blocks)
+            blocks.append(block)
+
+    def close(self):
+        self._decoded.close()
+
+
+class RequestDecompressionMiddleware:
+    """
+    WSGI middleware decoding ``Content-Encoding: gzip|zstd`` request bodies on bulk routes.
+
+    Only paths ending in one of ``path_suffixes`` (``/batch``, ``/stream``) are decoded;
+    other encodings there get 415. The decoded length is unknown up front, so the body is
+    marked ``wsgi.input_terminated`` and read to EOF instead of by Content-Length.
+    """
+
+    def __init__(self, wsgi_app, max_size, path_suffixes=("/batch", "/stream")):
+        self.wsgi_app = wsgi_app
+        self.max_size = max_size
+        self.path_suffixes = tuple(path_suffixes)
+
+    def __call__(self, environ, start_response):
+        encoding = environ.get("HTTP_CONTENT_ENCODING", "").strip().lower()
+        if encoding and encoding != "identity" and environ.get("PATH_INFO", "").rstrip("/").endswith(self.path_suffixes):
+            if encoding not in supported_encodings():
+                error = UnsupportedMediaType(f"Unsupported Content-Encoding '{encoding}', "
+                                             f"expected one of {', '.join(supported_encodings())}")
+                return error(environ, start_response)
+            environ["wsgi.input"] = LimitedDecodingStream(environ["wsgi.input"], encoding, self.max_size)
+            environ["wsgi.input_terminated"] = True
+            environ.pop("CONTENT_LENGTH", None)
+            del environ["HTTP_CONTENT_ENCODING"]
+        return self.wsgi_app(environ, start_response)
+
+
+def choose_encoding(accept_encoding):
+    """Best encoding the client accepts (``accept_encoding`` is werkzeug's parsed header), or None."""
+    best, best_quality = None, 0
+    for encoding in supported_encodings():
+        quality = accept_encoding[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _compressor(encoding, level):
+    if encoding == "gzip":
+        return zlib.compressobj(level, zlib.DEFLATED, 31)
+    return zstandard.ZstdCompressor(level=level).compressobj()
+
+
+def _compress_iter(chunks, encoding, level):
+    compressor = _compressor(encoding, level)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def compress_response(response, accept_encoding, min_size, gzip_level=6, zstd_level=3):
+    """
+    Compress ``response`` in place per the request's Accept-Encoding.
+
+    Buffered bodies smaller than ``min_size`` are left alone. Streamed bodies (list
+    ``?stream=true``) are compressed chunk by chunk as they are produced.
+    """
+    if (response.status_code < 200 or response.status_code in (204, 304)
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = choose_encoding(accept_encoding)
+    if encoding is None:
+        return response
+    level = gzip_level if encoding == "gzip" else zstd_level
+    if response.is_streamed:
+        response.response = _compress_iter(response.response, encoding, level)
+        response.headers.pop("Content-Length", None)
+    else:
+        body = response.get_data()
+        if len(body) < min_size:
+            return response
+        response.set_data(b"".join(_compress_iter([body], encoding, level)))
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def _compress_after_request(response):
+    config = current_app.config
+    return compress_response(response, request.accept_encodings, config["RESPONSE_COMPRESSION_MIN_BYTES"],
+                             config["RESPONSE_GZIP_LEVEL"], config["RESPONSE_ZSTD_LEVEL"])
+
+
+def init_compression(app):
+    """Decode compressed bulk request bodies and, if enabled, compress responses."""
+    app.wsgi_app = RequestDecompressionMiddleware(app.wsgi_app, app.config["REQUEST_DECOMPRESSED_MAX_BYTES"])
+    if app.config["RESPONSE_COMPRESSION_ENABLED"]:
+        app.after_request(_compress_after_request)
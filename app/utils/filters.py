@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+
+
+def parse_timestamp(value):
+    """Parse an ISO 8601 timestamp (``Z`` suffix allowed) into a naive UTC datetime."""
+    text = value.strip()
+    if text.endswith(("Z", "z")):
+        text = text[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"Invalid timestamp '{value}', expected ISO 8601")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def build_conditions(args, filter_columns, time_column=None):
+    """
+    Translate list-endpoint query arguments into SQL conditions.
+
+    ``filter_columns`` maps an argument name to the column it matches by equality.
+    ``from``/``to`` bound ``time_column`` as a half-open range [from, to). Arguments
+    that are absent or empty are ignored.
+    """
+    args = args or {}
+    conditions = []
+    for name, column in filter_columns.items():
+        value = args.get(name)
+        if value not in (None, ""):
+            conditions.append(column == value)
+    if time_column is not None:
+        if args.get("from"):
+            conditions.append(time_column >= parse_timestamp(args["from"]))
+        if args.get("to"):
+            conditions.append(time_column < parse_timestamp(args["to"]))
+    elif args.get("from") or args.get("to"):
+        raise ValueError("This resource has no timestamp to filter on")
+    return conditions
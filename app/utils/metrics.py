@@ -0,0 +1,189 @@
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(labels), value] for labels, value in self._values.items()]
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. ``observe`` is one bisect and two additions under a lock;
+    bucket counts are kept non-cumulative and only summed up when rendered.
+    """
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(labels), list(counts), total] for labels, (counts, total) in self._values.items()]
+
+
+class MetricsRegistry:
+    """
+    Per-process metrics, aggregated across gunicorn workers through snapshot files.
+
+    With a ``directory``, each process rewrites ``<directory>/metrics_<pid>.json`` every
+    ``flush_interval`` seconds (and at exit) from a background thread, and ``collect``
+    sums every file with the live values of the current process. Files of exited
+    workers are kept so counters never go backwards; the directory is cleared when the
+    gunicorn master starts. Without a directory only the current process is reported.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self.directory = None
+        self.flush_interval = 1.0
+        self._pid = None
+        self._flusher = None
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._metrics.setdefault(name, Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._metrics.setdefault(name, Histogram(name, documentation, labelnames, buckets))
+
+    def configure(self, directory=None, flush_interval=1.0):
+        self.directory = directory or None
+        self.flush_interval = flush_interval
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def snapshot(self):
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f"metrics_{pid}.json")
+
+    def write_snapshot(self):
+        path = self._path(os.getpid())
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as out:
+            json.dump(self.snapshot(), out)
+        os.replace(tmp, path)
+
+    def ensure_flusher(self):
+        """Start this process's snapshot writer; cheap enough to call on every request."""
+        if not self.directory or self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._flusher = threading.Thread(target=self._flush_forever, name="metrics-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.write_snapshot)
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.write_snapshot()
+            except OSError:
+                pass
+
+    def collect(self):
+        """Snapshots of every worker (live values for this one), merged per metric and label set."""
+        snapshots = [self.snapshot()]
+        if self.directory:
+            own = self._path(os.getpid())
+            for path in glob.glob(os.path.join(self.directory, "metrics_*.json")):
+                if path == own:
+                    continue
+                try:
+                    with open(path) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        merged = {}
+        for snapshot in snapshots:
+            for name, samples in snapshot.items():
+                if name not in self._metrics:
+                    continue
+                target = merged.setdefault(name, {})
+                for sample in samples:
+                    labels = tuple(sample[0])
+                    if len(sample) == 2:
+                        target[labels] = target.get(labels, 0) + sample[1]
+                    else:
+                        counts, total = target.get(labels, ([0] * len(sample[1]), 0.0))
+                        target[labels] = ([a + b for a, b in zip(counts, sample[1])], total + sample[2])
+        return merged
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        merged = self.collect()
+        lines = []
+        for name, metric in self._metrics.items():
+            kind = "counter" if isinstance(metric, Counter) else "histogram"
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(merged.get(name, {}).items()):
+                pairs = [f'{key}="{_escape(val)}"' for key, val in zip(metric.labelnames, labels)]
+                if kind == "counter":
+                    lines.append(f"{name}{_labels(pairs)} {_number(value)}")
+                    continue
+                counts, total = value
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _number(bound)
+                    bucket_pairs = pairs + [f'le="{le}"']
+                    lines.append(f"{name}_bucket{_labels(bucket_pairs)} {cumulative}")
+                lines.append(f"{name}_sum{_labels(pairs)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(pairs)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs):
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def clear_snapshots(directory):
+    """Remove the snapshot files of a previous run (called from the gunicorn master)."""
+    for path in glob.glob(os.path.join(directory, "metrics_*.json*")):
+        os.remove(path)
+
+
+registry = MetricsRegistry()
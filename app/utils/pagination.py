@@ -0,0 +1,116 @@
+import base64
+import json
+from datetime import datetime
+
+from flask import Response, current_app, stream_with_context
+from sqlalchemy import DateTime, tuple_
+
+from app.models import db
+
+TRUTHY = {"1", "true", "yes", "on"}
+
+
+def is_truthy(value):
+    return str(value).strip().lower() in TRUTHY
+
+
+def parse_page_args(args, config=None):
+    """Read ``limit`` and ``cursor`` from the query string, clamping limit to PAGE_SIZE_MAX."""
+    config = config or current_app.config
+    limit = args.get("limit", config["PAGE_SIZE_DEFAULT"])
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, config["PAGE_SIZE_MAX"]), args.get("cursor")
+
+
+def encode_cursor(values):
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, key_columns):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(key_columns):
+        raise ValueError("Invalid cursor")
+    decoded = []
+    for col, value in zip(key_columns, values):
+        if isinstance(col.type, DateTime) and value is not None:
+            try:
+                value = datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                raise ValueError("Invalid cursor")
+        decoded.append(value)
+    return decoded
+
+
+def keyset_statement(stmt, key_columns, limit, cursor=None):
+    """``stmt`` ordered by ``key_columns``, starting after ``cursor``, with one look-ahead row."""
+    stmt = stmt.order_by(*key_columns)
+    if cursor:
+        values = decode_cursor(cursor, key_columns)
+        if len(key_columns) == 1:
+            stmt = stmt.where(key_columns[0] > values[0])
+        else:
+            stmt = stmt.where(tuple_(*key_columns) > tuple_(*values))
+    return stmt.limit(limit + 1)
+
+
+def split_page(rows, key_columns, limit):
+    """Drop the look-ahead row fetched by ``keyset_statement`` and derive the next cursor from it."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([rows[-1]._mapping[col] for col in key_columns])
+
+
+def keyset_page(stmt, key_columns, limit, cursor=None):
+    """
+    Fetch one page of ``stmt`` ordered by ``key_columns``.
+
+    The cursor holds the key of the last row on the previous page, so each page is
+    an index range scan starting right after it instead of an OFFSET. ``stmt`` must
+    select the key columns.
+
+    Returns:
+        tuple: (list of result rows, next cursor or None when exhausted)
+    """
+    rows = db.session.execute(keyset_statement(stmt, key_columns, limit, cursor)).all()
+    return split_page(rows, key_columns, limit)
+
+
+def iter_rows(stmt, key_columns, yield_per=None):
+    """Yield every row of ``stmt`` through a server-side cursor, ``yield_per`` rows at a time."""
+    yield_per = yield_per or current_app.config["STREAM_YIELD_PER"]
+    stmt = stmt.order_by(*key_columns).execution_options(yield_per=yield_per)
+    for row in db.session.execute(stmt):
+        yield row
+
+
+def json_response(body):
+    return Response(body, mimetype="application/json")
+
+
+def stream_json_array(items):
+    """Stream an iterable of already-encoded JSON values as a JSON array without materialising it."""
+
+    def generate():
+        yield "["
+        first = True
+        for item in items:
+            if first:
+                first = False
+                yield item
+            else:
+                yield "," + item
+        yield "]"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
@@ -0,0 +1,73 @@
+import math
+import threading
+import time
+
+
+class SlidingWindowCounter:
+    """
+    Per-key event counts over a sliding time window, kept in time-bucketed ring buffers.
+
+    Each key owns ``window_seconds / bucket_seconds`` slots; a slot holds the count of
+    one bucket and the bucket's id, so a slot left over from an earlier lap of the ring
+    is recognised as expired and reset on reuse. A count covers the current bucket and
+    the ones before it, i.e. the window is exact to one bucket. Keys with no event left
+    in the window are evicted once per bucket period.
+    """
+
+    def __init__(self, window_seconds, bucket_seconds):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = max(1, math.ceil(window_seconds / bucket_seconds))
+        self._rings = {}
+        self._lock = threading.Lock()
+        self._swept = None
+
+    def _bucket(self, timestamp):
+        return int(timestamp // self.bucket_seconds)
+
+    def add(self, key, timestamp, now=None, amount=1):
+        """
+        Count an event of ``key`` at ``timestamp`` (epoch seconds).
+
+        Events older than the window are dropped and future ones count as now.
+
+        Returns:
+            bool: Whether the event was counted.
+        """
+        current = self._bucket(time.time() if now is None else now)
+        bucket = min(self._bucket(timestamp), current)
+        if bucket <= current - self.num_buckets:
+            return False
+        slot = bucket % self.num_buckets
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is None:
+                ring = self._rings[key] = ([-1] * self.num_buckets, [0] * self.num_buckets)
+            ids, counts = ring
+            if ids[slot] != bucket:
+                ids[slot], counts[slot] = bucket, 0
+            counts[slot] += amount
+        if self._swept != current:
+            self.evict(current)
+        return True
+
+    def count(self, key, now=None):
+        ring = self._rings.get(key)
+        if ring is None:
+            return 0
+        oldest = self._bucket(time.time() if now is None else now) - self.num_buckets + 1
+        with self._lock:
+            return sum(count for bucket, count in zip(*ring) if bucket >= oldest)
+
+    def evict(self, current=None):
+        """Drop keys whose every bucket has left the window."""
+        current = self._bucket(time.time()) if current is None else current
+        oldest = current - self.num_buckets + 1
+        with self._lock:
+            self._swept = current
+            stale = [key for key, (ids, _) in self._rings.items() if max(ids) < oldest]
+            for key in stale:
+                del self._rings[key]
+
+    def __len__(self):
+        return len(self._rings)
@@ -0,0 +1,159 @@
+"""
+Load generator for comparing the sync (gunicorn) and async (ASGI) ingestion servers.
+
+Standard library only: ``concurrency`` keep-alive HTTP/1.1 connections send POSTs as fast
+as responses come back, and the script reports throughput and latency percentiles.
+
+    # sync deployment
+    gunicorn -c gunicorn.conf.py "app:create_app()"
+    # async deployment
+    SERVER_MODE=asgi gunicorn -c gunicorn.conf.py "app.asgi:create_asgi_app()"
+
+    python benchmarks/ingest_benchmark.py --url http://127.0.0.1:8000 --concurrency 200 --requests 20000
+    python benchmarks/ingest_benchmark.py --path /api/payment/batch --batch-size 100 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from urllib.parse import urlsplit
+
+
+def payment(run_id, n):
+    return {
+        "message_id": f"bench-{run_id}-{n}",
+        "card_number_token": f"tok-{n % 5000}",
+        "merchant_id": f"m-{n % 300}",
+        "device_id": f"d-{n % 2000}",
+        "amount": round(10 + (n % 1000) * 0.37, 2),
+        "currency": "USD",
+        "status": "approved",
+        "timestamp": "2024-06-01T12:00:00",
+    }
+
+
+def build_bodies(run_id, requests, batch_size):
+    bodies, n = [], 0
+    for _ in range(requests):
+        if batch_size:
+            body = [payment(run_id, n + i) for i in range(batch_size)]
+            n += batch_size
+        else:
+            body = payment(run_id, n)
+            n += 1
+        bodies.append(json.dumps(body).encode())
+    return bodies
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    status = int(status_line.split()[1])
+    length = 0
+    chunked = False
+    keep_alive = True
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+        elif name.lower() == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+        elif name.lower() == "connection" and "close" in value.lower():
+            keep_alive = False
+    if chunked:
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def worker(host, port, path, queue, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            try:
+                body = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            request = (f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                       f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n").encode() + body
+            started = time.perf_counter()
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, keep_alive = await read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+                statuses["error"] = statuses.get("error", 0) + 1
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+            if not keep_alive:
+                # Sync gunicorn workers close the connection after every response.
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def run(args):
+    url = urlsplit(args.url)
+    bodies = build_bodies(uuid.uuid4().hex[:8], args.requests, args.batch_size)
+    queue = asyncio.Queue()
+    for body in bodies:
+        queue.put_nowait(body)
+    latencies, statuses = [], {}
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(url.hostname, url.port or 80, args.path, queue, latencies, statuses)
+                           for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    rows = len(latencies) * (args.batch_size or 1)
+    return {
+        "path": args.path,
+        "concurrency": args.concurrency,
+        "requests": len(latencies),
+        "statuses": {str(k): v for k, v in sorted(statuses.items(), key=str)},
+        "seconds": round(elapsed, 3),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "rows_per_s": round(rows / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--path", default="/api/payment/")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=0,
+                        help="rows per request for /batch paths; 0 sends single records")
+    print(json.dumps(asyncio.run(run(parser.parse_args())), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,36 @@
+import os
+
 bind = "0.0.0.0:8000"
-workers = 2
-timeout = 120
\ No newline at end of file
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+# More than one thread switches gunicorn to gthread workers; group commit stays off without them.
+threads = int(os.getenv("GUNICORN_THREADS", 1))
+timeout = 120
+# SERVER_MODE=asgi serves "app.asgi:create_asgi_app()" on uvicorn workers (asyncio + asyncpg).
+if os.getenv("SERVER_MODE", "wsgi") == "asgi":
+    worker_class = "uvicorn.workers.UvicornWorker"
+# Workers write metric snapshots here so /metrics can sum them, whichever worker serves the scrape.
+os.environ.setdefault("METRICS_DIR", "/tmp/credit-fraud-api-metrics")
+
+
+def on_starting(server):
+    # Snapshots from a previous run would otherwise be summed into this one's counters.
+    from app.utils.metrics import clear_snapshots
+
+    if os.path.isdir(os.environ["METRICS_DIR"]):
+        clear_snapshots(os.environ["METRICS_DIR"])
+
+    # Create the upcoming monthly partitions (and apply retention) once per deploy, before workers fork.
+    if os.getenv("DB_PARTITIONING", "false").lower() in ("1", "true", "yes"):
+        from app import create_app
+        from app.models import db
+        from app.services.partition_service import maintain_partitions
+
+        app = create_app()
+        with app.app_context():
+            maintain_partitions(
+                months_ahead=app.config["PARTITION_MONTHS_AHEAD"],
+                keep_months=app.config["PARTITION_RETENTION_MONTHS"],
+                action=app.config["PARTITION_RETENTION_ACTION"],
+                export_dir=app.config["PARTITION_EXPORT_DIR"],
+            )
+            db.engine.dispose()
@@ -0,0 +1,56 @@
+import csv
+import io
+import os
+import re
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.models import db
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        # The models live in a named schema; on SQLite that is an attached database.
+        schemas = {t.schema for t in db.metadata.tables.values() if t.schema}
+
+        @event.listens_for(db.engine, "connect")
+        def attach_schemas(dbapi_conn, _):
+            for schema in schemas:
+                dbapi_conn.execute(f"ATTACH DATABASE ':memory:' AS \"{schema}\"")
+
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def sqlite_copy(monkeypatch):
+    """
+    Make ``method=copy`` run on SQLite through a stand-in for ``copy_expert`` that, like
+    psycopg2's, raises the driver's own exceptions rather than SQLAlchemy's.
+    """
+    def copy_expert(cursor, sql, source):
+        table, columns, is_csv = re.match(r"COPY (\S+) \((.*)\) FROM STDIN( WITH \(FORMAT csv.*)?$", sql).groups()
+        text = source.read()
+        if is_csv:
+            rows = [[value or None for value in row] for row in csv.reader(io.StringIO(text.decode()))][1:]
+        else:
+            rows = [[None if value == "\\N" else value for value in line.split("\t")] for line in text.splitlines()]
+        columns = columns.split(", ")
+        cursor.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", rows)
+
+    monkeypatch.setattr("app.services.ingest.supports_copy", lambda: True)
+    monkeypatch.setattr("app.services.copy_loader._copy_expert", copy_expert)
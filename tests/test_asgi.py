@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+# Test-only dependencies, from requirements-dev.txt.
+pytest.importorskip("starlette")
+pytest.importorskip("httpx")
+pytest.importorskip("aiosqlite")
+
+from flask import has_app_context
+from sqlalchemy import event
+from starlette.testclient import TestClient
+
+from app.asgi import create_asgi_app, load_config
+from app.models import db
+from app.services.events import rows_inserted, rows_written
+
+
+@pytest.fixture
+def asgi_client(tmp_path):
+    config = dict(load_config(), SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'main.db'}")
+    app = create_asgi_app(config)
+    schemas = {t.schema for t in db.metadata.tables.values() if t.schema}
+
+    @event.listens_for(app.state.engine.sync_engine, "connect")
+    def attach_schemas(dbapi_conn, _):
+        for schema in schemas:
+            dbapi_conn.execute(f"ATTACH DATABASE '{tmp_path / schema}.db' AS \"{schema}\"")
+
+    async def create_all():
+        async with app.state.engine.begin() as conn:
+            await conn.run_sync(db.metadata.create_all)
+
+    asyncio.run(create_all())
+    with TestClient(app) as client:
+        yield client
+
+
+def test_crud_matches_sync_responses(asgi_client):
+    response = asgi_client.post('/api/payment/', json={"message_id": "m1", "amount": 2, "timestamp": "2024-01-02T03:04:05Z"})
+    assert response.status_code == 201
+    assert response.json()["timestamp"] == "Tue, 02 Jan 2024 03:04:05 GMT"
+    assert asgi_client.get('/api/payment/m1').json()["amount"] == 2.0
+    assert asgi_client.put('/api/payment/m1', json={"status": "settled", "bogus": 1}).json()["status"] == "settled"
+    assert asgi_client.delete('/api/payment/m1').json() == {"message": "Deleted"}
+    assert asgi_client.get('/api/payment/m1').json() == {"error": "Not found"}
+
+
+def test_batch_and_pages(asgi_client):
+    batch = [{"message_id": f"m{i}"} for i in range(5)] + [{"message_id": "bad", "nope": 1}]
+    result = asgi_client.post('/api/payment/batch', json=batch).json()
+    assert (result["success_count"], result["failure_count"]) == (5, 1)
+    first = asgi_client.get('/api/payment/?limit=3').json()
+    assert [p["message_id"] for p in first["items"]] == ["m0", "m1", "m2"]
+    rest = asgi_client.get(f"/api/payment/?limit=3&cursor={first['next_cursor']}").json()
+    assert [p["message_id"] for p in rest["items"]] == ["m3", "m4"]
+    assert len(asgi_client.get('/api/payment/?stream=true').json()) == 5
+    assert asgi_client.get('/api/payment/?limit=zero').status_code == 400
+    assert asgi_client.post('/api/payment/batch', json={}).json() == {
+        "error": "Invalid input. Expected a list of payment records."}
+
+
+def test_upsert_and_ndjson_stream(asgi_client):
+    asgi_client.post('/api/dispute/batch', json=[{"dispute_id": "d1", "customer_id": "c", "merchant_id": "m",
+                                                  "transaction_id": "t", "timestamp": "2024-01-01T00:00:00"}])
+    result = asgi_client.post('/api/dispute/batch?on_conflict=update', json=[
+        {"dispute_id": "d1", "customer_id": "c2", "merchant_id": "m", "transaction_id": "t",
+         "timestamp": "2024-01-01T00:00:00"}]).json()
+    assert result["updated"] == ["d1"]
+    body = b'{"auth_event_id": "a1", "customer_id": "c", "device_id": "d", "timestamp": "2024-01-01T00:00:00"}\nnot json\n'
+    response = asgi_client.post('/api/authlog/stream', content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 201
+    assert (response.json()["inserted"], response.json()["failed"]) == (1, 1)
+
+
+def test_writes_notify_the_sync_receivers(asgi_client):
+    inserted, written = [], []
+
+    def on_inserted(model, rows, **_):
+        assert has_app_context()
+        inserted.extend((model.__tablename__, row["message_id"], row["amount"]) for row in rows)
+
+    def on_written(model, keys, **_):
+        written.extend(keys)
+
+    rows_inserted.connect(on_inserted)
+    rows_written.connect(on_written)
+    try:
+        asgi_client.post('/api/payment/', json={"message_id": "m1", "amount": "2"})
+        asgi_client.post('/api/payment/batch', json=[{"message_id": "m2", "amount": 3}])
+        asgi_client.post('/api/payment/batch?on_conflict=ignore', json=[{"message_id": "m2"}, {"message_id": "m3"}])
+        asgi_client.post('/api/payment/stream', content=b'{"message_id": "m4"}\n',
+                         headers={"Content-Type": "application/x-ndjson"})
+        asgi_client.put('/api/payment/m1', json={"amount": "5"})
+        asgi_client.delete('/api/payment/m2')
+    finally:
+        rows_inserted.disconnect(on_inserted)
+        rows_written.disconnect(on_written)
+    # Receivers get validated rows, with values coerced to the column types.
+    assert inserted == [("payment_msgs_raw", "m1", 2.0), ("payment_msgs_raw", "m2", 3.0),
+                        ("payment_msgs_raw", "m3", None), ("payment_msgs_raw", "m4", None)]
+    assert written == ["m1", "m2", "m3", "m4", "m1", "m2"]
+    assert asgi_client.get('/api/payment/m1').json()["amount"] == 5.0
+
+
+def test_rejected_batches_get_the_sync_error_body(asgi_client):
+    asgi_client.post('/api/payment/batch', json=[{"message_id": "m1"}])
+    response = asgi_client.post('/api/payment/batch', json=[{"message_id": "m2"}, {"message_id": "m1"}])
+    assert response.status_code == 201
+    assert response.json()["error"] == "Failed to save batch" and "details" in response.json()
+    assert len(asgi_client.get('/api/payment/?stream=true').json()) == 1
+
+
+def test_sync_only_batch_features_are_rejected(asgi_client):
+    assert asgi_client.post('/api/payment/batch?chunk_size=2', json=[{"message_id": "m1"}]).status_code == 400
+    response = asgi_client.post('/api/payment/batch', content=b"arrow",
+                                headers={"Content-Type": "application/vnd.apache.arrow.stream"})
+    assert response.status_code == 415
@@ -0,0 +1,66 @@
+import pytest
+
+from app.models import db
+from app.models.payment_msg import PaymentMessage
+from app.services.chunked_commit import index_ranges
+
+
+def test_index_ranges_collapse_runs():
+    assert index_ranges([0, 1, 2, 4, 6, 7]) == [[0, 2], [4, 4], [6, 7]]
+    assert index_ranges([]) == []
+
+
+def test_failing_rows_are_bisected_out_of_their_chunks(client):
+    # Rows 3 and 7 collide with existing keys; only the database can reject them.
+    db.session.add_all([PaymentMessage(message_id="p3"), PaymentMessage(message_id="p7")])
+    db.session.commit()
+    batch = [{"message_id": f"p{i}", "amount": float(i)} for i in range(10)]
+    batch[5]["amount"] = "bad"
+    result = client.post('/api/payment/batch?chunk_size=4', json=batch).json
+    assert result["chunks"] == 3
+    assert result["committed"] == [[0, 2], [4, 4], [6, 6], [8, 9]]
+    assert result["committed_count"] == 7
+    assert [failure["index"] for failure in result["failed_records"]] == [3, 5, 7]
+    assert db.session.query(PaymentMessage).count() == 9
+
+
+def test_copy_errors_are_bisected_like_orm_errors(client, sqlite_copy):
+    db.session.add(PaymentMessage(message_id="p1"))
+    db.session.commit()
+    batch = [{"message_id": f"p{i}", "amount": float(i)} for i in range(4)]
+    response = client.post('/api/payment/batch?chunk_size=4&method=copy', json=batch)
+    assert response.status_code == 201
+    assert response.json["committed"] == [[0, 0], [2, 3]]
+    assert [failure["index"] for failure in response.json["failed_records"]] == [1]
+    assert db.session.query(PaymentMessage).count() == 4
+
+
+def test_chunked_upsert_merges_outcomes(client):
+    db.session.add(PaymentMessage(message_id="p1", amount=1.0))
+    db.session.commit()
+    batch = [{"message_id": f"p{i}", "amount": 9.0} for i in range(3)]
+    result = client.post('/api/payment/batch?chunk_size=2&on_conflict=update', json=batch).json
+    assert result["committed"] == [[0, 2]]
+    assert sorted(result["inserted"]) == ["p0", "p2"]
+    assert result["updated"] == ["p1"]
+
+
+def test_chunk_size_applies_to_other_entities(client):
+    batch = [{"auth_event_id": "a1", "customer_id": "c", "device_id": "d", "timestamp": "2024-06-01T12:00:00"}] * 2
+    result = client.post('/api/authlog/batch?chunk_size=1', json=batch).json
+    assert result["committed"] == [[0, 0]]
+    assert result["failed_records"][0]["index"] == 1
+
+
+def test_batches_without_chunk_size_keep_the_single_transaction_response(client):
+    result = client.post('/api/payment/batch', json=[{"message_id": "p0"}]).json
+    assert result == {"success_count": 1, "failure_count": 0, "failed_records": []}
+
+
+def test_programming_errors_are_not_reported_as_rejected_rows(client, monkeypatch):
+    def broken(model, rows):
+        raise TypeError("bug")
+
+    monkeypatch.setattr("app.services.chunked_commit.insert_rows", broken)
+    with pytest.raises(TypeError):
+        client.post('/api/payment/batch?chunk_size=2', json=[{"message_id": "p0"}])
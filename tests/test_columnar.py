@@ -0,0 +1,127 @@
+import io
+from datetime import datetime
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq
+
+from app.models import db
+from app.models.payment_msg import PaymentMessage
+from app.services.columnar import ARROW_STREAM, PARQUET
+from app.services.dedup_filter import init_dedup_filter
+
+PAYMENTS = {
+    "message_id": ["m1", "m2", None],
+    "amount": [10, 20, 30],
+    "timestamp": ["2024-06-01T12:00:00", "2024-06-01T14:00:00+02:00", "2024-06-01T12:00:00Z"],
+}
+
+
+def arrow_stream(data, batch_size=None):
+    table = pa.table(data)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=batch_size)
+    return sink.getvalue().to_pybytes()
+
+
+def parquet_file(data):
+    buffer = io.BytesIO()
+    pq.write_table(pa.table(data), buffer)
+    return buffer.getvalue()
+
+
+def test_arrow_stream_is_cast_to_the_schema_and_reports_rejected_rows(client):
+    response = client.post('/api/payment/batch', data=arrow_stream(PAYMENTS, batch_size=2),
+                           content_type=ARROW_STREAM)
+    assert response.status_code == 201
+    assert response.json['success_count'] == 2
+    assert response.json['failed_records'] == [{"row": 2, "error": "Missing required field(s): message_id"}]
+    second = db.session.get(PaymentMessage, "m2")
+    assert second.amount == 20.0
+    # Offsets are normalized to naive UTC, like the JSON paths.
+    assert second.timestamp == datetime(2024, 6, 1, 12, 0)
+
+
+def test_date_only_and_offset_timestamps_are_cast_like_the_json_path(client):
+    data = {"message_id": ["d1", "d2", "d3", "d4"],
+            "timestamp": ["2024-06-01", "2024-06-01 14:00:00-01:00", "2024-06-01T14:00+0200", "2024-06-01T12:00:00.5"]}
+    response = client.post('/api/payment/batch', data=arrow_stream(data), content_type=ARROW_STREAM)
+    assert response.status_code == 201
+    assert [db.session.get(PaymentMessage, key).timestamp for key in data["message_id"]] == [
+        datetime(2024, 6, 1), datetime(2024, 6, 1, 15, 0), datetime(2024, 6, 1, 12, 0),
+        datetime(2024, 6, 1, 12, 0, 0, 500000)]
+
+
+def test_non_finite_floats_are_rejected_rows(client):
+    data = {"message_id": ["f1", "f2", "f3"], "amount": [1.5, float("nan"), None],
+            "risk_score": [float("inf"), 0.5, None]}
+    response = client.post('/api/payment/batch', data=arrow_stream(data), content_type=ARROW_STREAM)
+    assert response.json['success_count'] == 1
+    assert response.json['failed_records'] == [
+        {"row": 0, "error": "Invalid value for 'risk_score': expected a finite number"},
+        {"row": 1, "error": "Invalid value for 'amount': expected a finite number"}]
+    assert db.session.get(PaymentMessage, "f3").amount is None
+
+
+def test_stored_and_repeated_keys_are_skipped_with_the_dedup_filter(app, client, tmp_path):
+    db.session.add(PaymentMessage(message_id="m1"))
+    db.session.commit()
+    app.config.update(DEDUP_FILTER_ENABLED=True, DEDUP_FILTER_SNAPSHOT_DIR=str(tmp_path))
+    init_dedup_filter(app)
+    app.extensions["dedup_filter"].ensure_started(background=False)
+    data = {"message_id": ["m1", None, "m2", "m3", "m2"]}
+    response = client.post('/api/payment/batch', data=arrow_stream(data, batch_size=4), content_type=ARROW_STREAM)
+    assert response.json['success_count'] == 2
+    assert [(f["row"], f["error"]) for f in response.json['failed_records']] == [
+        (0, "Duplicate message_id 'm1'"), (1, "Missing required field(s): message_id"),
+        (4, "Duplicate message_id 'm2'")]
+    assert db.session.query(PaymentMessage).count() == 3
+
+
+def test_copied_tables_fall_back_when_the_filter_is_stale(app, client, tmp_path, sqlite_copy):
+    app.config.update(DEDUP_FILTER_ENABLED=True, DEDUP_FILTER_SNAPSHOT_DIR=str(tmp_path))
+    init_dedup_filter(app)
+    app.extensions["dedup_filter"].ensure_started(background=False)
+    db.session.add(PaymentMessage(message_id="m1"))  # after the warm-up: the filter has not seen it
+    db.session.commit()
+    data = {"message_id": ["m1", "m2"]}
+    response = client.post('/api/payment/batch?method=copy', data=arrow_stream(data), content_type=ARROW_STREAM)
+    assert response.json['success_count'] == 1
+    assert response.json['failed_records'] == [{"row": 0, "error": "Duplicate message_id 'm1'"}]
+    assert db.session.get(PaymentMessage, "m2") is not None
+
+
+def test_other_entities_answer_with_their_json_batch_body(client):
+    data = {"kyc_event_id": ["k1", "k2"], "customer_id": ["C1", None], "device_id": ["D1", "D1"],
+            "timestamp": ["2024-06-01T12:00:00", "2024-06-01T12:00:00"]}
+    response = client.post('/api/kyc/batch', data=parquet_file(data), content_type=PARQUET)
+    assert response.json == {"message": "1 KYC records inserted successfully",
+                             "failed_records": [{"row": 1, "error": "Missing required field(s): customer_id"}]}
+
+
+def test_parquet_upsert_goes_through_on_conflict(client):
+    db.session.add(PaymentMessage(message_id="m1", amount=1.0))
+    db.session.commit()
+    data = {"message_id": ["m1", "m3"], "amount": [9.0, 3.0]}
+    response = client.post('/api/payment/batch?on_conflict=update', data=parquet_file(data), content_type=PARQUET)
+    assert response.json['updated'] == ["m1"]
+    assert response.json['inserted'] == ["m3"]
+    db.session.expire_all()
+    assert db.session.get(PaymentMessage, "m1").amount == 9.0
+
+
+@pytest.mark.parametrize("data", [
+    {"message_id": ["m1"], "not_a_column": [1]},
+    {"message_id": ["m1"], "amount": ["ten"]},
+])
+def test_schema_mismatch_rejects_the_request(client, data):
+    response = client.post('/api/payment/batch', data=arrow_stream(data), content_type=ARROW_STREAM)
+    assert response.status_code == 400
+    assert db.session.query(PaymentMessage).count() == 0
+
+
+def test_malformed_body_is_a_bad_request(client):
+    response = client.post('/api/payment/batch', data=b"not arrow", content_type=ARROW_STREAM)
+    assert response.status_code == 400
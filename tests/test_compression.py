@@ -0,0 +1,62 @@
+import gzip
+import json
+
+import pytest
+import zstandard
+
+from app.models import db
+from app.models.payment_msg import PaymentMessage
+
+
+def _batch(n):
+    return json.dumps([{"message_id": f"m{i}", "iso_message_hex": "00" * 200} for i in range(n)]).encode()
+
+
+@pytest.mark.parametrize("encoding, compress", [
+    ("gzip", gzip.compress),
+    ("zstd", lambda body: zstandard.ZstdCompressor().compress(body)),
+])
+def test_compressed_batch_is_decoded(client, encoding, compress):
+    response = client.post('/api/payment/batch', data=compress(_batch(20)),
+                           headers={"Content-Type": "application/json", "Content-Encoding": encoding})
+    assert response.status_code == 201
+    assert response.json["success_count"] == 20
+    assert PaymentMessage.query.count() == 20
+
+
+def test_compressed_ndjson_stream_is_decoded(client):
+    body = b"\n".join(json.dumps({"message_id": f"m{i}"}).encode() for i in range(5))
+    response = client.post('/api/payment/stream', data=gzip.compress(body),
+                           headers={"Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"})
+    assert response.json["inserted"] == 5
+
+
+def test_decompression_bomb_is_rejected(app, client):
+    app.wsgi_app.max_size = 1024 * 1024
+    bomb = gzip.compress(b"[" + b" " * (8 * 1024 * 1024) + b"]")
+    response = client.post('/api/payment/batch', data=bomb,
+                           headers={"Content-Type": "application/json", "Content-Encoding": "gzip"})
+    assert response.status_code == 413
+    assert len(bomb) < 64 * 1024
+
+
+def test_unknown_or_corrupt_encoding_is_rejected(client):
+    headers = {"Content-Type": "application/json", "Content-Encoding": "br"}
+    assert client.post('/api/payment/batch', data=b"x", headers=headers).status_code == 415
+    headers["Content-Encoding"] = "gzip"
+    assert client.post('/api/payment/batch', data=b"not gzip", headers=headers).status_code == 400
+
+
+def test_responses_follow_accept_encoding(client):
+    db.session.add_all([PaymentMessage(message_id=f"m{i:03d}", iso_message_hex="ab" * 100) for i in range(50)])
+    db.session.commit()
+    plain = client.get('/api/payment/?limit=50')
+    assert "Content-Encoding" not in plain.headers
+    zipped = client.get('/api/payment/?limit=50', headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(zipped.data) == plain.data
+    assert "Accept-Encoding" in zipped.headers["Vary"]
+    streamed = client.get('/api/payment/?stream=true', headers={"Accept-Encoding": "zstd, gzip;q=0.5"})
+    assert streamed.headers["Content-Encoding"] == "zstd"
+    items = json.loads(zstandard.ZstdDecompressor().decompressobj().decompress(streamed.data))
+    assert len(items) == 50
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from app.models.payment_msg import PaymentMessage
+from app.services.copy_loader import _LineReader, _format_value
+
+
+def test_format_value_escapes_copy_text():
+    assert _format_value(None) == "\\N"
+    assert _format_value(True) == "t"
+    assert _format_value(datetime(2024, 1, 2, 3, 4, 5)) == "2024-01-02T03:04:05"
+    assert _format_value("a\tb\nc\\d") == "a\\tb\\nc\\\\d"
+
+
+def test_line_reader_serves_requested_sizes():
+    reader = _LineReader(iter(["ab\n", "cd\n", "ef\n"]))
+    assert reader.read(4) == "ab\nc"
+    assert reader.read() == "d\nef\n"
+    assert reader.read(10) == ""
+
+
+def test_copy_method_falls_back_without_postgres(client):
+    response = client.post('/api/payment/batch?method=copy', json=[{"message_id": "m1"}])
+    assert response.status_code == 201
+    assert response.json['success_count'] == 1
+    assert PaymentMessage.query.count() == 1
+
+
+def test_unknown_write_method_is_rejected(client):
+    response = client.post('/api/payment/batch?method=bogus', json=[{"message_id": "m1"}])
+    assert response.status_code == 400
@@ -0,0 +1,88 @@
+import pytest
+
+from app.models import db
+from app.models.payment_msg import PaymentMessage
+from app.services.dedup_filter import DuplicateKeyFilters, init_dedup_filter
+from app.utils.bloom import ScalableBloomFilter
+
+
+@pytest.fixture
+def filtered_client(app, tmp_path):
+    db.session.add(PaymentMessage(message_id="old"))
+    db.session.commit()
+    app.config.update(DEDUP_FILTER_ENABLED=True, DEDUP_FILTER_CAPACITY=100, DEDUP_FILTER_SNAPSHOT_DIR=str(tmp_path))
+    init_dedup_filter(app)
+    app.extensions["dedup_filter"].ensure_started(background=False)
+    return app.test_client()
+
+
+def payment_filter(app):
+    return app.extensions["dedup_filter"].filters[PaymentMessage]
+
+
+def test_scalable_filter_has_no_false_negatives_and_bounded_false_positives(tmp_path):
+    bloom = ScalableBloomFilter(initial_capacity=1000, error_rate=0.01)
+    bloom.update(f"k{i}" for i in range(5000))
+    assert len(bloom.filters) > 1
+    assert all(f"k{i}" in bloom for i in range(5000))
+    assert sum(f"x{i}" in bloom for i in range(10000)) < 100
+    bloom.dump(tmp_path / "f.bloom")
+    restored = ScalableBloomFilter.load(tmp_path / "f.bloom")
+    assert restored.stats() == bloom.stats()
+    assert all(f"k{i}" in restored for i in range(5000))
+
+
+def test_known_keys_are_reported_as_duplicates_without_failing_the_batch(app, filtered_client):
+    batch = [{"message_id": "old"}, {"message_id": "new"}, {"message_id": "new"}]
+    result = filtered_client.post('/api/payment/batch', json=batch).json
+    assert result["success_count"] == 1
+    assert [(f["index"], f["error"]) for f in result["failed_records"]] == [
+        (0, "Duplicate message_id 'old'"), (2, "Duplicate message_id 'new'")]
+    # Written keys are added to the filter through rows_written.
+    assert payment_filter(app).might_contain("new")
+    stats = filtered_client.get('/api/ops/dedup').json["payment_msgs_raw"]
+    assert stats["definitely_new"] == 1 and stats["duplicates"] == 2
+
+
+def test_keys_written_behind_the_filters_back_fall_back_to_an_exact_check(app, filtered_client):
+    db.session.add(PaymentMessage(message_id="elsewhere"))
+    db.session.commit()
+    result = filtered_client.post('/api/payment/batch?method=copy', json=[{"message_id": "elsewhere"},
+                                                                          {"message_id": "fresh"}]).json
+    assert result["success_count"] == 1
+    assert result["failed_records"][0]["index"] == 0
+    assert payment_filter(app).stats()["stale_fallbacks"] == 1
+    assert payment_filter(app).might_contain("elsewhere")
+
+
+def test_copy_writes_behind_a_stale_filter_fall_back_too(app, filtered_client, sqlite_copy):
+    db.session.add(PaymentMessage(message_id="elsewhere"))
+    db.session.commit()
+    result = filtered_client.post('/api/payment/batch?method=copy', json=[{"message_id": "fresh"},
+                                                                          {"message_id": "elsewhere"}]).json
+    assert result["success_count"] == 1
+    assert [(f["index"], f["error"]) for f in result["failed_records"]] == [(1, "Duplicate message_id 'elsewhere'")]
+    assert payment_filter(app).stats()["stale_fallbacks"] == 1
+    assert db.session.get(PaymentMessage, "fresh") is not None
+
+
+def test_restart_loads_the_snapshot_instead_of_scanning(app, filtered_client):
+    db.session.query(PaymentMessage).delete()
+    db.session.commit()
+    restarted = DuplicateKeyFilters(app)
+    restarted.ensure_started(background=False)
+    assert restarted.filters[PaymentMessage].might_contain("old")
+
+
+def test_restart_loads_the_union_of_every_workers_snapshot(app, filtered_client, tmp_path):
+    # A snapshot left by a worker that has exited (no process has this pid).
+    other = ScalableBloomFilter(100, app.config["DEDUP_FILTER_ERROR_RATE"])
+    other.add("other-worker")
+    other_path = tmp_path / "payment_msgs_raw.999999999.bloom"
+    other.dump(other_path)
+    restarted = DuplicateKeyFilters(app)
+    restarted.ensure_started(background=False)
+    key_filter = restarted.filters[PaymentMessage]
+    assert key_filter.might_contain("old") and key_filter.might_contain("other-worker")
+    assert not other_path.exists()
+    assert ScalableBloomFilter.load(key_filter.snapshot_path).stats()["keys"] == 2
@@ -0,0 +1,48 @@
+import csv
+import io
+from datetime import datetime
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq
+
+from app.models import db
+from app.models.payment_msg import PaymentMessage
+
+
+@pytest.fixture
+def payments(app):
+    app.config["EXPORT_CHUNK_SIZE"] = 2
+    db.session.add_all(PaymentMessage(message_id=f"m{i}", amount=float(i), status="ok, \"quoted\"",
+                                      timestamp=datetime(2024, 6, 1 + i)) for i in range(5))
+    db.session.commit()
+
+
+def test_csv_export_streams_the_time_range(client, payments):
+    response = client.get('/api/payment/export?format=csv&from=2024-06-02&to=2024-06-05')
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert response.headers["Content-Disposition"] == 'attachment; filename="payment_msgs_raw.csv"'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [row["message_id"] for row in rows] == ["m1", "m2", "m3"]
+    assert rows[0]["status"] == 'ok, "quoted"'
+    assert rows[0]["currency"] == ""
+
+
+def test_parquet_export_writes_one_row_group_per_chunk(client, payments):
+    response = client.get('/api/payment/export?format=parquet')
+    parquet = pq.ParquetFile(io.BytesIO(response.get_data()))
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.column("message_id").to_pylist() == [f"m{i}" for i in range(5)]
+    assert table.schema.field("timestamp").type == pa.timestamp("us")
+
+
+def test_empty_export_is_still_a_valid_file(client):
+    response = client.get('/api/kyc/export?format=parquet')
+    assert pq.read_table(io.BytesIO(response.get_data())).num_rows == 0
+
+
+def test_unknown_format_is_rejected(client):
+    assert client.get('/api/payment/export?format=xlsx').status_code == 400
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.models import db
+from app.models.auth_log_msg import AuthLogMessage
+from app.models.payment_msg import PaymentMessage
+
+
+@pytest.fixture
+def captured_sql(app):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", capture)
+
+
+def _plan(statement, parameters):
+    rows = db.session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return " | ".join(row[-1] for row in rows)
+
+
+def _seed_auth_logs():
+    base = datetime(2024, 1, 1)
+    db.session.add_all([
+        AuthLogMessage(auth_event_id=f"a{i}", customer_id=f"c{i % 2}", device_id=f"d{i % 3}",
+                       timestamp=base + timedelta(hours=i), auth_status="failure" if i % 4 == 0 else "success")
+        for i in range(8)
+    ])
+    db.session.commit()
+
+
+def test_auth_log_filters(client):
+    _seed_auth_logs()
+    result = client.get('/api/authlog/?customer_id=c0&from=2024-01-01T02:00:00Z&to=2024-01-01T06:00:00').json
+    assert [a['auth_event_id'] for a in result['items']] == ['a2', 'a4']
+    result = client.get('/api/authlog/?auth_status=failure').json
+    assert [a['auth_event_id'] for a in result['items']] == ['a0', 'a4']
+
+
+def test_bad_timestamp_filter_is_rejected(client):
+    assert client.get('/api/authlog/?from=yesterday').status_code == 400
+    assert client.get('/api/payment/?to=2024-13-01').status_code == 400
+
+
+def test_customer_time_range_uses_index_range_scan(client, captured_sql):
+    _seed_auth_logs()
+    client.get('/api/authlog/?customer_id=c1&from=2024-01-01T00:00:00&limit=2')
+    plan = _plan(*captured_sql[-1])
+    assert "SEARCH" in plan and "USING INDEX ix_auth_log_msgs_raw_customer_ts (customer_id=? AND timestamp>?)" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_payment_card_filter_uses_index_range_scan(client, captured_sql):
+    db.session.add_all([PaymentMessage(message_id=f"m{i}", card_number_token=f"t{i % 2}") for i in range(4)])
+    db.session.commit()
+    result = client.get('/api/payment/?card_number_token=t1').json
+    assert [p['message_id'] for p in result['items']] == ['m1', 'm3']
+    plan = _plan(*captured_sql[-1])
+    assert "USING INDEX ix_payment_msgs_raw_card_id (card_number_token=?)" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+# The generator is a dev tool; its dependencies are not in requirements.txt.
+pytest.importorskip("faker")
+pd = pytest.importorskip("pandas")
+
+from app.services.synthentic_data_generator import (
+    HIGH_RISK_MCC,
+    generate_auth_log,
+    generate_base_entities,
+    generate_datasets,
+    generate_dispute_msgs,
+    generate_kyc_msgs,
+    generate_payment_msgs,
+    make_rng,
+    merge_sorted_chunks,
+    rechunk,
+    stream_datasets,
+    write_chunks_to_csv,
+)
+
+START, END = datetime(2022, 1, 1), datetime(2024, 12, 31)
+
+
+def generate(seed):
+    rng = make_rng(seed)
+    customers, merchants, scenario_users = generate_base_entities(500, 300, rng=rng)
+    auth, compromised = generate_auth_log(customers, scenario_users, START, END, rng=rng)
+    payments, fraud_ids = generate_payment_msgs(customers, merchants, scenario_users, compromised, START, END, rng=rng)
+    disputes = generate_dispute_msgs(payments, fraud_ids, customers, START, END, rng=rng)
+    kyc = generate_kyc_msgs(customers, START, END, duplicate_pairs=10, duplicate_triples=2, fail_count=50, rng=rng)
+    return customers, scenario_users, compromised, fraud_ids, auth, payments, disputes, kyc
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    return generate(42)
+
+
+def test_a_fixed_seed_reproduces_every_table(dataset):
+    again = generate(42)
+    for frame, same in zip(dataset[4:], again[4:]):
+        assert frame.equals(same)
+    assert not dataset[4].equals(generate(7)[4])
+
+
+def test_account_takeover_and_2fa_semantics(dataset):
+    customers, scenario_users, compromised, fraud_ids, auth, payments, _, kyc = dataset
+    assert set(compromised) == scenario_users and len(scenario_users) == 5
+    for user_id, comp_time in compromised.items():
+        attacker = auth[auth.device_id == customers[user_id]["attacker_device"]]
+        success = attacker[attacker.auth_status == "success"]
+        assert len(success) == 1 and success.timestamp.iloc[0] == comp_time
+        assert (attacker.customer_id == user_id).all() and len(attacker) >= 2
+    fraud = payments[payments.message_id.isin(fraud_ids)]
+    for row in fraud.itertuples():
+        user_id = next(u for u, info in customers.items() if info["card_token"] == row.card_number_token)
+        assert row.device_id == customers[user_id]["attacker_device"] and row.status == "approved"
+        assert compromised[user_id] < row.timestamp <= min(compromised[user_id] + timedelta(days=1), END)
+
+    twofa = {user_id for user_id, info in customers.items() if info["twofa_enabled"]}
+    assert set(auth[auth.failure_reason == "OTP mismatch"].customer_id) <= twofa
+    successes = auth[auth.auth_status == "success"]
+    assert ((successes.auth_type == "2FA") == successes.customer_id.isin(twofa)).all()
+    assert (successes.login_attempts >= 1).all()
+    assert (kyc.verification_status == "failed").sum() == 50
+
+
+def test_high_risk_merchants_drive_risk_scores(dataset):
+    payments = dataset[5]
+    high_risk = payments.mcc.isin(HIGH_RISK_MCC)
+    assert payments[high_risk].risk_score.mean() > payments[~high_risk].risk_score.mean() + 10
+    assert payments.risk_score.between(0, 100).all()
+    assert payments.auth_code[payments.status == "declined"].eq("").all()
+
+
+def test_sharded_output_does_not_depend_on_worker_count():
+    options = dict(seed=11, customers_per_shard=120, duplicate_pairs=5, duplicate_triples=2, kyc_fail_count=20)
+    inline = generate_datasets(500, 200, START, END, workers=1, **options)
+    pooled = generate_datasets(500, 200, START, END, workers=2, **options)
+    for table, df in inline.items():
+        assert df.equals(pooled[table]), table
+    assert inline["auth"].auth_event_id.is_unique and inline["auth"].timestamp.is_monotonic_increasing
+    assert inline["dispute"].transaction_id.isin(inline["payment"].message_id).all()
+    assert inline["kyc"].customer_id.nunique() == 500 and (inline["kyc"].verification_status == "failed").sum() == 20
+    assert inline["kyc"].document_number_hash.value_counts().max() == 3
+
+
+def test_merge_sorted_chunks_matches_a_stable_sort_with_ties():
+    rng = np.random.default_rng(0)
+    runs = [pd.DataFrame({"timestamp": np.sort(rng.integers(0, 20, size)), "run": run})
+            for run, size in enumerate((50, 0, 73, 31))]
+    expected = pd.concat(runs, ignore_index=True).sort_values("timestamp", kind="stable", ignore_index=True)
+    chunked = [list(rechunk([run], 7)) for run in runs]
+    merged = list(rechunk(merge_sorted_chunks(chunked, "timestamp"), 10))
+    assert [len(chunk) for chunk in merged] == [10] * 15 + [4]
+    assert pd.concat(merged, ignore_index=True).equals(expected)
+
+
+def test_streamed_tables_match_the_in_memory_ones(tmp_path):
+    options = dict(seed=3, customers_per_shard=150, duplicate_pairs=5, duplicate_triples=2, kyc_fail_count=20)
+    tables = generate_datasets(500, 200, START, END, workers=1, **options)
+    with stream_datasets(500, 200, START, END, workers=1, chunk_rows=400, spill_dir=tmp_path, **options) as streams:
+        write_chunks_to_csv(streams["kyc"], tmp_path / "kyc.csv")
+        for table in ("auth", "payment", "dispute"):
+            chunks = list(streams[table])
+            assert max(len(chunk) for chunk in chunks) <= 400
+            assert pd.concat(chunks, ignore_index=True).equals(tables[table])
+    assert len(pd.read_csv(tmp_path / "kyc.csv")) == len(tables["kyc"])
+    assert not any(path.suffix == ".pkl" for path in tmp_path.rglob("*"))
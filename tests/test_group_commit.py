@@ -0,0 +1,51 @@
+import threading
+
+import pytest
+
+from app import create_app
+from app.models.payment_msg import PaymentMessage
+from app.services.group_commit import get_group_committer
+
+
+@pytest.fixture
+def group_app(app):
+    app.config.update(GROUP_COMMIT_ENABLED=True, GROUP_COMMIT_MAX_ROWS=4,
+                      GROUP_COMMIT_INTERVAL_MS=200)
+    return app
+
+
+def _post_concurrently(app, bodies):
+    statuses = [None] * len(bodies)
+
+    def post(i):
+        try:
+            statuses[i] = app.test_client().post('/api/payment/', json=bodies[i]).status_code
+        except Exception as e:
+            statuses[i] = type(e).__name__
+
+    threads = [threading.Thread(target=post, args=(i,)) for i in range(len(bodies))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return statuses
+
+
+def test_concurrent_posts_share_commits(group_app):
+    statuses = _post_concurrently(group_app, [{"message_id": f"m{i}"} for i in range(8)])
+    assert statuses == [201] * 8
+    committer = get_group_committer()
+    assert committer.rows_flushed == 8
+    assert committer.groups_flushed < 8
+    assert PaymentMessage.query.count() == 8
+
+
+def test_failed_row_only_fails_its_own_caller(group_app):
+    statuses = _post_concurrently(group_app, [{"message_id": "dup"}, {"message_id": "dup"}, {"message_id": "ok"}])
+    assert sorted(map(str, statuses)).count("201") == 2
+    assert PaymentMessage.query.count() == 2
+
+
+def test_group_commit_is_off_for_single_threaded_workers():
+    assert not create_app({"GROUP_COMMIT_ENABLED": True, "GUNICORN_THREADS": 1}).config["GROUP_COMMIT_ENABLED"]
+    assert create_app({"GROUP_COMMIT_ENABLED": True, "GUNICORN_THREADS": 4}).config["GROUP_COMMIT_ENABLED"]
@@ -0,0 +1,45 @@
+import json
+import os
+
+from app.utils.metrics import MetricsRegistry
+
+
+def test_render_sums_worker_snapshots(tmp_path):
+    worker = MetricsRegistry()
+    counter = worker.counter("rows_total", "Rows.", ("entity",))
+    histogram = worker.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    counter.inc(("payment",), 3)
+    histogram.observe(0.05)
+    histogram.observe(2.0)
+    (tmp_path / "metrics_1.json").write_text(json.dumps(worker.snapshot()))
+
+    scraper = MetricsRegistry()
+    scraper.configure(str(tmp_path))
+    scraper.counter("rows_total", "Rows.", ("entity",)).inc(("payment",), 2)
+    scraper.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0)).observe(0.5)
+    text = scraper.render()
+    assert 'rows_total{entity="payment"} 5' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert 'latency_seconds_count 3' in text
+    assert "# TYPE latency_seconds histogram" in text
+
+
+def test_snapshot_is_written_atomically(tmp_path):
+    registry = MetricsRegistry()
+    registry.configure(str(tmp_path))
+    registry.counter("c_total", "C.").inc()
+    registry.write_snapshot()
+    assert os.listdir(tmp_path) == [f"metrics_{os.getpid()}.json"]
+
+
+def test_requests_rows_and_commits_are_exported(client):
+    client.post('/api/payment/batch', json=[{"message_id": "m1"}, {"message_id": "m2"}])
+    client.get('/api/payment/missing/extra')
+    text = client.get('/metrics').data.decode()
+    assert 'db_rows_written_total{entity="payment_msgs_raw"}' in text
+    assert 'ingest_batch_rows_count{entity="payment_msgs_raw",path="batch"}' in text
+    assert 'http_request_duration_seconds_count{blueprint="payment",endpoint="payment.add_payments_batch",method="POST",status="201"}' in text
+    assert 'http_request_errors_total{blueprint="",endpoint="unmatched",status="404"}' in text
+    assert "db_commit_duration_seconds_count" in text
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+from app.models import db
+from app.models.auth_log_msg import AuthLogMessage
+from app.models.payment_msg import PaymentMessage
+
+
+def _seed_payments(n):
+    db.session.add_all([PaymentMessage(message_id=f"m{i:03d}", amount=float(i)) for i in range(n)])
+    db.session.commit()
+
+
+def test_payment_pages_follow_cursor(client):
+    _seed_payments(5)
+    first = client.get('/api/payment/?limit=2').json
+    assert [p['message_id'] for p in first['items']] == ['m000', 'm001']
+    second = client.get(f"/api/payment/?limit=2&cursor={first['next_cursor']}").json
+    assert [p['message_id'] for p in second['items']] == ['m002', 'm003']
+    last = client.get(f"/api/payment/?limit=2&cursor={second['next_cursor']}").json
+    assert [p['message_id'] for p in last['items']] == ['m004']
+    assert last['next_cursor'] is None
+
+
+def test_auth_log_pages_order_by_timestamp(client):
+    base = datetime(2024, 1, 1)
+    db.session.add_all([
+        AuthLogMessage(auth_event_id=f"a{i}", customer_id="c1", device_id="d1",
+                       timestamp=base - timedelta(minutes=i))
+        for i in range(3)
+    ])
+    db.session.commit()
+    first = client.get('/api/authlog/?limit=2').json
+    assert [a['auth_event_id'] for a in first['items']] == ['a2', 'a1']
+    rest = client.get(f"/api/authlog/?limit=2&cursor={first['next_cursor']}").json
+    assert [a['auth_event_id'] for a in rest['items']] == ['a0']
+
+
+def test_stream_mode_returns_full_array(client):
+    _seed_payments(3)
+    response = client.get('/api/payment/?stream=true')
+    assert response.is_streamed
+    assert [p['message_id'] for p in response.json] == ['m000', 'm001', 'm002']
+
+
+def test_bad_page_args_are_rejected(client):
+    assert client.get('/api/payment/?limit=abc').status_code == 400
+    assert client.get('/api/payment/?cursor=not-a-cursor').status_code == 400
+
+
+def test_fast_serializer_matches_jsonify(app, client):
+    from flask import jsonify
+    from app.models.dispute_msg import DisputeMessage
+    dispute = DisputeMessage(dispute_id="d1", transaction_id="t1", customer_id="c1", merchant_id="m1",
+                             amount=12.5, currency="EUR", timestamp=datetime(2024, 3, 4, 5, 6, 7),
+                             evidence_provided=True, resolution_timestamp=None, status="Open é")
+    db.session.add(dispute)
+    db.session.commit()
+    expected = jsonify({"items": [dispute.to_dict()], "next_cursor": None}).get_data()
+    assert client.get('/api/dispute/').get_data() == expected
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from app.services.partition_service import expired_partitions, partition_name, plan_partitions
+
+
+def test_plan_partitions_covers_months_around_now():
+    plan = plan_partitions(datetime(2024, 11, 20, 13, 0), months_back=1, months_ahead=2)
+    assert plan == [
+        (datetime(2024, 10, 1), datetime(2024, 11, 1)),
+        (datetime(2024, 11, 1), datetime(2024, 12, 1)),
+        (datetime(2024, 12, 1), datetime(2025, 1, 1)),
+        (datetime(2025, 1, 1), datetime(2025, 2, 1)),
+    ]
+    assert partition_name("payment_msgs_raw", plan[-1][0]) == "payment_msgs_raw_p202501"
+
+
+def test_expired_partitions_keeps_retention_window_and_default():
+    names = ["auth_log_msgs_raw_default"] + [f"auth_log_msgs_raw_p2024{m:02d}" for m in range(1, 13)]
+    # Keeping 3 whole months before March 2025 keeps Dec 2024 onwards.
+    assert expired_partitions(names, 3, datetime(2025, 3, 5)) == [
+        f"auth_log_msgs_raw_p2024{m:02d}" for m in range(1, 12)
+    ]
@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.config.pool import InstrumentedQueuePool, engine_options, pool_settings
+
+
+def test_profile_with_env_overrides():
+    settings = pool_settings("burst", {"DB_POOL_SIZE": "3", "DB_POOL_PRE_PING": "false"})
+    assert (settings["pool_size"], settings["max_overflow"], settings["pool_pre_ping"]) == (3, 20, False)
+    with pytest.raises(ValueError):
+        pool_settings("huge", {})
+
+
+def test_engine_options_only_for_postgres():
+    assert engine_options("sqlite://", environ={}) == {}
+    options = engine_options("postgresql://u@h/db", "ingest", environ={"DB_STATEMENT_TIMEOUT_MS": "5000"})
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == 4
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+
+def test_default_profile_has_no_statement_timeout_unless_set():
+    assert "connect_args" not in engine_options("postgresql://u@h/db", environ={})
+    options = engine_options("postgresql://u@h/db", environ={"DB_STATEMENT_TIMEOUT_MS": "30000"})
+    assert options["connect_args"] == {"options": "-c statement_timeout=30000"}
+
+
+def test_instrumented_pool_counts_checkouts_and_timeouts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.05)
+    held = engine.connect()
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    stats = engine.pool.stats()
+    assert (stats["checkouts"], stats["checkout_timeouts"], stats["checked_out"]) == (2, 1, 1)
+    assert stats["checkout_wait_max_ms"] >= 50
+    held.close()
+    assert engine.pool.stats()["idle"] == 1
+    engine.dispose()
+
+
+def test_pool_endpoint_reports_worker_pool(client):
+    stats = client.get('/api/ops/pool').json
+    assert stats["pid"] > 0 and stats["pool"]
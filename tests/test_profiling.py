@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from app.services.profiling import init_profiling
+
+
+@pytest.fixture
+def profiled_client(app, tmp_path):
+    app.config.update(PROFILING_HEADER_ENABLED=True, PROFILING_DUMP_DIR=str(tmp_path),
+                      PROFILING_SLOW_STATEMENTS=2)
+    init_profiling(app)
+    return app.test_client()
+
+
+def test_profiled_batch_reports_phases_and_statements(profiled_client, tmp_path):
+    batch = [{"message_id": f"m{i}", "amount": 1.0} for i in range(50)]
+    response = profiled_client.post('/api/payment/batch', json=batch, headers={"X-Profile": "1"})
+    assert response.status_code == 201
+    timing = response.headers["Server-Timing"]
+    for name in ("parse", "build", "flush", "commit", "serialize", "sql", "total"):
+        assert f"{name};dur=" in timing
+    profile_id = response.headers["X-Profile-Id"]
+    [report_path] = tmp_path.glob(f"*-{profile_id}.json")
+    report = json.loads(report_path.read_text())
+    assert report["sql_statements"] >= 1
+    assert len(report["slowest_statements"]) <= 2
+    assert "INSERT" in report["slowest_statements"][0]["statement"]
+    assert list(tmp_path.glob(f"*-{profile_id}.prof"))
+
+
+def test_requests_without_header_are_not_profiled(profiled_client):
+    response = profiled_client.post('/api/payment/batch', json=[{"message_id": "m1"}])
+    assert response.status_code == 201
+    assert "Server-Timing" not in response.headers
@@ -0,0 +1,80 @@
+import pytest
+
+from app.models import db
+from app.models.payment_msg import PaymentMessage
+from app.services.record_cache import get_record_cache, init_record_cache
+from app.utils.cache import CacheBackend, LocalSharedBackend, LRUTTLCache, MISSING, ReadThroughCache
+
+
+@pytest.fixture
+def cached_client(app):
+    app.config.update(CACHE_ENABLED=True, CACHE_MAX_ENTRIES=100, CACHE_TTL_SECONDS=60,
+                      CACHE_SHARED_BACKEND="local")
+    init_record_cache(app)
+    return app.test_client()
+
+
+def test_lru_evicts_least_recently_used_and_expires():
+    cache = LRUTTLCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert cache.stats()["evictions"] == 1
+    expired = LRUTTLCache(max_entries=2, ttl=0)
+    expired.set("a", 1)
+    assert expired.get("a") is MISSING
+    assert expired.stats()["expirations"] == 1
+
+
+def test_get_by_id_is_served_from_cache(cached_client):
+    db.session.add(PaymentMessage(message_id="m1", amount=1.0))
+    db.session.commit()
+    assert cached_client.get('/api/payment/m1').json['amount'] == 1.0
+    # A write that bypasses the services is not seen until the entry is invalidated.
+    db.session.query(PaymentMessage).update({"amount": 5.0})
+    db.session.commit()
+    assert cached_client.get('/api/payment/m1').json['amount'] == 1.0
+    stats = cached_client.get('/api/ops/cache').json
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+
+def test_misses_are_not_cached(cached_client):
+    assert cached_client.get('/api/payment/m1').json == {"error": "Not found"}
+    cached_client.post('/api/payment/', json={"message_id": "m1", "amount": 1.0})
+    assert cached_client.get('/api/payment/m1').json['amount'] == 1.0
+
+
+def test_writes_invalidate_cached_records(cached_client):
+    cached_client.post('/api/payment/', json={"message_id": "m1", "amount": 1.0})
+    cached_client.get('/api/payment/m1')
+    cached_client.put('/api/payment/m1', json={"amount": 2.0})
+    assert cached_client.get('/api/payment/m1').json['amount'] == 2.0
+    cached_client.post('/api/payment/batch?on_conflict=update', json=[{"message_id": "m1", "amount": 3.0}])
+    assert cached_client.get('/api/payment/m1').json['amount'] == 3.0
+    cached_client.delete('/api/payment/m1')
+    assert cached_client.get('/api/payment/m1').json == {"error": "Not found"}
+    assert get_record_cache().shared.get("payment_msgs_raw:m1") is MISSING
+
+
+def test_load_overtaken_by_an_invalidation_is_not_cached():
+    cache = ReadThroughCache(max_entries=10, ttl=60, shared=LocalSharedBackend())
+
+    def load_then_write():
+        # The row was read before a concurrent write committed and invalidated the key.
+        cache.invalidate("k")
+        return {"amount": 1.0}
+
+    assert cache.get_or_load("k", load_then_write) == {"amount": 1.0}
+    assert cache.get_or_load("k", lambda: {"amount": 2.0}) == {"amount": 2.0}
+    assert cache.stats()["stale_loads"] == 1
+
+
+def test_shared_backends_must_implement_the_interface():
+    class Partial(CacheBackend):
+        def get(self, key):
+            return MISSING
+
+    with pytest.raises(TypeError):
+        Partial()
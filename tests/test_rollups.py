@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pytest
+
+from app.models import db
+from app.models.payment_msg import PaymentMessage
+from app.models.rollups import RollupWatermark
+from app.services.rollups import init_rollups, refresh_rollups
+
+
+def payment(message_id, status, day=1, merchant_id="M1", amount=10.0):
+    return {"message_id": message_id, "merchant_id": merchant_id, "mcc": "5411", "status": status,
+            "amount": amount, "timestamp": f"2026-10-0{day}T12:00:00"}
+
+
+@pytest.fixture
+def rollup_client(app):
+    app.config["ROLLUPS_ENABLED"] = True
+    init_rollups(app)
+    return app.test_client()
+
+
+def test_ingest_batches_update_the_rollups(rollup_client):
+    rollup_client.post('/api/payment/batch', json=[payment("p1", "approved"), payment("p2", "declined"),
+                                                   payment("p3", "approved", merchant_id="M2")])
+    rollup_client.post('/api/payment/batch', json=[payment("p4", "declined", day=2)])
+    by_merchant = rollup_client.get('/api/rollups/payments?group_by=merchant_id').json["rows"]
+    assert [(r["merchant_id"], r["txn_count"], r["declined_count"], r["decline_rate"]) for r in by_merchant] == [
+        ("M1", 3, 2, 2 / 3), ("M2", 1, 0, 0.0)]
+    by_day = rollup_client.get('/api/rollups/payments?from=2026-10-02&merchant_id=M1').json["rows"]
+    assert by_day == [{"day": "2026-10-02", "txn_count": 1, "declined_count": 1, "amount_total": 10.0,
+                       "declined_amount": 10.0, "decline_rate": 1.0}]
+
+    rollup_client.post('/api/dispute/batch', json=[{
+        "dispute_id": "d1", "transaction_id": "p1", "customer_id": "C1", "merchant_id": "M1",
+        "timestamp": "2026-10-01T13:00:00", "dispute_reason_code": "10.4", "evidence_provided": True}])
+    disputes = rollup_client.get('/api/rollups/disputes?group_by=day,dispute_reason_code').json["rows"]
+    assert disputes[0]["dispute_rate"] == 1 / 3 and disputes[0]["evidence_rate"] == 1.0
+
+
+def test_rates_over_another_rollup_without_day_grouping(rollup_client):
+    rollup_client.post('/api/payment/batch', json=[payment("p1", "approved"), payment("p2", "declined", day=2)])
+    rollup_client.post('/api/dispute/batch', json=[{
+        "dispute_id": "d1", "transaction_id": "p1", "customer_id": "C1", "merchant_id": "M1",
+        "timestamp": "2026-10-01T13:00:00", "dispute_reason_code": "10.4"}])
+    response = rollup_client.get('/api/rollups/disputes?group_by=dispute_reason_code')
+    assert response.status_code == 200
+    assert [(r["dispute_reason_code"], r["dispute_rate"]) for r in response.json["rows"]] == [("10.4", 0.5)]
+
+
+def test_upserted_rows_are_folded_in_with_their_validated_values(rollup_client):
+    rollup_client.post('/api/payment/batch', json=[payment("p1", "approved")])
+    result = rollup_client.post('/api/payment/batch?on_conflict=ignore',
+                                json=[payment("p1", "approved"), payment("p2", "declined", amount="12.5"),
+                                      {"message_id": "p3", "amount": "ten"}]).json
+    assert result["inserted"] == ["p2"] and result["failure_count"] == 1
+    totals = rollup_client.get('/api/rollups/payments?group_by=').json["rows"]
+    assert totals == [{"txn_count": 2, "declined_count": 1, "amount_total": 22.5, "declined_amount": 12.5,
+                       "decline_rate": 0.5}]
+
+
+def test_refresh_recomputes_days_from_the_watermark(app, rollup_client):
+    rollup_client.post('/api/payment/batch', json=[payment("p1", "approved")])
+    # Written behind the API's back: only a refresh sees it.
+    db.session.add(PaymentMessage(message_id="p2", merchant_id="M1", mcc="5411", status="declined",
+                                  timestamp=datetime(2026, 10, 3, 9)))
+    db.session.commit()
+    payments = next(r for r in refresh_rollups() if r["rollup"] == "payments")
+    assert payments["since"] is None and payments["refreshed_through"] == "2026-10-03T09:00:00"
+    assert db.session.get(RollupWatermark, "payments").refreshed_through == datetime(2026, 10, 3, 9)
+    totals = rollup_client.get('/api/rollups/payments?group_by=').json["rows"]
+    assert totals == [{"txn_count": 2, "declined_count": 1, "amount_total": 10.0, "declined_amount": 0.0,
+                       "decline_rate": 0.5}]
+    assert refresh_rollups()[0]["since"] == "2026-10-01"
+
+
+def test_unknown_rollup_columns_are_rejected(rollup_client):
+    response = rollup_client.get('/api/rollups/kyc?group_by=merchant_id')
+    assert response.status_code == 400
+    assert "Unknown rollup column(s): merchant_id" in response.json["error"]
@@ -0,0 +1,60 @@
+import io
+import json
+
+from app.models.payment_msg import PaymentMessage
+from app.services.events import rows_inserted
+from app.services.ingest import iter_lines
+
+
+def _ndjson(rows):
+    return "\n".join(json.dumps(r) for r in rows) + "\n"
+
+
+def test_stream_ingest_commits_per_chunk(client):
+    body = _ndjson([{"message_id": f"m{i}", "amount": i} for i in range(5)])
+    response = client.post('/api/payment/stream?chunk_size=2', data=body,
+                           content_type='application/x-ndjson')
+    assert response.status_code == 201
+    assert response.json['inserted'] == 5
+    assert [c['inserted'] for c in response.json['chunks']] == [2, 2, 1]
+    assert PaymentMessage.query.count() == 5
+
+
+def test_stream_ingest_reports_bad_lines_and_keeps_good_chunks(client):
+    body = _ndjson([{"message_id": "m1"}, {"message_id": "m2", "bogus": 1}]) + "{not json\n"
+    body += _ndjson([{"message_id": "m1"}])  # duplicate key fails this chunk only
+    response = client.post('/api/payment/stream?chunk_size=3', data=body,
+                           content_type='application/x-ndjson')
+    first, second = response.json['chunks']
+    assert first['inserted'] == 1
+    assert [r['line'] for r in first['rejected']] == [2, 3]
+    assert 'error' in second
+    assert response.json['failed'] == 3
+    assert PaymentMessage.query.count() == 1
+
+
+def test_stream_ingest_requires_ndjson(client):
+    response = client.post('/api/payment/stream', json=[{"message_id": "m1"}])
+    assert response.status_code == 415
+
+
+def test_iter_lines_joins_lines_spanning_many_blocks():
+    long_line = b"x" * 1000
+    stream = io.BytesIO(b"a\n" + long_line + b"\nb\n\nc")
+    assert list(iter_lines(stream, block_size=7)) == [b"a", long_line, b"b", b"", b"c"]
+
+
+def test_stream_ingest_failing_receiver_does_not_fail_committed_chunks(client):
+    def broken(model, rows, **_):
+        raise RuntimeError("receiver bug")
+
+    rows_inserted.connect(broken)
+    try:
+        body = _ndjson([{"message_id": f"m{i}", "amount": i} for i in range(3)])
+        response = client.post('/api/payment/stream?chunk_size=2', data=body,
+                               content_type='application/x-ndjson')
+    finally:
+        rows_inserted.disconnect(broken)
+    assert response.status_code == 201
+    assert response.json['inserted'] == 3 and response.json['failed'] == 0
+    assert all('error' not in chunk for chunk in response.json['chunks'])
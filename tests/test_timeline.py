@@ -0,0 +1,48 @@
+from datetime import datetime
+
+import pytest
+
+from app.models import db
+from app.models.auth_log_msg import AuthLogMessage
+from app.models.dispute_msg import DisputeMessage
+from app.models.kyc_msg import KYCMessage
+
+
+@pytest.fixture
+def customer_events(app):
+    db.session.add_all([
+        KYCMessage(kyc_event_id="k1", customer_id="C1", device_id="D1", timestamp=datetime(2026, 1, 1, 9)),
+        AuthLogMessage(auth_event_id="a2", customer_id="C1", device_id="D1", timestamp=datetime(2026, 1, 1, 9)),
+        AuthLogMessage(auth_event_id="a1", customer_id="C1", device_id="D1", timestamp=datetime(2026, 1, 1, 9)),
+        AuthLogMessage(auth_event_id="a3", customer_id="C1", device_id="D1", timestamp=datetime(2026, 2, 1)),
+        AuthLogMessage(auth_event_id="x1", customer_id="C2", device_id="D2", timestamp=datetime(2026, 1, 5)),
+        DisputeMessage(dispute_id="d1", transaction_id="t1", customer_id="C1", merchant_id="M1",
+                       timestamp=datetime(2026, 1, 1, 9)),
+        DisputeMessage(dispute_id="d2", transaction_id="t2", customer_id="C1", merchant_id="M1",
+                       timestamp=datetime(2026, 1, 15)),
+    ])
+    db.session.commit()
+
+
+def event_ids(page):
+    return [(item["event_type"], item.get("kyc_event_id") or item.get("auth_event_id") or item.get("dispute_id"))
+            for item in page["items"]]
+
+
+def test_pages_merge_the_streams_chronologically(client, customer_events):
+    seen, cursor = [], None
+    while True:
+        page = client.get('/api/customer/C1/timeline', query_string={"limit": 2, "cursor": cursor or ""}).json
+        seen.extend(event_ids(page))
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    # Events at the same instant come in KYC, auth, dispute order, then by id.
+    assert seen == [("kyc", "k1"), ("auth", "a1"), ("auth", "a2"), ("dispute", "d1"),
+                    ("dispute", "d2"), ("auth", "a3")]
+
+
+def test_time_range_and_bad_cursor(client, customer_events):
+    page = client.get('/api/customer/C1/timeline?from=2026-01-02&to=2026-02-01').json
+    assert event_ids(page) == [("dispute", "d2")] and page["next_cursor"] is None
+    assert client.get('/api/customer/C1/timeline?cursor=bogus').status_code == 400
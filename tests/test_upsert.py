@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from app.models import db
+from app.models.payment_msg import PaymentMessage
+
+
+def test_ignore_reports_duplicates_instead_of_failing(client):
+    db.session.add(PaymentMessage(message_id="m1", amount=1.0))
+    db.session.commit()
+    batch = [{"message_id": "m1", "amount": 9.0}, {"message_id": "m2"}, {"message_id": "m2"}]
+    result = client.post('/api/payment/batch?on_conflict=ignore', json=batch).json
+    assert result['inserted'] == ["m2"]
+    assert sorted(result['duplicate']) == ["m1", "m2"]
+    assert db.session.get(PaymentMessage, "m1").amount == 1.0
+
+
+def test_update_reports_inserted_and_updated_keys(client):
+    db.session.add(PaymentMessage(message_id="m1", amount=1.0))
+    db.session.commit()
+    batch = [{"message_id": "m1", "amount": 9.0}, {"message_id": 2, "amount": 3.0}]
+    result = client.post('/api/payment/batch?on_conflict=update', json=batch).json
+    assert result['updated'] == ["m1"]
+    assert result['inserted'] == ["2"]
+    db.session.expire_all()
+    assert db.session.get(PaymentMessage, "m1").amount == 9.0
+
+
+def test_unknown_conflict_action_is_rejected(client):
+    response = client.post('/api/payment/batch?on_conflict=merge', json=[{"message_id": "m1"}])
+    assert response.status_code == 400
+
+
+def test_failed_plain_batch_is_rolled_back_and_reported(client):
+    from app.models.auth_log_msg import AuthLogMessage
+
+    row = {"customer_id": "c1", "device_id": "d1", "timestamp": "2024-06-01T10:00:00"}
+    client.post('/api/authlog/batch', json=[{"auth_event_id": "a1", **row}])
+    result = client.post('/api/authlog/batch', json=[{"auth_event_id": "a2", **row}, {"auth_event_id": "a1", **row}]).json
+    assert result["error"] == "Failed to save batch" and result["details"]
+    assert AuthLogMessage.query.count() == 1
+
+
+def test_partitioned_upsert_matches_stored_ids_whatever_their_timestamp(client, monkeypatch):
+    # Partitioned tables are keyed on (id, timestamp); a retry with another timestamp must not be stored again.
+    monkeypatch.setattr("app.services.upsert.PARTITIONING_ENABLED", True)
+    db.session.add(PaymentMessage(message_id="m1", amount=1.0, timestamp=datetime(2024, 6, 1)))
+    db.session.commit()
+    retry = [{"message_id": "m1", "amount": 9.0, "timestamp": "2024-06-02T00:00:00"}, {"message_id": "m2"}]
+    result = client.post('/api/payment/batch?on_conflict=ignore', json=retry).json
+    assert (result['inserted'], result['duplicate']) == (["m2"], ["m1"])
+    result = client.post('/api/payment/batch?on_conflict=update', json=retry).json
+    assert (result['updated'], result['duplicate']) == (["m1", "m2"], [])
+    db.session.expire_all()
+    stored = db.session.get(PaymentMessage, "m1")
+    assert (stored.amount, stored.timestamp) == (9.0, datetime(2024, 6, 2))
+    assert PaymentMessage.query.count() == 2
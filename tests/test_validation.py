@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import pytest
+
+from app.models import db
+from app.models.kyc_msg import KYCMessage
+from app.models.payment_msg import PaymentMessage
+from app.services.validation import get_validator
+
+
+def test_values_are_coerced_to_column_types():
+    row = get_validator(PaymentMessage)({"message_id": 7, "amount": "12.5", "timestamp": "2024-06-01T14:00:00+02:00"})
+    assert row["message_id"] == "7"
+    assert row["amount"] == 12.5
+    assert row["timestamp"] == datetime(2024, 6, 1, 12, 0)
+    assert row["currency"] is None
+
+
+@pytest.mark.parametrize("data, error", [
+    ({"amount": 1.0}, "Missing required field(s): message_id"),
+    ({"message_id": "m1", "amount": "ten"}, "Invalid value for 'amount': expected a finite number"),
+    ({"message_id": "m1", "amount": True}, "Invalid value for 'amount': expected a finite number"),
+    ({"message_id": "m1", "amount": "nan"}, "Invalid value for 'amount': expected a finite number"),
+    ({"message_id": "m1", "amount": "-inf"}, "Invalid value for 'amount': expected a finite number"),
+    ({"message_id": "m1", "amount": "1e999"}, "Invalid value for 'amount': expected a finite number"),
+    ({"message_id": "m1", "risk_score": float("inf")}, "Invalid value for 'risk_score': expected a finite number"),
+    ({"message_id": "m1", "amount": 10 ** 400}, "Invalid value for 'amount': expected a finite number"),
+    ({"message_id": "m1", "timestamp": 5}, "Invalid value for 'timestamp': expected an ISO 8601 timestamp"),
+    ({"message_id": "m1", "merchant": "x"}, "Unknown field(s): merchant"),
+    ("m1", "Expected a JSON object"),
+])
+def test_invalid_rows_are_rejected(data, error):
+    with pytest.raises(ValueError, match=error.replace("(", r"\(").replace(")", r"\)")):
+        get_validator(PaymentMessage)(data)
+
+
+def test_all_problems_of_a_row_are_reported_together():
+    with pytest.raises(ValueError) as e:
+        get_validator(PaymentMessage)({"amount": "x", "risk_score": "y"})
+    assert str(e.value).count(";") == 2
+
+
+def test_batch_reports_rejected_row_indexes_and_writes_clean_rows(client):
+    batch = [{"message_id": "m1", "amount": 1}, {"message_id": "m2", "amount": "bad"}, {"amount": 3}]
+    result = client.post('/api/payment/batch', json=batch).json
+    assert result["success_count"] == 1
+    assert [(f["index"], f["data"]) for f in result["failed_records"]] == [(1, batch[1]), (2, batch[2])]
+    assert db.session.get(PaymentMessage, "m1").amount == 1.0
+
+
+def test_kyc_row_without_timestamp_no_longer_fails_the_batch(client):
+    batch = [{"kyc_event_id": "k1", "customer_id": "c1", "device_id": "d1", "timestamp": ""},
+             {"kyc_event_id": "k2", "customer_id": "c1", "device_id": "d1", "timestamp": "2024-06-01T12:00:00Z"}]
+    result = client.post('/api/kyc/batch', json=batch).json
+    assert result["message"] == "1 KYC records inserted successfully"
+    assert result["failed_records"][0]["index"] == 0
+    assert result["failed_records"][0]["error"] == "Missing required field(s): timestamp"
+    assert db.session.get(KYCMessage, "k2") is not None
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import db
+from app.models.auth_log_msg import AuthLogMessage
+from app.services.velocity import init_velocity
+from app.utils.windows import SlidingWindowCounter
+
+
+def auth_log(event_id, status, minutes_ago=0, customer_id="C1"):
+    timestamp = datetime.utcnow() - timedelta(minutes=minutes_ago)
+    return {"auth_event_id": event_id, "customer_id": customer_id, "device_id": "D1",
+            "timestamp": timestamp.isoformat(), "auth_status": status, "ip_address": "10.0.0.1"}
+
+
+@pytest.fixture
+def velocity_client(app):
+    for event_id, minutes_ago in (("stored", 5), ("expired", 30)):
+        row = auth_log(event_id, "failure", minutes_ago)
+        row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+        db.session.add(AuthLogMessage(**row))
+    db.session.commit()
+    app.config["VELOCITY_ENABLED"] = True
+    init_velocity(app)
+    app.extensions["velocity"].ensure_started(app, background=False)
+    return app.test_client()
+
+
+def test_window_counts_expire_bucket_by_bucket_and_evict_idle_keys():
+    counter = SlidingWindowCounter(window_seconds=60, bucket_seconds=10)
+    assert counter.add("k", 1000, now=1000)
+    assert counter.add("k", 1035, now=1035)
+    assert not counter.add("k", 900, now=1035)
+    assert counter.count("k", now=1035) == 2
+    # The bucket of t=1000 leaves the window once six newer buckets have started.
+    assert counter.count("k", now=1060) == 1
+    counter.add("k", 1095, now=1095)
+    assert counter.count("k", now=1095) == 1
+    counter.evict(current=200)
+    assert len(counter) == 0 and counter.count("k", now=2000) == 0
+
+
+def test_counts_are_rebuilt_from_the_table_and_follow_inserts(velocity_client):
+    velocity_client.post('/api/authlog/batch', json=[auth_log("live", "failure"), auth_log("ok", "success"),
+                                                     auth_log("other", "failure", 1, "C2")])
+    velocity_client.post('/api/authlog/batch?on_conflict=ignore',
+                         json=[auth_log("live", "failure"), auth_log("upserted", "failure")])
+    velocity_client.post('/api/payment/batch', json=[{"message_id": "p1", "card_number_token": "T1"},
+                                                     {"message_id": "p2", "card_number_token": "T1"}])
+    result = velocity_client.get('/api/velocity/?customer_id=C1&card_number_token=T1').json
+    assert result["ready"]
+    assert result["counts"] == {
+        "customer_id": {"failed_logins_15m": 3, "logins_15m": 4},
+        "card_number_token": {"payments_1h": 2},
+    }
+
+
+def test_keys_are_counted_by_their_string_form(velocity_client):
+    velocity_client.post('/api/payment/batch', json=[{"message_id": "p1", "card_number_token": 123}])
+    velocity_client.post('/api/payment/batch?on_conflict=ignore',
+                         json=[{"message_id": "p2", "card_number_token": 123}])
+    velocity_client.post('/api/payment/batch', json=[{"message_id": "p3", "card_number_token": "123"}])
+    result = velocity_client.get('/api/velocity/?card_number_token=123').json
+    assert result["counts"] == {"card_number_token": {"payments_1h": 3}}
+
+
+def test_unknown_keys_are_rejected(velocity_client):
+    response = velocity_client.get('/api/velocity/?customer=C1')
+    assert response.status_code == 400
+    assert "Unknown velocity key(s): customer" in response.json["error"]
+
+
+def test_rows_stored_by_other_workers_are_counted_once_on_sync(app, velocity_client):
+    velocity_client.post('/api/authlog/batch', json=[auth_log("live", "failure")])
+    # Stored by another worker: only this worker's sync sees it.
+    row = auth_log("elsewhere", "failure", 1)
+    row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+    db.session.add(AuthLogMessage(**row))
+    db.session.commit()
+    velocity = app.extensions["velocity"]
+    assert velocity.counts({"customer_id": "C1"})["customer_id"]["failed_logins_15m"] == 2
+    velocity.sync(app)
+    velocity.sync(app)
+    assert velocity.counts({"customer_id": "C1"})["customer_id"]["failed_logins_15m"] == 3